@@ -2,6 +2,29 @@ import streamlit as st
 from ui_chat import render_chat_ui
 from ui_kapitel import render_kapitel_ui
 from ui_game import render_game_ui
+from utils.llm_scheduler import scheduler
+from utils.llm_gateway import gateway
+from utils.model_residency import residency
+from utils.latency_budget import latency_stats
+from utils.semantic_cache import answer_cache
+from utils.pregeneration import pregenerator
+from utils.ingestion_jobs import ingestion_queue
+
+@st.cache_resource
+def start_model_residency():
+    # Einmal pro Prozess: konfigurierte Modelle im Hintergrund vorladen und geladen halten
+    residency.start()
+    return residency
+
+start_model_residency()
+
+@st.cache_resource
+def start_ingestion_worker():
+    # Einmal pro Prozess: Einlese-Jobs aus dem PDF-Upload abarbeiten (auch nach einem Neustart)
+    ingestion_queue.start()
+    return ingestion_queue
+
+start_ingestion_worker()
 
 if "mode" not in st.session_state:
     st.session_state.mode = "Normal Chat"
@@ -11,6 +34,25 @@ st.sidebar.image("PTW_CiP_Logo.svg", width=300)
 st.sidebar.header("Modus wählen")
 mode = st.sidebar.radio("Wähle einen Modus", ["Normal Chat", "Kapitel-Modus"])
 
+# Live-Auslastung der LLM-Warteschlange (bei jedem Rerun aktualisiert)
+with st.sidebar.expander("📊 LLM-Auslastung"):
+    metrics = scheduler.metrics()
+    for model, m in metrics["models"].items():
+        waiting = ", ".join(f"{p}: {n}" for p, n in m["waiting"].items()) or "–"
+        timed_out = sum(m["timed_out"].values())
+        st.caption(f"**{model}** · läuft {m['running']}/{m['concurrency']} · wartet {waiting} · Timeouts {timed_out}")
+    if metrics["avg_wait"]:
+        st.caption("Ø Wartezeit: " + ", ".join(f"{p} {w:.1f} s" for p, w in metrics["avg_wait"].items()))
+    st.caption("Zusammengelegte Anfragen: {coalesced} von {requests} · abgebrochen: {aborted} (~{tokens_saved} Token gespart)".format(**gateway.stats()))
+    st.caption("🔮 Vorab-Generierungen: {used} genutzt · {discarded} verworfen · {pending} offen (von {started})".format(**pregenerator.stats()))
+    for call_type, s in latency_stats.summary().items():
+        st.caption(f"⏱️ {call_type}: p50 {s['p50']:.1f} s · p95 {s['p95']:.1f} s (Budget {s['deadline']:.0f} s, n={s['n']})")
+    cache_stats = answer_cache.stats()
+    if cache_stats:
+        st.caption("💾 Antwort-Cache: " + ", ".join(f"{t} {s['hit_rate']:.0%} ({s['hits']}/{s['hits'] + s['misses']})" for t, s in cache_stats.items()))
+    loads = residency.stats()
+    st.caption(f"Modell-Ladevorgänge: {loads['loads']} ({loads['load_seconds']:.1f} s) · umgeleitet: {loads['routed']}")
+
 # Main
 if mode == "Normal Chat":
     render_chat_ui()
@@ -0,0 +1,77 @@
+# --- benchmarks/bench_catalog_cold_start.py ---
+# Kaltstart: Pickle-Verzeichnisse (quiz_catalogs/ + topic_summaries/) vs. Katalog-Bundle.
+# Gemessen wird das, was die App beim ersten Seitenaufruf braucht: Themenliste,
+# Kurz-Zusammenfassungen und die Fragen eines Themas (lazy) bzw. aller Themen.
+#
+#   python benchmarks/bench_catalog_cold_start.py
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.catalog_bundle import write_topic_summary
+from utils.load_quiz_data import QuizCatalogService
+from utils.topic_summary_store import TopicSummaryStore
+from benchmarks.bench_quiz_catalog import TOPICS, make_catalog, legacy_load_quiz_catalog
+
+ROUNDS = 20
+LONG_SUMMARY = "Lean production removes waste along the value stream. " * 60
+
+
+def legacy_load_topic_summaries(summary_dir):
+    summaries = {}
+    for file in os.listdir(summary_dir):
+        if file.endswith(".pkl"):
+            with open(os.path.join(summary_dir, file), "rb") as f:
+                summaries[file[:-4].replace("_", " ")] = pickle.load(f)
+    return summaries
+
+
+def best_ms(fn):
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        quiz_dir = os.path.join(tmp, "quiz_catalogs")
+        summary_dir = os.path.join(tmp, "topic_summaries")
+        bundle_path = os.path.join(tmp, "lean_catalog.db")
+        os.makedirs(quiz_dir)
+        os.makedirs(summary_dir)
+        make_catalog(quiz_dir, bundle_path)
+        for t in range(TOPICS):
+            summary = {"short": f"Short summary {t}.", "long": LONG_SUMMARY}
+            with open(os.path.join(summary_dir, f"Topic_{t}.pkl"), "wb") as f:
+                pickle.dump(summary, f)
+            write_topic_summary(f"Topic {t}", summary["short"], summary["long"], path=bundle_path)
+
+        def legacy():
+            legacy_load_quiz_catalog(quiz_dir)
+            legacy_load_topic_summaries(summary_dir)
+
+        def bundle_one_topic():
+            catalog = QuizCatalogService(bundle_path).catalog()
+            TopicSummaryStore(bundle_path).get_short("Topic 0")
+            catalog["Topic 0"]
+
+        def bundle_all_topics():
+            service = QuizCatalogService(bundle_path)
+            TopicSummaryStore(bundle_path).topics()
+            service.index().all_ids
+
+        print(f"📊 Kaltstart mit {TOPICS} Themen (bestes von {ROUNDS})")
+        print(f"  Pickle-Verzeichnisse (alles):    {best_ms(legacy):8.3f} ms")
+        print(f"  Bundle, ein Thema (lazy):        {best_ms(bundle_one_topic):8.3f} ms")
+        print(f"  Bundle, alle Themen + Index:     {best_ms(bundle_all_topics):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# --- benchmarks/bench_latency_budget.py ---
+# 8 Vorlesungen gleichzeitig gegen einen ausgelasteten Fake-Ollama-Server (1 Platz,
+# openhermes langsam, llama3.2 schnell). Verglichen werden p50/p95 ohne Budget und mit
+# Budget (num_predict, Deadline, Wechsel auf das Ausweichmodell, vorbereitete Antwort).
+# Die Budgets sind für den Benchmark auf Sekundenbruchteile verkleinert.
+#
+#   python benchmarks/bench_latency_budget.py
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import latency_budget
+from utils.latency_budget import latency_stats
+from utils.llm_gateway import LLMGateway, GatewayLLM, OllamaStreamingClient
+from utils.llm_scheduler import LLMScheduler
+from benchmarks.fake_ollama_server import start_server, HttpOllamaClient
+
+LEARNERS = 8
+latency_budget.BUDGETS["lecture"].update(num_predict=60, deadline=2.0, first_token=0.6)
+
+
+def run(budgeted):
+    server, base_url = start_server(
+        port=0, tokens=200, parallel=1, load_delay=0,
+        model_token_delay={"openhermes": 0.01, "llama3.2": 0.002}
+    )
+    gateway = LLMGateway(
+        client_factory=lambda model, **o: OllamaStreamingClient(model, client=HttpOllamaClient(base_url), **o),
+        scheduler=LLMScheduler(timeouts={})
+    )
+    llm = GatewayLLM("openhermes", call_type="lecture" if budgeted else None, gateway=gateway)
+    durations = []
+
+    def learner(i):
+        start = time.perf_counter()
+        llm.invoke(f"lecture {i}", fallback="(Zusammenfassung aus dem Katalog)")
+        durations.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=learner, args=(i,)) for i in range(LEARNERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+    durations.sort()
+    return durations[len(durations) // 2], durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+
+
+def main():
+    print(f"{LEARNERS} gleichzeitige Vorlesungen, Budget: Deadline 2,0 s, erstes Token 0,6 s, num_predict 60\n")
+    print("Variante     |   p50   |   p95   | Ausgang")
+    for name, budgeted in (("ohne Budget", False), ("mit Budget", True)):
+        p50, p95 = run(budgeted)
+        outcomes = latency_stats.summary().get("lecture", {}).get("outcomes", {}) if budgeted else {}
+        print(f"{name:12s} | {p50:5.2f} s | {p95:5.2f} s | {outcomes or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# --- benchmarks/bench_llm_cancellation.py ---
+# Lernende verlassen einen Schritt, während dessen Vorab-Generierung noch läuft
+# (⬅, Themenwechsel). Gemessen wird, wie viele Token der Fake-Ollama-Server danach
+# noch decodiert – ohne Abbruch (Generierung läuft zu Ende) und mit CancelToken.
+#
+#   python benchmarks/bench_llm_cancellation.py
+
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_gateway import LLMGateway, GatewayLLM, OllamaStreamingClient
+from utils.llm_scheduler import LLMScheduler
+from utils.pregeneration import PregenerationScheduler
+from benchmarks.fake_ollama_server import start_server, HttpOllamaClient
+
+SESSIONS = 5
+TOKENS = 200
+LEAVE_AFTER = 0.2  # Sekunden bis der Lernende den Schritt verlässt
+
+
+def run(cancel):
+    server, base_url = start_server(port=0, token_delay=0.005, tokens=TOKENS, parallel=SESSIONS, load_delay=0)
+    gateway = LLMGateway(
+        client_factory=lambda model, **o: OllamaStreamingClient(model, client=HttpOllamaClient(base_url), **o),
+        scheduler=LLMScheduler(default_concurrency=SESSIONS, timeouts={})
+    )
+    pregenerator = PregenerationScheduler(max_workers=SESSIONS)
+    llm = GatewayLLM("openhermes", gateway=gateway)
+
+    # Eine vollständige Generierung als Referenz für die erwartete Antwortlänge
+    llm.invoke("warm-up lecture")
+    decoded_before = server.state.tokens_decoded
+
+    run_ids = [str(uuid.uuid4()) for _ in range(SESSIONS)]
+    futures = []
+    for i, run_id in enumerate(run_ids):
+        pregenerator.schedule(run_id, "lecture", "digest", lambda i=i: llm.invoke(f"lecture {i}"))
+        futures.append(pregenerator._jobs[(run_id, "lecture")][1])
+    time.sleep(LEAVE_AFTER)
+    if cancel:
+        for run_id in run_ids:
+            pregenerator.discard_run(run_id)
+    for future in futures:
+        try:
+            future.result()
+        except Exception:
+            pass
+    time.sleep(0.2)  # Server die abgebrochenen Streams bemerken lassen
+    decoded = server.state.tokens_decoded - decoded_before
+    stats = gateway.stats()
+    server.shutdown()
+    return decoded, stats
+
+
+def main():
+    print(f"{SESSIONS} Vorab-Generierungen à {TOKENS} Token, Schritt nach {LEAVE_AFTER} s verlassen\n")
+    print("Variante     | decodierte Token | abgebrochen | gesparte Token (geschätzt)")
+    for name, cancel in (("ohne Abbruch", False), ("mit Abbruch", True)):
+        decoded, stats = run(cancel)
+        print(f"{name:12s} | {decoded:16d} | {stats['aborted']:11d} | {stats['tokens_saved']}")
+
+
+if __name__ == "__main__":
+    main()
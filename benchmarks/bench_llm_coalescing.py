@@ -0,0 +1,67 @@
+# --- benchmarks/bench_llm_coalescing.py ---
+# Simuliert eine Klasse, die gleichzeitig dasselbe Thema wählt: N identische Prompts
+# treffen auf einen Fake-Client (Token-Stream mit fester Latenz). Gezählt werden die
+# tatsächlichen Generierungen und die Wartezeit bis zum letzten Token.
+#
+#   python benchmarks/bench_llm_coalescing.py
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_gateway import LLMGateway
+
+TOKENS = 40
+TOKEN_DELAY = 0.01  # Sekunden pro Token
+MAX_PARALLEL = 2  # wie viele Generierungen der Fake-Server gleichzeitig bedient
+
+
+class FakeStreamingClient:
+    slots = threading.Semaphore(MAX_PARALLEL)
+
+    def __init__(self, model, **options):
+        self.calls = 0
+
+    def stream(self, prompt):
+        self.calls += 1
+        with self.slots:
+            for i in range(TOKENS):
+                time.sleep(TOKEN_DELAY)
+                yield f"tok{i} "
+
+
+def run(learners, coalesce):
+    gateway = LLMGateway(client_factory=FakeStreamingClient)
+    results = []
+
+    def learner(i):
+        if coalesce:
+            results.append(gateway.invoke("openhermes", "Introduce the topic: Muda"))
+        else:
+            client = FakeStreamingClient("openhermes")
+            results.append("".join(client.stream("Introduce the topic: Muda")))
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=learner, args=(i,)) for i in range(learners)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert len(set(results)) == 1
+    return elapsed, gateway.stats()
+
+
+def main():
+    print("Lernende | ohne Coalescing | mit Coalescing | Generierungen | zusammengelegt")
+    for learners in (1, 5, 20):
+        plain, _ = run(learners, coalesce=False)
+        shared, stats = run(learners, coalesce=True)
+        print(f"{learners:8d} | {plain * 1000:12.0f} ms | {shared * 1000:11.0f} ms | "
+              f"{stats['generations']:13d} | {stats['coalesced']:d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# --- benchmarks/bench_llm_scheduler.py ---
+# Lastszenario gegen den lokalen Fake-Ollama-Server: 8 Hintergrund-Zusammenfassungen
+# laufen schon, dann kommen 3 Chat-Antworten und 3 Tipps. Verglichen wird die Wartezeit
+# der interaktiven Anfragen ohne Scheduler (alle direkt an den Server) und mit Scheduler
+# (Prioritäten, 1 Platz pro Modell), dazu Queue-Timeouts mit Hinweismeldung.
+#
+#   python benchmarks/bench_llm_scheduler.py
+
+import os
+import sys
+import json
+import time
+import threading
+import statistics
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_gateway import LLMGateway, GatewayLLM
+from utils.llm_scheduler import LLMScheduler
+from benchmarks.fake_ollama_server import start_server
+
+
+def http_client_factory(base_url):
+    class HttpStreamingClient:
+        """Minimaler /api/generate-Client (NDJSON-Stream), wie OllamaLLM.stream()."""
+
+        def __init__(self, model, **options):
+            self.model = model
+            self.options = options
+
+        def stream(self, prompt):
+            body = json.dumps({"model": self.model, "prompt": prompt, "stream": True, "options": self.options}).encode("utf-8")
+            request = urllib.request.Request(f"{base_url}/api/generate", data=body, headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(request) as response:
+                for line in response:
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+
+    return HttpStreamingClient
+
+
+def run(base_url, scheduler):
+    gateway = LLMGateway(client_factory=http_client_factory(base_url), scheduler=scheduler)
+    latencies = {"chat": [], "hint": [], "background": []}
+    replies = []
+
+    def call(priority, i):
+        llm = GatewayLLM("openhermes", priority=priority, gateway=gateway)
+        start = time.perf_counter()
+        replies.append(llm.invoke(f"{priority} request {i}"))
+        latencies[priority].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=call, args=("background", i)) for i in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    interactive = [threading.Thread(target=call, args=(p, i)) for i in range(3) for p in ("chat", "hint")]
+    for t in interactive:
+        t.start()
+    for t in threads + interactive:
+        t.join()
+    return latencies, replies
+
+
+def main():
+    server, base_url = start_server(port=0, token_delay=0.005, tokens=40, parallel=1, load_delay=0)
+    print(f"Fake-Ollama: {base_url}\n")
+
+    unbounded = LLMScheduler(default_concurrency=1000, timeouts={})
+    scheduled = LLMScheduler(default_concurrency=1, timeouts={})
+    print("Variante        | chat p50 | hint p50 | background p50 | max. gleichzeitig am Server")
+    for name, scheduler in (("ohne Scheduler", unbounded), ("mit Scheduler", scheduled)):
+        server.state.max_concurrent = 0
+        latencies, _ = run(base_url, scheduler)
+        p50 = {k: statistics.median(v) * 1000 for k, v in latencies.items()}
+        print(f"{name:15s} | {p50['chat']:5.0f} ms | {p50['hint']:5.0f} ms | {p50['background']:11.0f} ms | {server.state.max_concurrent}")
+
+    tight = LLMScheduler(default_concurrency=1, timeouts={"chat": 10, "hint": 0.3, "background": 10})
+    _, replies = run(base_url, tight)
+    degraded = sum(1 for r in replies if r.startswith("⏳"))
+    print(f"\nMit 0,3 s Hint-Timeout: {degraded} Tipp(s) mit Hinweismeldung beantwortet")
+    print(json.dumps(tight.metrics(), indent=2, ensure_ascii=False))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# --- benchmarks/bench_map_reduce_summary.py ---
+# Themen-Zusammenfassungen wie in agent_topic_summary.py: ein Prompt mit allen Chunks eines
+# Themas gegen Map-Reduce mit Token-Budget. Der Fake-Ollama-Server berechnet das Einlesen des
+# Prompts pro Token mit quadratischem Anteil (CPU) und hat 4 parallele Plätze.
+# Ohne pypdf werden Chunks in der Größenordnung von "Chapter 3_Waste_Reduction.pdf"
+# (41 Seiten, ~120 Chunks à 1000 Zeichen, ungleich auf Themen verteilt) erzeugt.
+#
+#   python benchmarks/bench_map_reduce_summary.py [--pdf "pdfs/Chapter 3_Waste_Reduction.pdf"]
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from creator.map_reduce_summary import MapReduceSummarizer, LONG_PROMPT
+from creator.parallel_tasks import map_ordered
+from benchmarks.fake_ollama_server import start_server, HttpOllamaClient
+
+TOPIC_SIZES = [30, 20, 15, 12, 10, 8, 6, 5, 5, 4, 3, 2]  # Chunks pro Thema
+WORDS = "waste muda overproduction waiting transport inventory motion defects kaizen value stream flow pull".split()
+
+
+class FakeLLM:
+    def __init__(self, base_url, model="openhermes"):
+        self.client = HttpOllamaClient(base_url)
+        self.model = model
+
+    def invoke(self, prompt):
+        return self.client.generate(self.model, prompt, options={"num_predict": 40})["response"]
+
+
+def synthetic_topics():
+    random.seed(0)
+    chunk = lambda: " ".join(random.choice(WORDS) for _ in range(160))[:1000]
+    return {f"Topic {i + 1}": [chunk() for _ in range(n)] for i, n in enumerate(TOPIC_SIZES)}
+
+
+def pdf_topics(path):
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(PyPDFLoader(path).load())
+    texts = [c.page_content for c in chunks]
+    # Themen-Zuordnung ohne LLM: zusammenhängende Abschnitte in den Größen von TOPIC_SIZES
+    topics, start = {}, 0
+    for i, n in enumerate(TOPIC_SIZES):
+        size = max(1, round(n * len(texts) / sum(TOPIC_SIZES)))
+        if start < len(texts):
+            topics[f"Topic {i + 1}"] = texts[start:start + size]
+        start += size
+    return topics
+
+
+def run(topics, map_reduce, topic_workers):
+    server, base_url = start_server(port=0, tokens=40, token_delay=0.01, parallel=4, load_delay=0,
+                                    prompt_delay=0.0002, prompt_context=2048)
+    llm = FakeLLM(base_url)
+    summarizer = MapReduceSummarizer(llm, workers=4, retries=0)
+    start = time.perf_counter()
+    if map_reduce:
+        summarize = lambda item: summarizer.summarize(item[1], label=item[0])
+    else:
+        summarize = lambda item: llm.invoke(LONG_PROMPT.format(text="\n".join(item[1])))
+    map_ordered(summarize, topics.items(), workers=topic_workers, retries=0)
+    elapsed = time.perf_counter() - start
+    requests = server.state.requests
+    server.shutdown()
+    return elapsed, requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", default=None)
+    args = parser.parse_args()
+    topics = pdf_topics(args.pdf) if args.pdf else synthetic_topics()
+    print(f"{sum(len(t) for t in topics.values())} Chunks in {len(topics)} Themen\n")
+
+    results = {}
+    variants = (("ein Prompt, Themen nacheinander (bisher)", False, 1),
+                ("ein Prompt, 2 Themen parallel", False, 2),
+                ("Map-Reduce, 2 Themen parallel", True, 2))
+    for name, map_reduce, topic_workers in variants:
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")  # Fortschrittsausgaben von map_ordered unterdrücken
+        try:
+            results[name] = run(topics, map_reduce, topic_workers)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    baseline = results[variants[0][0]][0]
+    print("Variante                                 | Laufzeit | LLM-Aufrufe | Beschleunigung")
+    for name, (elapsed, requests) in results.items():
+        print(f"{name:40s} | {elapsed:6.1f} s | {requests:11d} | {baseline / elapsed:.1f}x")
+    print("\n(Map-Reduce erzeugt zusätzlich eine eigene Kurzfassung pro Thema)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# --- benchmarks/bench_model_residency.py ---
+# Simuliert Lernschritte gegen den Fake-Ollama-Server, der nur 2 Modelle gleichzeitig
+# hält (knapper Speicher): pro Schritt Antwort (openhermes), Bewertung (llama3.2) und
+# Embedding (mxbai-embed-large). Verglichen werden Ladevorgänge und Ladezeit ohne und
+# mit Residency-Manager (Aufwärmen, keep_alive, Umleitung der Bewertung aufs Chat-Modell).
+#
+#   python benchmarks/bench_model_residency.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_gateway import LLMGateway, GatewayLLM, OllamaStreamingClient
+from utils.llm_scheduler import LLMScheduler
+from utils.model_residency import residency, CHAT_MODEL, GRADER_MODEL, EMBEDDING_MODEL
+from benchmarks.fake_ollama_server import start_server, HttpOllamaClient
+
+TURNS = 10
+
+
+def run(managed):
+    server, base_url = start_server(port=0, token_delay=0.001, tokens=20, load_delay=0.3, max_loaded=2)
+    residency._client_factory = lambda: HttpOllamaClient(base_url)
+    residency._client = None
+    residency._last_ps = None
+    residency._resident = set()
+    residency._started = False
+    residency.load_events.clear()
+    residency.routed = 0
+    # Ohne Manager: kein Aufwärmen, Ollama-Standard-keep_alive, keine Umleitung
+    residency.min_free_mb = 10 ** 9 if managed else 0
+
+    gateway = LLMGateway(
+        client_factory=lambda model, **o: OllamaStreamingClient(model, client=HttpOllamaClient(base_url), **o),
+        scheduler=LLMScheduler(timeouts={})
+    )
+    chat = GatewayLLM(CHAT_MODEL, gateway=gateway)
+    grader = GatewayLLM(GRADER_MODEL, priority="grading", gateway=gateway)
+
+    start = time.perf_counter()
+    if managed:
+        residency.warm(CHAT_MODEL)
+        residency.warm(EMBEDDING_MODEL)
+    for turn in range(TURNS):
+        chat.invoke(f"reply {turn}")
+        grader.invoke(f"grade {turn}")
+        response = residency.client.embed(model=EMBEDDING_MODEL, input=f"save {turn}",
+                                          keep_alive=residency.keep_alive(EMBEDDING_MODEL) if managed else None)
+        residency.record_load(EMBEDDING_MODEL, response.get("load_duration"), "embedding")
+    elapsed = time.perf_counter() - start
+    loads = server.state.loads
+    server.shutdown()
+    return elapsed, loads, residency.stats()
+
+
+def main():
+    print(f"{TURNS} Lernschritte, 2 Modelle passen in den Speicher, 0,3 s pro Ladevorgang\n")
+    print("Variante         | Gesamtzeit | Ladevorgänge | Ladezeit (protokolliert) | umgeleitet")
+    for name, managed in (("ohne Residency", False), ("mit Residency", True)):
+        elapsed, loads, stats = run(managed)
+        print(f"{name:16s} | {elapsed:8.2f} s | {loads:12d} | {stats['load_seconds']:22.1f} s | {stats['routed']}")
+
+
+if __name__ == "__main__":
+    main()
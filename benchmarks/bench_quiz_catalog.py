@@ -0,0 +1,89 @@
+# --- benchmarks/bench_quiz_catalog.py ---
+# Mikro-Benchmark: Rerun-Latenz des Quizkatalogs mit 50 Themen.
+# Ein Rerun im Game-Modus lädt den Katalog 3× (show_themes, render_game_ui, Charakter).
+#
+#   python benchmarks/bench_quiz_catalog.py
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.catalog_bundle import write_topic_quiz
+from utils.load_quiz_data import QuizCatalogService
+
+TOPICS = 50
+QUESTIONS_PER_TOPIC = 10
+LOADS_PER_RERUN = 3
+RERUNS = 200
+
+
+def legacy_load_quiz_catalog(catalog_dir):
+    """Bisheriges Verhalten: bei jedem Aufruf alle Dateien listen und entpicklen."""
+    quiz_catalog = {}
+    for file in os.listdir(catalog_dir):
+        if file.endswith(".pkl"):
+            topic_name = file[:-4].replace("_", " ")
+            with open(os.path.join(catalog_dir, file), "rb") as f:
+                quiz_catalog[topic_name] = pickle.load(f)
+    return quiz_catalog
+
+
+def make_questions(t):
+    questions = []
+    for i in range(QUESTIONS_PER_TOPIC):
+        difficulty = ["easy", "medium", "hard"][i % 3]
+        q = {
+            "question": f"Topic {t} question {i}: " + "What is muda? " * 8,
+            "correct_answer": "A: Waste" if difficulty == "easy" else "Any activity without customer value. " * 4,
+            "difficulty": difficulty
+        }
+        if difficulty == "easy":
+            q["options"] = ["A: Waste", "B: Flow", "C: Pull"]
+        questions.append(q)
+    return questions
+
+
+def make_catalog(catalog_dir, bundle_path):
+    """Gleicher Inhalt einmal als Pickle-Verzeichnis (alt) und einmal als Bundle."""
+    for t in range(TOPICS):
+        questions = make_questions(t)
+        with open(os.path.join(catalog_dir, f"Topic_{t}.pkl"), "wb") as f:
+            pickle.dump(questions, f)
+        write_topic_quiz(f"Topic {t}", questions, path=bundle_path)
+
+
+def per_rerun_ms(load):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        for _ in range(LOADS_PER_RERUN):
+            load()
+    return (time.perf_counter() - start) / RERUNS * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        bundle_path = os.path.join(catalog_dir, "lean_catalog.db")
+        make_catalog(catalog_dir, bundle_path)
+
+        legacy = per_rerun_ms(lambda: legacy_load_quiz_catalog(catalog_dir))
+
+        # check_interval=0 → jede Anfrage prüft mtimes (ungünstigster Fall)
+        stat_service = QuizCatalogService(bundle_path, check_interval=0)
+        stat_service.catalog()
+        stat_only = per_rerun_ms(stat_service.catalog)
+
+        cached_service = QuizCatalogService(bundle_path)
+        cached_service.catalog()
+        cached = per_rerun_ms(cached_service.catalog)
+
+        print(f"📊 {TOPICS} Themen × {QUESTIONS_PER_TOPIC} Fragen, {LOADS_PER_RERUN} Katalogzugriffe pro Rerun")
+        print(f"  bisher (alles entpicklen):      {legacy:8.3f} ms/Rerun")
+        print(f"  Service, mtime-Prüfung je Call: {stat_only:8.3f} ms/Rerun")
+        print(f"  Service, Prüfintervall {cached_service.check_interval:.0f}s:     {cached:8.3f} ms/Rerun")
+
+
+if __name__ == "__main__":
+    main()
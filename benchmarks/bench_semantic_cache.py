@@ -0,0 +1,65 @@
+# --- benchmarks/bench_semantic_cache.py ---
+# Eine Klasse stellt dem Manager zum selben Thema viele leicht abgewandelte Fragen.
+# Gezählt werden LLM-Aufrufe und Trefferquote mit dem semantischen Antwort-Cache.
+# Statt mxbai-embed-large wird ein Bag-of-Words-Embedding verwendet (kein Ollama nötig).
+#
+#   python benchmarks/bench_semantic_cache.py
+
+import os
+import re
+import sys
+import zlib
+import random
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.semantic_cache import SemanticAnswerCache
+
+DIMENSIONS = 256
+STOPWORDS = {"what", "is", "the", "a", "an", "me", "please", "can", "you", "of", "about", "explain", "tell", "again", "in", "lean"}
+QUESTIONS = {
+    "Muda": [
+        "What is muda?", "what is Muda", "Explain muda please", "Can you explain muda?",
+        "What are the 7 wastes?", "explain the 7 wastes", "Tell me about the seven wastes",
+        "What is overproduction waste?", "Explain overproduction", "What is waiting waste?"
+    ],
+    "Kanban": [
+        "What is kanban?", "Explain kanban", "How does a kanban board work?", "kanban board explained",
+        "What is a WIP limit?", "Explain WIP limits", "What does pull system mean?"
+    ]
+}
+
+
+def bag_of_words(text):
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        if word not in STOPWORDS:
+            vector[zlib.crc32(word.encode()) % DIMENSIONS] += 1.0
+    return vector
+
+
+def main():
+    random.seed(0)
+    cache = SemanticAnswerCache(embed=bag_of_words, threshold=0.85)
+    calls = 0
+
+    def generate(question):
+        nonlocal calls
+        calls += 1
+        return f"answer to {question}"
+
+    asked = 0
+    for _ in range(30):  # 30 Lernende
+        for topic, questions in QUESTIONS.items():
+            for question in random.sample(questions, 3):
+                cache.get_or_answer("manager", topic, question, generate)
+                asked += 1
+
+    print(f"{asked} Fragen, {calls} LLM-Aufrufe ({1 - calls / asked:.0%} eingespart)")
+    for topic, s in cache.stats().items():
+        print(f"  {topic:8s} Trefferquote {s['hit_rate']:.0%}  Einträge {s['entries']}")
+
+
+if __name__ == "__main__":
+    main()
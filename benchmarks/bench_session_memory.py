@@ -0,0 +1,107 @@
+# --- benchmarks/bench_session_memory.py ---
+# Speicherbericht: Bytes pro Session mit 100 simulierten Sessions (Professor, Detective, Colleague).
+# "vorher" bildet die alten Session-States nach (Katalogkopien bzw. Fragen-Dicts im State),
+# "nachher" die heutigen States mit Frage-IDs. Der geteilte Katalog zählt nicht zur Session.
+#
+#   python benchmarks/bench_session_memory.py
+
+import os
+import gc
+import sys
+import random
+import pickle
+import tempfile
+from types import ModuleType
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.load_quiz_data import QuizCatalogService
+from benchmarks.bench_quiz_catalog import make_catalog, legacy_load_quiz_catalog
+
+SESSIONS = 100
+
+
+def deep_sizeof(obj, seen):
+    """Summe von sys.getsizeof über alle erreichbaren Objekte, die noch nicht in `seen` sind."""
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, ModuleType)):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        stack.extend(gc.get_referents(o))
+    return size
+
+
+def legacy_sessions(catalog_dir, topic):
+    sessions = []
+    for _ in range(SESSIONS):
+        catalog = legacy_load_quiz_catalog(catalog_dir)  # jede Session lud ihre eigene Kopie
+        professor = {
+            "step": "ask_question",
+            "catalog": catalog,
+            "question_queue": random.sample([q for q in catalog[topic] if q["difficulty"] == "easy"], 3),
+            "current_question": None,
+            "feedback_log": []
+        }
+        detective_catalog = legacy_load_quiz_catalog(catalog_dir)
+        detective = {
+            "quiz_catalog": detective_catalog,
+            "questions": sorted(detective_catalog[topic], key=lambda q: ["easy", "medium", "hard"].index(q["difficulty"])),
+            "question_index": 0
+        }
+        colleague = {
+            "colleague_remaining_questions": legacy_load_quiz_catalog(catalog_dir)[topic].copy(),
+            "colleague_used_questions": set()
+        }
+        sessions.append((professor, detective, colleague))
+    return sessions
+
+
+def current_sessions(service, topic):
+    index = service.index()
+    sessions = []
+    for _ in range(SESSIONS):
+        professor = {
+            "step": "ask_question",
+            "question_queue": index.sample(index.bucket(topic, "easy"), 3),
+            "current_question": None,
+            "feedback_log": []
+        }
+        detective = {
+            "question_ids": index.ordered_by_difficulty(topic)[:4],
+            "question_index": 0
+        }
+        colleague = {"colleague_used_ids": set()}
+        sessions.append((professor, detective, colleague))
+    return sessions
+
+
+def main():
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        bundle_path = os.path.join(catalog_dir, "lean_catalog.db")
+        make_catalog(catalog_dir, bundle_path)
+        topic = "Topic 0"
+
+        before = legacy_sessions(catalog_dir, topic)
+        before_bytes = deep_sizeof(before, set()) / SESSIONS
+
+        service = QuizCatalogService(bundle_path)
+        index = service.index()
+        for t in index.topics:
+            index.bucket(t)
+        shared = set()
+        shared_bytes = deep_sizeof((service.catalog(), index, index.questions), shared)
+        after = current_sessions(service, topic)
+        after_bytes = deep_sizeof(after, shared) / SESSIONS
+
+        print(f"📊 {SESSIONS} Sessions (Professor + Detective + Colleague), Katalog mit {len(index.topics)} Themen")
+        print(f"  vorher:  {before_bytes:12,.0f} Bytes pro Session")
+        print(f"  nachher: {after_bytes:12,.0f} Bytes pro Session")
+        print(f"  geteilter Katalog + Index (einmal pro Prozess): {shared_bytes:,.0f} Bytes")
+        print(f"  pickle-Größe pro Session: vorher {len(pickle.dumps(before[0])):,} B, nachher {len(pickle.dumps(after[0])):,} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# --- benchmarks/bench_step_cache.py ---
+# Zählt LLM-Aufrufe pro abgeschlossener Session bei unterschiedlich vielen Reruns.
+# Simuliert den Professor-Ablauf (lecture → 5 Fragen → reflect) und den Detective-Abschluss;
+# jeder Rerun führt den aktuellen Schritt erneut aus, wie Streamlit es tut.
+#
+#   python benchmarks/bench_step_cache.py
+
+import os
+import sys
+import uuid
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.step_cache import StepOutputCache
+
+
+def simulate_session(cache, reruns_per_step, calls):
+    run_id = str(uuid.uuid4())
+
+    def fake_llm(kind):
+        calls[kind] += 1
+        return f"{kind} output"
+
+    for _ in range(reruns_per_step):
+        cache.get_or_generate(run_id, "lecture", {"topic": "Muda", "level": "easy"}, lambda: fake_llm("lecture"))
+
+    feedback_log = []
+    for i in range(5):
+        feedback_log.append(f"Q{i} → answer → feedback")
+    for _ in range(reruns_per_step):
+        inputs = {"topic": "Muda", "level": "easy", "correct_count": 3, "feedback_log": feedback_log}
+        cache.get_or_generate(run_id, "reflect", inputs, lambda: fake_llm("reflect"))
+
+    # Zwei gleichzeitige Reruns im selben Schritt (Doppelklick)
+    threads = [
+        threading.Thread(target=cache.get_or_generate, args=(run_id, "case_summary", {"results": ["a"]}, lambda: fake_llm("case_summary")))
+        for _ in range(2)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return cache.generation_count(run_id)
+
+
+def main():
+    print("Reruns/Schritt | LLM-Aufrufe pro Session")
+    for reruns in (1, 5, 20, 100):
+        calls = {"lecture": 0, "reflect": 0, "case_summary": 0}
+        count = simulate_session(StepOutputCache(), reruns, calls)
+        print(f"{reruns:14d} | {count} ({calls})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# --- benchmarks/bench_topic_store.py ---
+# Bisheriges Layout (ein Chroma-Ordner pro Thema, Chroma.from_documents in einer Schleife)
+# gegen eine gemeinsame Collection mit Metadatum "topic" und Batch-Schreibvorgängen.
+# Gemessen werden Aufbau, Öffnen + erste Abfrage pro Thema (wie der Quiz-Creator) und
+# warme Abfragen. Statt mxbai-embed-large wird ein Hash-Embedding verwendet (kein Ollama nötig).
+#
+#   python benchmarks/bench_topic_store.py [--topics 40] [--chunks 30]
+
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from utils.topic_retrieval import open_topic_store, replace_topic_documents
+
+DIMENSIONS = 256
+WORDS = "waste muda overproduction waiting transport inventory motion defects kaizen value stream flow pull takt".split()
+
+
+class HashEmbeddings(Embeddings):
+    def _embed(self, text):
+        vector = [0.0] * DIMENSIONS
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % DIMENSIONS] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_topics(n_topics, n_chunks):
+    random.seed(0)
+    return {
+        f"Topic {t}": [Document(page_content=" ".join(random.choice(WORDS) for _ in range(150)) + f" topic{t} chunk{c}")
+                       for c in range(n_chunks)]
+        for t in range(n_topics)
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def per_directory(base, topics, embedding):
+    folder = lambda topic: topic.replace(" ", "_")
+    build = timed(lambda: [
+        Chroma.from_documents(documents=docs, embedding=embedding, persist_directory=os.path.join(base, folder(topic)),
+                              collection_name=folder(topic))
+        for topic, docs in topics.items()
+    ])
+    stores = {}
+
+    def open_and_query():
+        for topic in topics:
+            stores[topic] = Chroma(persist_directory=os.path.join(base, folder(topic)), embedding_function=embedding,
+                                   collection_name=folder(topic))
+            stores[topic].similarity_search("What is muda?", k=4)
+
+    cold = timed(open_and_query)
+    warm = timed(lambda: [stores[topic].similarity_search("What is kaizen?", k=4) for topic in topics])
+    return build, cold, warm
+
+
+def single_collection(base, topics, embedding):
+    store = open_topic_store(embedding, base)
+    build = timed(lambda: [replace_topic_documents(store, topic, docs) for topic, docs in topics.items()])
+    holder = {}
+
+    def open_and_query():
+        holder["store"] = open_topic_store(embedding, base)
+        for topic in topics:
+            holder["store"].similarity_search("What is muda?", k=4, filter={"topic": topic})
+
+    cold = timed(open_and_query)
+    warm = timed(lambda: [holder["store"].similarity_search("What is kaizen?", k=4, filter={"topic": topic})
+                          for topic in topics])
+    return build, cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--topics", type=int, default=40)
+    parser.add_argument("--chunks", type=int, default=30)
+    args = parser.parse_args()
+    topics = make_topics(args.topics, args.chunks)
+    embedding = HashEmbeddings()
+    print(f"{args.topics} Themen × {args.chunks} Chunks\n")
+    print("Layout              | Aufbau  | Öffnen + 1. Abfrage je Thema | warme Abfragen")
+    for name, variant in (("Ordner pro Thema", per_directory), ("eine Collection", single_collection)):
+        with tempfile.TemporaryDirectory() as base:
+            build, cold, warm = variant(base, topics, embedding)
+        print(f"{name:19s} | {build:5.2f} s | {cold:26.2f} s | {warm:12.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# --- benchmarks/fake_ollama_server.py ---
+# Lokaler Ersatz für den Ollama-Server zum Testen von Scheduler & Co. ohne echte Modelle.
+# Bedient /api/generate, /api/chat, /api/embed, /api/embeddings, /api/tags und /api/ps mit
+# künstlicher Latenz; wie Ollama auf einer CPU decodiert er nur `parallel` Anfragen
+# gleichzeitig, der Rest wartet. Es bleiben höchstens `max_loaded` Modelle geladen
+# (keep_alive wird beachtet); jeder Ladevorgang kostet `load_delay` und erscheint als load_duration.
+# Optional kostet das Einlesen des Prompts `prompt_delay` pro Token (~4 Zeichen), mit einem
+# quadratischen Anteil ab `prompt_context` Tokens (Attention auf der CPU).
+#
+#   python benchmarks/fake_ollama_server.py [--port 11435] [--token-delay 0.02] [--parallel 1] [--max-loaded 3]
+#   OLLAMA_HOST=http://127.0.0.1:11435 streamlit run app.py
+
+import json
+import time
+import argparse
+import urllib.request
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_PORT = 11435
+
+
+class FakeOllamaState:
+    def __init__(self, token_delay=0.02, tokens=40, parallel=1, embed_delay=0.01, load_delay=0.5, max_loaded=3, model_token_delay=None,
+                 prompt_delay=0.0, prompt_context=2048):
+        self.token_delay = token_delay
+        self.prompt_delay = prompt_delay
+        self.prompt_context = prompt_context
+        self.model_token_delay = dict(model_token_delay or {})  # langsamere/schnellere Modelle
+        self.load_delay = load_delay
+        self.max_loaded = max_loaded
+        self.loaded = OrderedDict()  # Modell -> Ablaufzeitpunkt (LRU)
+        self.loads = 0
+        self.tokens = tokens
+        self.embed_delay = embed_delay
+        self.slots = threading.Semaphore(parallel)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.tokens_decoded = 0
+        self.max_concurrent = 0
+        self._active = 0
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+
+    def leave(self):
+        with self.lock:
+            self._active -= 1
+
+    def ensure_loaded(self, model, keep_alive=None) -> int:
+        """Lädt das Modell bei Bedarf (verdrängt das älteste); gibt load_duration in ns zurück."""
+        seconds = _keep_alive_seconds(keep_alive)
+        now = time.monotonic()
+        with self.lock:
+            for name in [m for m, expires in self.loaded.items() if expires < now]:
+                del self.loaded[name]
+            hit = model in self.loaded
+            if not hit:
+                while len(self.loaded) >= self.max_loaded:
+                    self.loaded.popitem(last=False)
+                self.loads += 1
+            self.loaded[model] = now + seconds
+            self.loaded.move_to_end(model)
+        if hit:
+            return 1_000_000
+        time.sleep(self.load_delay)
+        return int(self.load_delay * 1e9)
+
+    def prefill_seconds(self, request) -> float:
+        text = request.get("prompt") or "".join(m.get("content", "") for m in request.get("messages") or [])
+        n = len(text) / 4
+        return self.prompt_delay * n * (1 + n / self.prompt_context)
+
+
+def _keep_alive_seconds(value) -> float:
+    if value is None:
+        return 300.0
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    value = str(value)
+    if value.startswith("-"):
+        return float("inf")
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def state(self) -> FakeOllamaState:
+        return self.server.state
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "openhermes:latest"}, {"name": "llama3.2:latest"}, {"name": "mxbai-embed-large:latest"}]})
+        elif self.path == "/api/ps":
+            with self.state.lock:
+                loaded = list(self.state.loaded)
+            self._send_json({"models": [{"name": f"{m}:latest", "model": f"{m}:latest"} for m in loaded]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path in ("/api/generate", "/api/chat"):
+            self._generate(request, chat=self.path == "/api/chat")
+        elif self.path in ("/api/embed", "/api/embeddings"):
+            self._embed(request, legacy=self.path == "/api/embeddings")
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _chunk(self, request, text, chat, done, **extra):
+        payload = {"model": request.get("model"), "done": done, **extra}
+        if chat:
+            payload["message"] = {"role": "assistant", "content": text}
+        else:
+            payload["response"] = text
+        return payload
+
+    def _generate(self, request, chat):
+        state = self.state
+        tokens = min(state.tokens, (request.get("options") or {}).get("num_predict") or state.tokens)
+        stream = request.get("stream", True)
+        state.enter()
+        start = time.perf_counter()
+        try:
+            with state.slots:
+                load_duration = state.ensure_loaded(request.get("model"), request.get("keep_alive"))
+                if not request.get("prompt") and not request.get("messages"):
+                    # Leerer Prompt: Modell nur laden (wie bei Ollama)
+                    self._send_json(self._chunk(request, "", chat, True, done_reason="load", load_duration=load_duration))
+                    return
+                time.sleep(state.prefill_seconds(request))
+                if stream:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                words = []
+                delay = state.model_token_delay.get(request.get("model"), state.token_delay)
+                for i in range(tokens):
+                    time.sleep(delay)
+                    with state.lock:
+                        state.tokens_decoded += 1
+                    word = f"tok{i} "
+                    words.append(word)
+                    if stream:
+                        self._write_chunk(self._chunk(request, word, chat, False))
+                stats = {"eval_count": tokens, "load_duration": load_duration, "total_duration": int((time.perf_counter() - start) * 1e9)}
+                if stream:
+                    self._write_chunk(self._chunk(request, "", chat, True, done_reason="stop", **stats))
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    self._send_json(self._chunk(request, "".join(words), chat, True, done_reason="stop", **stats))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client hat den Stream abgebrochen
+        finally:
+            state.leave()
+
+    def _write_chunk(self, payload):
+        data = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _embed(self, request, legacy):
+        state = self.state
+        inputs = request.get("prompt") if legacy else request.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        state.enter()
+        try:
+            with state.slots:
+                load_duration = state.ensure_loaded(request.get("model"), request.get("keep_alive"))
+                time.sleep(state.embed_delay * max(1, len(inputs)))
+            vectors = [[float(len(text) % 7), 1.0, 0.5] for text in inputs]
+            if legacy:
+                self._send_json({"embedding": vectors[0] if vectors else []})
+            else:
+                self._send_json({"model": request.get("model"), "embeddings": vectors, "load_duration": load_duration})
+        finally:
+            state.leave()
+
+
+class HttpOllamaClient:
+    """Minimaler Ersatz für ollama.Client (generate/embed/ps) für Benchmarks ohne das Paket."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            f"{self.base_url}{path}", data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        return urllib.request.urlopen(request)
+
+    def generate(self, model, prompt="", stream=False, options=None, keep_alive=None):
+        payload = {"model": model, "prompt": prompt, "stream": stream, "options": options, "keep_alive": keep_alive}
+        if not stream or not prompt:
+            with self._post("/api/generate", payload) as response:
+                return json.loads(response.read())
+        return self._stream(payload)
+
+    def _stream(self, payload):
+        with self._post("/api/generate", payload) as response:
+            for line in response:
+                yield json.loads(line)
+
+    def embed(self, model, input, keep_alive=None):
+        with self._post("/api/embed", {"model": model, "input": input, "keep_alive": keep_alive}) as response:
+            return json.loads(response.read())
+
+    def ps(self):
+        with urllib.request.urlopen(f"{self.base_url}/api/ps") as response:
+            return json.loads(response.read())
+
+
+def start_server(port=DEFAULT_PORT, **state_options):
+    """Startet den Fake-Server in einem Hintergrund-Thread; gibt (server, base_url) zurück."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOllamaHandler)
+    server.daemon_threads = True
+    server.state = FakeOllamaState(**state_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake-Ollama-Server mit künstlicher Latenz.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--load-delay", type=float, default=0.5)
+    parser.add_argument("--max-loaded", type=int, default=3)
+    args = parser.parse_args()
+    server, url = start_server(
+        args.port, token_delay=args.token_delay, tokens=args.tokens, parallel=args.parallel,
+        load_delay=args.load_delay, max_loaded=args.max_loaded
+    )
+    print(f"🧪 Fake-Ollama läuft auf {url} (Strg+C zum Beenden)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
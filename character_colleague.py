@@ -1,12 +1,13 @@
 import streamlit as st
-import random
 import uuid
+from contextlib import closing
 from langchain.prompts import PromptTemplate
-from langchain_ollama import OllamaLLM
 
-from utils.load_quiz_data import load_quiz_catalog
-from utils.feedback_tools import get_feedback
+from utils.load_quiz_data import get_quiz_index
+from utils.feedback_tools import get_feedback, get_topic_summary
 from utils.chat_history_memory import save_message, retrieve_similar_history
+from utils.llm_gateway import GatewayLLM
+from utils.step_cache import run_foreground
 
 # === Prompts ===
 intro_prompt = PromptTemplate.from_template("""
@@ -56,16 +57,17 @@ def run_colleague_mode_streamlit():
         st.error("❗ Kein Thema ausgewählt. Bitte zuerst ein Thema wählen.")
         return
 
-    llm = OllamaLLM(model="openhermes")
+    llm = GatewayLLM("openhermes", call_type="chat")
     session_id = st.session_state.get("colleague_session_id", str(uuid.uuid4()))
     st.session_state.colleague_session_id = session_id
 
     # Reset bei Themenwechsel
     if st.session_state.get("colleague_topic") != current_topic:
-        for k in ["colleague_topic", "colleague_messages", "colleague_remaining_questions", "colleague_used_questions", "colleague_response_count", "colleague_correct_streak", "colleague_difficulty_index"]:
+        for k in ["colleague_topic", "colleague_messages", "colleague_used_ids", "colleague_response_count", "colleague_correct_streak", "colleague_difficulty_index"]:
             st.session_state.pop(k, None)
         st.session_state.colleague_topic = current_topic
-        intro = llm.invoke(intro_prompt.format(topic=current_topic))
+        intro = run_foreground(session_id, lambda: llm.invoke(
+            intro_prompt.format(topic=current_topic), fallback=f"Let's talk about {current_topic}! {get_topic_summary(current_topic)}"))
         st.session_state.colleague_messages = [f"💬 Colleague: {intro}"]
         save_message("colleague", intro, session_id=session_id)
 
@@ -73,10 +75,8 @@ def run_colleague_mode_streamlit():
 
     if "colleague_messages" not in st.session_state:
         st.session_state.colleague_messages = []
-    if "colleague_remaining_questions" not in st.session_state:
-        quiz_catalog = load_quiz_catalog()
-        st.session_state.colleague_remaining_questions = quiz_catalog.get(topic, []).copy()
-        st.session_state.colleague_used_questions = set()
+    if "colleague_used_ids" not in st.session_state:
+        st.session_state.colleague_used_ids = set()
         st.session_state.colleague_response_count = 0
         st.session_state.colleague_correct_streak = 0
         st.session_state.colleague_difficulty_index = 0
@@ -97,26 +97,28 @@ def run_colleague_mode_streamlit():
         if st.session_state.colleague_response_count % 2 == 0:
             difficulty_levels = ["easy", "medium", "hard"]
             difficulty = difficulty_levels[st.session_state.colleague_difficulty_index]
-            remaining = st.session_state.colleague_remaining_questions
-            questions = [q for q in remaining if q["difficulty"] == difficulty] or remaining
-
-            if questions:
-                q = random.choice(questions)
-                remaining.remove(q)
-                st.session_state.colleague_used_questions.add(q["question"])
-                response = llm.invoke(quiz_chat_prompt_template.format(
+            quiz_index = get_quiz_index()
+            used = st.session_state.colleague_used_ids
+            qid = quiz_index.draw(quiz_index.bucket(topic, difficulty), used) or quiz_index.draw(quiz_index.bucket(topic), used)
+
+            if qid is not None:
+                q = quiz_index.get(qid)
+                used.add(qid)
+                # Gestreamt: ein Rerun beendet st.write_stream; closing schließt den Stream sofort
+                with closing(llm.stream(quiz_chat_prompt_template.format(
                     topic=topic,
                     message=user_input,
                     difficulty=difficulty,
                     history=context,
                     question=q["question"]
-                ))
+                ))) as stream:
+                    response = st.write_stream(stream)
                 st.session_state.colleague_messages.append(f"💬 Colleague: {response}")
                 save_message("colleague", q["question"], session_id=session_id)
 
                 answer = st.text_input("Deine Antwort:", key=f"answer_{st.session_state.colleague_response_count}")
                 if answer:
-                    correct, feedback = get_feedback(q["question"], q["correct_answer"], answer)
+                    correct, feedback = run_foreground(session_id, lambda: get_feedback(q["question"], q["correct_answer"], answer))
                     if correct:
                         st.success("✅ Richtig! Frag mich was!")
                         st.session_state.colleague_correct_streak += 1
@@ -133,11 +135,12 @@ def run_colleague_mode_streamlit():
             else:
                 st.info("🎉 Alle Fragen für dieses Thema sind beantwortet!")
         else:
-            reply = llm.invoke(chat_prompt_template.format(
+            with closing(llm.stream(chat_prompt_template.format(
                 topic=topic,
                 message=user_input,
                 history=context
-            ))
+            ))) as stream:
+                reply = st.write_stream(stream)
             st.session_state.colleague_messages.append(f"💬 Colleague: {reply}")
             save_message("colleague", reply, session_id=session_id)
 
@@ -1,29 +1,31 @@
 import streamlit as st
 import random
 import uuid
-from langchain_ollama import OllamaLLM
 from langchain.prompts import PromptTemplate
 
-from utils.load_quiz_data import load_quiz_catalog
+from utils.load_quiz_data import get_quiz_index, get_catalog_service
 from utils.feedback_tools import get_feedback, get_progressive_hint
 from utils.topic_selector import get_available_topics
 from utils.chat_history_memory import save_message, retrieve_similar_history
+from utils.llm_gateway import GatewayLLM
+from utils.step_cache import cached_step, pregenerate_step, poll_step, run_foreground, discard_run
 
-# === Prompts ===
-story_prompt = PromptTemplate.from_template("""
-You are Inspector Kaizen – a legendary Lean Production detective summoned to investigate hidden inefficiencies.
+# === Einstellungen ===
+PERSONALIZE_BRIEFING = True  # Bezug auf frühere Fälle asynchron nachreichen
+
+# Vorab-Generierungen (Ergänzung der Fallbeschreibung, Fallabschluss) warten hinter Anfragen der Lernenden
+background_llm = GatewayLLM("openhermes", priority="background", call_type="reflection")
 
-Based on the following selected clues, generate a story-style case briefing for the inspector:
-- Each clue is a Lean-related challenge described as a question.
-- Mention the domains/topics if available.
-- Use storytelling style, grounded in industrial reality.
-- Include one reference to a prior case if relevant: {history_snippets}
-- End with a call to action that the inspector must investigate 4 specific areas.
+# === Prompts ===
+personalize_prompt = PromptTemplate.from_template("""
+You are Inspector Kaizen. This is the briefing of your new case:
+{story}
 
-Selected clues:
-{clues}
+Notes from prior cases:
+{history_snippets}
 
-Return ONLY the case narrative.
+Write 1–2 sentences that connect the new case to one of the prior cases.
+Return only these sentences.
 """)
 
 summary_prompt = PromptTemplate.from_template("""
@@ -41,39 +43,73 @@ Clue results:
 Return only the summary text.
 """)
 
+def _generate_case_summary(llm, clue_results, session_id):
+    clue_summary = "\n".join(clue_results)
+    history_snippets = "\n".join(retrieve_similar_history("detective summary", k=2, role="detective", session_id=session_id))
+    return llm.invoke(summary_prompt.format(results=clue_summary, history_snippets=history_snippets))
+
+def _template_briefing(topic, story_clues):
+    """Sofort verfügbare Fallbeschreibung ohne LLM, falls die Bibliothek für das Thema leer ist."""
+    return (
+        f"🕵️ A new case has landed on Inspector Kaizen's desk: hidden inefficiencies around *{topic}*.\n\n"
+        f"Four clues need investigating:\n{story_clues}\n\n"
+        "Start with the first clue – the shopfloor is waiting."
+    )
+
+def _pick_briefing(quiz_index, topic):
+    """Zufällige Fallbeschreibung aus der Bibliothek, deren Hinweise noch im Katalog stehen."""
+    topic_ids = set(quiz_index.bucket(topic))
+    briefings = [b for b in get_catalog_service().case_briefings(topic) if set(b["clue_ids"]) <= topic_ids]
+    return random.choice(briefings) if briefings else None
+
+def _generate_briefing_addon(llm, story):
+    """
+    Läuft im Hintergrund: ergänzt die angezeigte Fallbeschreibung (Bibliothek oder Vorlage) um
+    1–2 Sätze Bezug auf frühere Fälle. Der Fall selbst wird nicht noch einmal erzählt.
+    """
+    history_snippets = "\n".join(retrieve_similar_history("lean detective case", k=2, role="detective"))
+    if not history_snippets.strip():
+        return ""
+    return llm.invoke(personalize_prompt.format(story=story, history_snippets=history_snippets))
+
 # === Main Streamlit Function ===
 def run_detective_mode_streamlit():
     st.markdown("## 🕵️ Lean Detective")
-    llm = OllamaLLM(model="openhermes")
+    llm = GatewayLLM("openhermes", call_type="reflection")
     session_id = st.session_state.get("detective_session_id", str(uuid.uuid4()))
     st.session_state.detective_session_id = session_id
 
     difficulty_levels = ["easy", "medium", "hard"]
 
     if "detective_state" not in st.session_state:
-        quiz_catalog = load_quiz_catalog()
+        quiz_index = get_quiz_index()
+        topic_sizes = get_catalog_service().topic_sizes()
         selected_topic = st.session_state.get("current_topic")
 
-        if selected_topic and selected_topic in quiz_catalog and len(quiz_catalog[selected_topic]) >= 4:
-            sorted_questions = sorted(
-                quiz_catalog[selected_topic],
-                key=lambda q: ["easy", "medium", "hard"].index(q.get("difficulty", "medium"))
-            )
-            story_clues = "\n".join([f"- ({q['difficulty'].title()}) {q['question']} [{selected_topic}]" for q in sorted_questions[:4]])
-            history_snippets = "\n".join(retrieve_similar_history("lean detective case", k=2, role="detective"))
-
-            with st.spinner("🧠 Generiere Fallbeschreibung..."):
-                story = llm.invoke(story_prompt.format(
-                    clues=story_clues,
-                    history_snippets=history_snippets
-                ))
+        if selected_topic and topic_sizes.get(selected_topic, 0) >= 4:
+            # Fallbeschreibung aus der Bibliothek (creator/agent_case_briefings.py) – kein Warten aufs LLM
+            briefing = _pick_briefing(quiz_index, selected_topic)
+            clue_ids = briefing["clue_ids"] if briefing else quiz_index.ordered_by_difficulty(selected_topic)[:4]
+            clues = [quiz_index.get(qid) for qid in clue_ids]
+            story_clues = "\n".join([f"- ({q['difficulty'].title()}) {q['question']} [{selected_topic}]" for q in clues])
+            story = briefing["story"] if briefing else _template_briefing(selected_topic, story_clues)
+
+            run_id = str(uuid.uuid4())
+            briefing_inputs = {"topic": selected_topic, "clue_ids": clue_ids, "from_library": briefing is not None}
+            if PERSONALIZE_BRIEFING:
+                pregenerate_step(
+                    run_id, "briefing_addon", briefing_inputs,
+                    lambda: _generate_briefing_addon(background_llm, story)
+                )
 
             st.session_state.detective_state = {
+                "run_id": run_id,  # Schlüssel für den Step-Cache dieses Falls
+                "briefing_inputs": briefing_inputs,
+                "briefing_addon_shown": not PERSONALIZE_BRIEFING,
                 "step": "show_clue",
-                "quiz_catalog": quiz_catalog,
                 "topics": [selected_topic],
                 "topic": selected_topic,
-                "questions": sorted_questions,
+                "question_ids": clue_ids,
                 "difficulty_index": 0,
                 "log": [("detective", story)],
                 "clue_results": [],
@@ -83,16 +119,16 @@ def run_detective_mode_streamlit():
                 "last_result": None
             }
 
-            save_message("detective", story)
+            save_message("detective", story, session_id=session_id)
             st.rerun()
         else:
-            topics = [t for t, qs in quiz_catalog.items() if qs and len(qs) >= 4]
+            topics = [t for t, count in topic_sizes.items() if count >= 4]
             st.session_state.detective_state = {
+                "run_id": str(uuid.uuid4()),
                 "step": "select_topic",
-                "quiz_catalog": quiz_catalog,
                 "topics": topics,
                 "topic": None,
-                "questions": [],
+                "question_ids": [],
                 "difficulty_index": 0,
                 "log": [],
                 "clue_results": [],
@@ -104,6 +140,15 @@ def run_detective_mode_streamlit():
 
     state = st.session_state.detective_state
 
+    # Asynchron ergänzte Fallbeschreibung übernehmen, sobald sie fertig ist
+    if not state.get("briefing_addon_shown", True):
+        addon = poll_step(state["run_id"], "briefing_addon", state["briefing_inputs"])
+        if addon is not None:
+            state["briefing_addon_shown"] = True
+            if addon.strip():
+                state["log"].append(("detective", f"🗂️ {addon.strip()}"))
+                save_message("detective", addon, session_id=session_id)
+
     if state.get("topic"):
         st.markdown(f"🧩 **Fallthema:** _{state['topic']}_")
 
@@ -115,18 +160,28 @@ def run_detective_mode_streamlit():
         )
 
     if state["question_index"] >= 4:
-        clue_summary = "\n".join(state["clue_results"])
-        history_snippets = "\n".join(retrieve_similar_history("detective summary", k=2, role="detective", session_id=session_id))
-        summary = llm.invoke(summary_prompt.format(results=clue_summary, history_snippets=history_snippets))
-        save_message("detective", summary, session_id=session_id)
-        state["log"].append(("detective", summary))
+        if state["step"] != "case_closed":
+            summary = cached_step(
+                state["run_id"], "case_summary", {"results": state["clue_results"]},
+                lambda: _generate_case_summary(llm, state["clue_results"], session_id)
+            )
+            save_message("detective", summary, session_id=session_id)
+            state["log"].append(("detective", summary))
+            state["step"] = "case_closed"
+            st.rerun()
         st.success("✅ Fall abgeschlossen!")
         if st.button("🔁 Neuer Fall starten"):
+            discard_run(state["run_id"])
             del st.session_state.detective_state
             st.rerun()
         return
 
-    q = state["questions"][state["question_index"]]
+    quiz_index = get_quiz_index()
+    q = quiz_index.get(state["question_ids"][state["question_index"]])
+    if q is None:
+        # Frage ist nach einem Katalog-Update nicht mehr vorhanden → überspringen
+        state["question_index"] += 1
+        st.rerun()
     st.markdown(f"### 🧩 Clue {state['question_index'] + 1} ({q['difficulty'].title()}):\n> {q['question']}")
 
     if q.get("options"):
@@ -137,13 +192,13 @@ def run_detective_mode_streamlit():
     answer = st.text_input("Deine Deduktion:", key=f"answer_{state['question_index']}")
 
     if not state["hint_used"] and st.button("💡 Hinweis anzeigen"):
-        tip = get_progressive_hint(q["question"], q["correct_answer"], level=3)
+        tip = run_foreground(state["run_id"], lambda: get_progressive_hint(q["question"], q["correct_answer"], level=3))
         if tip:
             st.info(f"🧠 Hinweis: {tip}")
             state["hint_used"] = True
 
     if st.button("✅ Antwort prüfen"):
-        is_correct, feedback = get_feedback(q["question"], q["correct_answer"], answer)
+        is_correct, feedback = run_foreground(state["run_id"], lambda: get_feedback(q["question"], q["correct_answer"], answer))
 
         result_text = f"- Clue {state['question_index'] + 1} ({q['difficulty'].title()}): {'✔️ Correct' if is_correct else '❌ Incorrect'} — {q['question']}"
         state["clue_results"].append(result_text)
@@ -169,21 +224,25 @@ def run_detective_mode_streamlit():
             next_difficulty = difficulty_levels[state["difficulty_index"]]
 
             # Neue Frage mit höherem Schwierigkeitsgrad hinzufügen
-            all_questions = state["quiz_catalog"][state["topic"]]
-            candidates = [
-                q for q in all_questions
-                if q.get("difficulty") == next_difficulty and q not in state["questions"]
-            ]
-            if candidates:
-                next_q = random.choice(candidates)
-                state["questions"].append(next_q)
+            used = set(state["question_ids"])
+            next_id = quiz_index.draw(quiz_index.bucket(state["topic"], next_difficulty), used)
+            if next_id is not None:
+                state["question_ids"].append(next_id)
         else:
             st.error(f"❌ Falsch: {feedback}")
-            same_level = [q2 for q2 in state["questions"] if q2["difficulty"] == q["difficulty"] and q2 != q]
-            if same_level:
-                state["questions"].insert(state["question_index"] + 1, random.choice(same_level))
+            same_level_id = quiz_index.draw(quiz_index.bucket(state["topic"], q["difficulty"]), {q["id"]})
+            if same_level_id is not None:
+                state["question_ids"].insert(state["question_index"] + 1, same_level_id)
             state["difficulty_index"] = max(state["difficulty_index"] - 1, 0)
 
+        if state["question_index"] == 3:
+            # Letzter Hinweis gelöst → Fallabschluss schon im Hintergrund schreiben
+            clue_results = list(state["clue_results"])
+            pregenerate_step(
+                state["run_id"], "case_summary", {"results": clue_results},
+                lambda: _generate_case_summary(background_llm, clue_results, session_id)
+            )
+
         if st.button("➡️ Weiter zum nächsten Hinweis"):
             state["question_index"] += 1
             state["hint_used"] = False
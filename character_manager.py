@@ -1,12 +1,14 @@
 import streamlit as st
-import random
 import uuid
-from langchain_ollama import OllamaLLM
+from contextlib import closing
 from langchain.prompts import PromptTemplate
 
-from utils.load_quiz_data import load_quiz_catalog
+from utils.load_quiz_data import get_quiz_index
 from utils.feedback_tools import get_feedback, get_progressive_hint, get_topic_summary, get_question_context
 from utils.chat_history_memory import save_message, retrieve_similar_history
+from utils.llm_gateway import GatewayLLM
+from utils.semantic_cache import answer_cache, complete_answer
+from utils.step_cache import run_foreground
 
 # === Prompt Template ===
 manager_prompt = PromptTemplate.from_template("""
@@ -24,20 +26,33 @@ Now, answer informally, supportively, and practically – like a manager teachin
 
 @st.cache_resource
 def get_llm():
-    return OllamaLLM(model="openhermes")
+    return GatewayLLM("openhermes", call_type="chat")
+
+# Hintergrund-Erneuerung gecachter Antworten wartet hinter den Anfragen der Lernenden
+refresh_llm = GatewayLLM("openhermes", priority="background", call_type="chat")
+
+def _pick_question(state, quiz_index, topic, difficulty):
+    """Zieht eine noch nicht gestellte Frage aus dem Bucket; sind alle durch, auch eine gestellte."""
+    bucket = quiz_index.bucket(topic, difficulty)
+    qid = quiz_index.draw(bucket, state["asked_ids"]) or quiz_index.draw(bucket)
+    if qid is not None:
+        state["asked_ids"].add(qid)
+    state["question_id"] = qid
+    return quiz_index.get(qid)
 
 def run_manager_mode_streamlit():
     st.markdown("## 👷 Shopfloor Manager")
 
     current_topic = st.session_state.get("current_topic", "")
-    quiz_catalog = load_quiz_catalog()
+    quiz_index = get_quiz_index()
 
     if "manager_state" not in st.session_state:
         st.session_state.manager_state = {
             "step": "intro",
             "log": [],
             "difficulty_index": 0,
-            "question": None,
+            "question_id": None,
+            "asked_ids": set(),
             "session_id": str(uuid.uuid4()),
             "topic": current_topic
         }
@@ -92,14 +107,12 @@ def run_manager_mode_streamlit():
             state["log"].append(("assistant", "🧠 Great! Let's test your knowledge now."))
             state["step"] = "quiz"
             difficulty_levels = ["easy", "medium", "hard"]
-            questions = [q for q in quiz_catalog[topic] if q.get("difficulty") == difficulty_levels[state["difficulty_index"]]]
+            q = _pick_question(state, quiz_index, topic, difficulty_levels[state["difficulty_index"]])
 
-            if not questions:
+            if q is None:
                 state["log"].append(("assistant", f"⚠️ Keine Fragen für {difficulty_levels[state['difficulty_index']]} vorhanden."))
                 state["step"] = "finished"
             else:
-                q = random.choice(questions)
-                state["question"] = q
                 state["log"].append(("assistant", f"📚 Kontext: {get_question_context(q['question'], difficulty_levels[state['difficulty_index']])}"))
                 state["log"].append(("assistant", f"🔧 Frage: {q['question']}"))
                 if q.get("options"):
@@ -109,35 +122,47 @@ def run_manager_mode_streamlit():
         elif user_input.lower() == "chat":
             state["step"] = "chat"
             state["log"].append(("assistant", "💬 Back to discussion mode!"))
-            state["question"] = None
+            state["question_id"] = None
             st.rerun()
 
-        elif user_input.lower() == "hint" and state.get("question"):
-            q = state["question"]
-            hint = get_progressive_hint(q["question"], q["correct_answer"])
+        elif user_input.lower() == "hint" and quiz_index.get(state.get("question_id")):
+            q = quiz_index.get(state["question_id"])
+            hint = run_foreground(session_id, lambda: get_progressive_hint(q["question"], q["correct_answer"]))
             state["log"].append(("assistant", f"💡 Tipp: {hint}"))
             st.rerun()
 
         elif state["step"] == "chat":
-            history = retrieve_similar_history(user_input, role="manager", session_id=session_id)
-            context = "\n".join(f"- {h}" for h in history) if history else "No previous context available."
-            reply = llm.invoke(manager_prompt.format(topic=topic, question=user_input, history=context))
+            # Ähnliche Frage zum Thema schon beantwortet → sofort antworten, ggf. im Hintergrund erneuern
+            reply, vector, age, matched = answer_cache.lookup("manager", topic, user_input)
+            if reply is not None:
+                if age > answer_cache.refresh_after:
+                    answer_cache.refresh_async(
+                        "manager", topic, matched,
+                        lambda question: refresh_llm.invoke(manager_prompt.format(topic=topic, question=question, history="No previous context available."))
+                    )
+            else:
+                history = retrieve_similar_history(user_input, role="manager", session_id=session_id)
+                context = "\n".join(f"- {h}" for h in history) if history else "No previous context available."
+                # Gestreamt: ein Rerun (neue Eingabe, Navigation) beendet st.write_stream; closing schließt den Stream sofort
+                with closing(llm.stream(manager_prompt.format(topic=topic, question=user_input, history=context))) as stream:
+                    reply = st.write_stream(stream)
+                # Der Cache gilt für alle Sessions: Antworten mit eigenem Gesprächsverlauf bleiben privat
+                if not history and complete_answer(reply):
+                    answer_cache.store("manager", topic, user_input, reply, vector)
             state["log"].append(("assistant", reply))
             save_message("manager", reply, session_id=session_id)
             st.rerun()
 
         elif state["step"] == "quiz":
-            q = state.get("question")
+            q = quiz_index.get(state.get("question_id"))
             difficulty_levels = ["easy", "medium", "hard"]
 
             if q is None:
-                questions = [q for q in quiz_catalog[topic] if q.get("difficulty") == difficulty_levels[state["difficulty_index"]]]
-                if not questions:
+                q = _pick_question(state, quiz_index, topic, difficulty_levels[state["difficulty_index"]])
+                if q is None:
                     state["log"].append(("assistant", f"⚠️ Keine Fragen für {difficulty_levels[state['difficulty_index']]} vorhanden."))
                     state["step"] = "finished"
                     st.rerun()
-                q = random.choice(questions)
-                state["question"] = q
                 state["log"].append(("assistant", f"📚 Kontext: {get_question_context(q['question'], difficulty_levels[state['difficulty_index']])}"))
                 state["log"].append(("assistant", f"🔧 Frage: {q['question']}"))
                 if q.get("options"):
@@ -145,7 +170,7 @@ def run_manager_mode_streamlit():
                 st.rerun()
 
             else:
-                is_correct, feedback = get_feedback(q["question"], q["correct_answer"], user_input)
+                is_correct, feedback = run_foreground(session_id, lambda: get_feedback(q["question"], q["correct_answer"], user_input))
                 state["log"].append(("assistant", f"📜 {feedback}"))
                 save_message("manager", feedback, session_id=session_id)
 
@@ -154,7 +179,7 @@ def run_manager_mode_streamlit():
                     state["difficulty_index"] = min(state["difficulty_index"] + 1, 2)
                 else:
                     state["log"].append(("assistant", "📉 Not quite. Let's stay on this level."))
-                state["question"] = None
+                state["question_id"] = None
                 state["log"].append(("assistant", "Type 'chat' to switch or 'continue' answering."))
                 st.rerun()
 
@@ -1,13 +1,17 @@
 import streamlit as st
-import random
 import uuid
-from langchain_ollama import OllamaLLM
 from langchain.prompts import PromptTemplate
-from utils.load_quiz_data import load_quiz_catalog
+from utils.load_quiz_data import get_quiz_index
 from utils.feedback_tools import get_feedback, get_progressive_hint, get_lecture_context
 from utils.chat_history_memory import save_message, retrieve_similar_history
+from utils.llm_gateway import GatewayLLM
+from utils.step_cache import cached_step, pregenerate_step, run_foreground, discard_run
 
-llm = OllamaLLM(model="openhermes")
+lecture_llm = GatewayLLM("openhermes", call_type="lecture")
+reflection_llm = GatewayLLM("openhermes", call_type="reflection")
+# Vorab-Generierungen warten hinter den Anfragen, auf die gerade jemand wartet
+lecture_pregen_llm = GatewayLLM("openhermes", priority="background", call_type="lecture")
+reflection_pregen_llm = GatewayLLM("openhermes", priority="background", call_type="reflection")
 
 lecture_intro_prompt = PromptTemplate.from_template("""
 You are a university professor for Lean Production and operations management.
@@ -41,6 +45,33 @@ Create a short summary lecture (4–6 sentences), reflecting on what went well,
 Your tone is professional but encouraging. End with a motivating sentence.
 """)
 
+def _generate_lecture(topic, level, session_id, llm=lecture_llm):
+    history = "\n".join(retrieve_similar_history(topic, k=2, role="professor", session_id=session_id))
+    # Reicht das Latenzbudget nicht, wird aus der vorhandenen Themen-Zusammenfassung vorgetragen
+    fallback = f"Today we look at *{topic}*. {get_lecture_context(topic, level)}"
+    return llm.invoke(lecture_intro_prompt.format(topic=topic, level=level, history=history), fallback=fallback)
+
+def _generate_reflection(topic, level, correct_count, feedback_log, llm=reflection_llm):
+    fallback = (
+        f"You answered {correct_count} out of {len(feedback_log)} questions on *{topic}* correctly. "
+        "Review the feedback above for the questions you missed and try the next level when you feel ready."
+    )
+    return llm.invoke(reflection_prompt.format(
+        topic=topic,
+        level=level,
+        correct_count=correct_count,
+        total_count=len(feedback_log),
+        feedback_list="\n".join(feedback_log)
+    ), fallback=fallback)
+
+def _reflection_inputs(state, topic):
+    return {
+        "topic": topic,
+        "level": state["mode"],
+        "correct_count": state["correct_total"],
+        "feedback_log": list(state["feedback_log"])
+    }
+
 def run_professor_mode_streamlit():
     current_topic = st.session_state.get("current_topic")
     if "professor_session_id" not in st.session_state:
@@ -48,12 +79,12 @@ def run_professor_mode_streamlit():
 
     if "professor_state" not in st.session_state:
         st.session_state.professor_state = {
+            "run_id": str(uuid.uuid4()),  # Schlüssel für den Step-Cache dieses Durchlaufs
             "step": "select_mode",
             "mode": None,
             "topic": current_topic,
-            "catalog": load_quiz_catalog(),
-            "question_queue": [],
-            "current_question": None,
+            "question_queue": [],  # Frage-IDs
+            "current_question": None,  # Frage-ID
             "hint_count": 0,
             "correct_total": 0,
             "feedback_log": []
@@ -65,6 +96,7 @@ def run_professor_mode_streamlit():
 
     # Handle topic change
     if state.get("topic") != current_topic:
+        discard_run(state["run_id"])
         del st.session_state.professor_state
         st.rerun()
 
@@ -77,33 +109,43 @@ def run_professor_mode_streamlit():
     # Step: Mode Selection
     if state["step"] == "select_mode":
         st.markdown("📘 **Choose your learning mode:**")
-        mode = st.radio("Select mode:", ["📘 Basic", "📗 Advanced", "📕 Expert", "🎓 Exam"])
+        mode_map = {
+            "📘 Basic": "easy",
+            "📗 Advanced": "medium",
+            "📕 Expert": "hard",
+            "🎓 Exam": "exam"
+        }
+        # Vorauswahl ist die zuletzt gewählte Stufe; nur deren Vorlesung wird vorbereitet.
+        # Jede durchgeklickte Option würde sonst eine eigene, meist verworfene Generierung starten.
+        expected = st.session_state.get("professor_last_level", "easy")
+        levels = list(mode_map.values())
+        mode = st.radio("Select mode:", list(mode_map), index=levels.index(expected))
+        pregenerate_step(
+            state["run_id"], "lecture", {"topic": topic, "level": expected},
+            lambda: _generate_lecture(topic, expected, session_id, llm=lecture_pregen_llm)
+        )
         if st.button("➡️ Continue"):
-            mode_map = {
-                "📘 Basic": "easy",
-                "📗 Advanced": "medium",
-                "📕 Expert": "hard",
-                "🎓 Exam": "exam"
-            }
             state["mode"] = mode_map[mode]
+            st.session_state.professor_last_level = state["mode"]
             state["step"] = "lecture"
             st.rerun()
 
     # Step: Lecture
     elif state["step"] == "lecture":
-        history = "\n".join(retrieve_similar_history(topic, k=2, role="professor", session_id=session_id))
-        intro = llm.invoke(lecture_intro_prompt.format(topic=topic, level=state["mode"], history=history))
+        intro = cached_step(
+            state["run_id"], "lecture", {"topic": topic, "level": state["mode"]},
+            lambda: _generate_lecture(topic, state["mode"], session_id)
+        )
         st.markdown(f"### 🎙️ Lecture Introduction:\n{intro}")
         if topic != "Mixed Topics":
             st.info(get_lecture_context(topic, state["mode"]))
         if st.button("🧠 Start Quiz"):
-            catalog = state["catalog"]
+            quiz_index = get_quiz_index()
             if state["mode"] == "exam":
-                all_qs = [q for qs in catalog.values() for q in qs]
-                state["question_queue"] = random.sample(all_qs, min(15, len(all_qs)))
+                picked = quiz_index.sample(quiz_index.all_ids, 15)
             else:
-                filtered = [q for q in catalog.get(topic, []) if q.get("difficulty") == state["mode"]]
-                state["question_queue"] = random.sample(filtered, min(5, len(filtered)))
+                picked = quiz_index.sample(quiz_index.bucket(topic, state["mode"]), 5)
+            state["question_queue"] = picked
             state["step"] = "ask_question"
             st.rerun()
 
@@ -111,7 +153,12 @@ def run_professor_mode_streamlit():
         if state["current_question"] is None and state["question_queue"]:
             state["current_question"] = state["question_queue"].pop(0)
 
-        q = state["current_question"]
+        q = get_quiz_index().get(state["current_question"])
+        if q is None:
+            # Warteschlange leer oder Frage nach Katalog-Update entfernt
+            state["current_question"] = None
+            state["step"] = "ask_question" if state["question_queue"] else "reflect"
+            st.rerun()
         st.markdown(f"### ❓ Question: {q['question']}")
 
         if "options" in q:
@@ -121,11 +168,11 @@ def run_professor_mode_streamlit():
 
         if st.button("💡 Hint"):
             state["hint_count"] += 1
-            hint_text = get_progressive_hint(q["question"], q["correct_answer"], state["hint_count"])
+            hint_text = run_foreground(state["run_id"], lambda: get_progressive_hint(q["question"], q["correct_answer"], state["hint_count"]))
             st.warning(hint_text)
 
         if st.button("✅ Check Answer"):
-            is_correct, feedback = get_feedback(q["question"], q["correct_answer"], selected_option, q.get("options"))
+            is_correct, feedback = run_foreground(state["run_id"], lambda: get_feedback(q["question"], q["correct_answer"], selected_option, q.get("options")))
             state["correct_total"] += int(is_correct)
             state["feedback_log"].append(f"Q: {q['question']} → {selected_option} → {feedback}")
             save_message("user", selected_option, session_id)
@@ -139,6 +186,11 @@ def run_professor_mode_streamlit():
         st.markdown(f"### 📝 Feedback")
         st.success("✅ Correct!") if is_correct else st.error(f"{feedback}")
 
+        if not state["question_queue"]:
+            # Letzte Frage beantwortet → Reflexion schon im Hintergrund erzeugen
+            reflection_inputs = _reflection_inputs(state, topic)
+            pregenerate_step(state["run_id"], "reflect", reflection_inputs, lambda: _generate_reflection(**reflection_inputs, llm=reflection_pregen_llm))
+
         if st.button("➡️ Nächste Frage"):
             state["current_question"] = None
             state["last_feedback"] = None
@@ -147,15 +199,13 @@ def run_professor_mode_streamlit():
 
     # Step: Reflection
     elif state["step"] == "reflect":
-        summary = reflection_prompt.format(
-            topic=topic,
-            level=state["mode"],
-            correct_count=state["correct_total"],
-            total_count=len(state["feedback_log"]),
-            feedback_list="\n".join(state["feedback_log"])
+        reflection_inputs = _reflection_inputs(state, topic)
+        reflection = cached_step(
+            state["run_id"], "reflect", reflection_inputs,
+            lambda: _generate_reflection(**reflection_inputs)
         )
-        reflection = llm.invoke(summary)
         st.markdown(f"### 📘 Professor's Reflection:\n{reflection}")
         if st.button("🔁 New Session"):
+            discard_run(state["run_id"])
             del st.session_state.professor_state
             st.rerun()
\ No newline at end of file
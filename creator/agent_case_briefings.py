@@ -0,0 +1,97 @@
+# --- creator/agent_case_briefings.py ---
+# Erzeugt pro Thema mehrere Fallbeschreibungen für den Lean Detective und legt sie im
+# Katalog-Bundle ab. Zur Laufzeit wählt der Detective eine davon sofort aus, statt beim
+# Fallstart auf das LLM zu warten. Nach jedem Quiz-Creator-Lauf erneut ausführen.
+#
+#   python -m creator.agent_case_briefings
+
+import random
+
+from langchain_ollama import OllamaLLM
+from langchain.prompts import PromptTemplate
+
+from utils.catalog_bundle import BUNDLE_PATH, write_case_briefings
+from utils.load_quiz_data import QuizCatalogService
+from utils.quiz_index import DIFFICULTY_LEVELS
+
+# === Einstellungen ===
+BRIEFINGS_PER_TOPIC = 4
+CLUES_PER_CASE = 4
+
+llm = OllamaLLM(model="openhermes")
+
+# Ohne Bezug auf frühere Fälle – der wird zur Laufzeit asynchron ergänzt
+# (personalize_prompt in character_detective).
+briefing_prompt = PromptTemplate.from_template("""
+You are Inspector Kaizen – a legendary Lean Production detective summoned to investigate hidden inefficiencies.
+
+Based on the following selected clues, generate a story-style case briefing for the inspector:
+- Each clue is a Lean-related challenge described as a question.
+- Mention the domains/topics if available.
+- Use storytelling style, grounded in industrial reality.
+- End with a call to action that the inspector must investigate 4 specific areas.
+
+Selected clues:
+{clues}
+
+Return ONLY the case narrative.
+""")
+
+
+def pick_clue_sets(quiz_index, topic, count):
+    """
+    Erster Satz: die ersten vier Fragen nach Schwierigkeit (wie bisher zur Laufzeit).
+    Weitere Sätze: zufällige Fragen, ebenfalls von leicht nach schwer sortiert.
+    """
+    ordered = quiz_index.ordered_by_difficulty(topic)
+    if len(ordered) < CLUES_PER_CASE:
+        return []
+    rank = {qid: i for i, qid in enumerate(ordered)}
+    clue_sets = [ordered[:CLUES_PER_CASE]]
+    attempts = 0
+    while len(clue_sets) < count and attempts < count * 10:
+        attempts += 1
+        clue_ids = sorted(random.sample(ordered, CLUES_PER_CASE), key=rank.get)
+        if clue_ids not in clue_sets:
+            clue_sets.append(clue_ids)
+    return clue_sets
+
+
+def format_clues(quiz_index, topic, clue_ids):
+    lines = []
+    for qid in clue_ids:
+        q = quiz_index.get(qid)
+        difficulty = q.get("difficulty", DIFFICULTY_LEVELS[1])
+        lines.append(f"- ({difficulty.title()}) {q['question']} [{topic}]")
+    return "\n".join(lines)
+
+
+def main():
+    quiz_index = QuizCatalogService(BUNDLE_PATH).index()
+    print(f"🕵️ Erzeuge Fallbeschreibungen für {len(quiz_index.topics)} Themen...\n")
+
+    for topic in quiz_index.topics:
+        clue_sets = pick_clue_sets(quiz_index, topic, BRIEFINGS_PER_TOPIC)
+        if not clue_sets:
+            print(f"⚠️  Zu wenige Fragen für einen Fall: {topic}")
+            continue
+
+        briefings = []
+        for clue_ids in clue_sets:
+            try:
+                story = llm.invoke(briefing_prompt.format(clues=format_clues(quiz_index, topic, clue_ids))).strip()
+            except Exception as e:
+                print(f"❌ Fehler bei {topic}: {str(e)[:200]}")
+                continue
+            if story:
+                briefings.append({"clue_ids": clue_ids, "story": story})
+
+        if briefings:
+            write_case_briefings(topic, briefings)
+            print(f"✅ {len(briefings)} Fallbeschreibungen für: {topic}")
+
+    print("\n🎓 Fallbibliothek aktualisiert.")
+
+
+if __name__ == "__main__":
+    main()
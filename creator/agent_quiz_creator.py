@@ -1,19 +1,42 @@
+# --- creator/agent_quiz_creator.py ---
+# Erzeugt pro Thema der Themen-Collection einen Quiz-Katalog im Katalog-Bundle. Mehrere Themen
+# laufen gleichzeitig (begrenzt); fertige Themen werden mit dem Hash ihres Quellinhalts im
+# Checkpoint vermerkt, sodass ein erneuter Lauf nach einem Abbruch dort weitermacht und
+# unveränderte Themen überspringt.
+#
+#   python -m creator.agent_quiz_creator [--topics "Muda" "Kanban"] [--workers 2] [--force]
+
 import os
 import re
 import json
-import pickle
+import time
+import hashlib
+import argparse
+import threading
 
-from langchain_community.vectorstores import Chroma
 from langchain_ollama import OllamaEmbeddings, OllamaLLM
 from langchain.prompts import PromptTemplate
 
+from utils.catalog_bundle import BUNDLE_PATH, write_topic_quiz
+from utils.topic_retrieval import TOPIC_STORE_DIR, open_topic_store, stored_topics, topic_documents
+from creator.parallel_tasks import map_ordered, with_retries
+from creator.ingest_manifest import cached_embeddings
+from creator.question_index import QuestionIndex, DUPLICATE_THRESHOLD, load_catalog_questions
+
 # === Einstellungen ===
-vectorstore_base_dir = ""
-quiz_catalogs_dir = ""
-os.makedirs(quiz_catalogs_dir, exist_ok=True)
+vectorstore_base_dir = TOPIC_STORE_DIR
+quiz_catalogs_dir = "quiz_raw"  # Rohantworten des LLM (zur Fehlersuche)
+checkpoint_path = "quiz_checkpoint.json"
+quiz_workers = 2  # Themen gleichzeitig (an die Zahl der Ollama-Slots anpassen)
+quiz_retries = 1  # weitere Versuche bei ungültiger Antwort
+repair_rounds = 2  # Nachforderungen für ungültige oder fehlende Fragen pro Thema
+duplicate_threshold = DUPLICATE_THRESHOLD  # Beinahe-Duplikate im gesamten Katalog werden verworfen
+
+# Fragen pro Schwierigkeitsgrad (Reihenfolge wie im Katalog)
+difficulty_slots = {"easy": 3, "medium": 3, "hard": 4}
 
 # === Modelle ===
-embedding_model = OllamaEmbeddings(model="mxbai-embed-large")
+embedding_model = cached_embeddings(OllamaEmbeddings(model="mxbai-embed-large"))
 llm = OllamaLLM(model="openhermes")
 
 # === Hilfsfunktion zur Bereinigung ===
@@ -43,8 +66,37 @@ Difficulty Levels:
 - Easy: surface-level recall of concepts, definitions, simple examples
 - Medium: require reasoning or short explanation
 - Hard: require detailed, multi-aspect understanding or applied problem-solving
+
+Base the questions and answers on this course material:
+{context}
+""")
+
+# === Nachforderung einzelner Fragen ===
+repair_prompt = PromptTemplate.from_template("""
+You are a JSON-only quiz generator for the topic Lean Production.
+You must strictly respond with ONLY a valid JSON array – no explanations, no comments.
+
+Create exactly these additional questions about the topic: "{topic}":
+{missing}
+
+Strict Requirements:
+- Every question has the fields "question", "correct_answer" and "difficulty" ("easy", "medium" or "hard").
+- Easy questions are multiple-choice with an "options" field of exactly 3 strings labeled "A: ...", "B: ...", "C: ...";
+  the "correct_answer" must match one of the options exactly.
+- Medium and hard questions are open-ended and must NOT include an "options" field.
+- Do not repeat these existing questions:
+{existing}
+
+Base the questions and answers on this course material:
+{context}
 """)
 
+MISSING_DESCRIPTIONS = {
+    "easy": "easy multiple-choice question(s) (3 options labeled A, B, C)",
+    "medium": "medium open-ended question(s) (short free-text answer, no options)",
+    "hard": "hard open-ended question(s) (detailed free-text answer, no options)"
+}
+
 # === JSON-Reparatur (einfach) ===
 def naive_json_repair(text):
     text = text.strip()
@@ -92,56 +144,235 @@ def validate_open_ended(q):
         return "options" not in q
     return True
 
+def validate_question(q):
+    """Einzelne Frage: Pflichtfelder, bekannter Schwierigkeitsgrad, MC-/Freitext-Regeln."""
+    if not isinstance(q, dict):
+        return False
+    if isinstance(q.get("difficulty"), str):
+        q["difficulty"] = q["difficulty"].strip().lower()
+    if q.get("difficulty") not in difficulty_slots:
+        return False
+    if not isinstance(q.get("question"), str) or not q["question"].strip() or not str(q.get("correct_answer", "")).strip():
+        return False
+    return validate_mcq(q) and validate_open_ended(q)
+
+def accept_questions(accepted: dict, candidates, topic: str = None, index: QuestionIndex = None) -> int:
+    """
+    Übernimmt gültige, neue Fragen in freie Plätze ihres Schwierigkeitsgrads; mit Index werden
+    zuerst Beinahe-Duplikate aus dem gesamten Katalog verworfen, damit ein Duplikat keinen Platz
+    belegt, den ein gültiger Kandidat derselben Antwort füllen könnte. Gibt die Anzahl verworfener zurück.
+    """
+    seen = {q["question"].strip().lower() for questions in accepted.values() for q in questions}
+    rejected = 0
+    valid = []
+    for q in candidates if isinstance(candidates, list) else []:
+        if not validate_question(q) or q["question"].strip().lower() in seen:
+            rejected += 1
+            continue
+        valid.append(q)
+        seen.add(q["question"].strip().lower())
+    if index is not None:
+        valid, duplicates = index.add_unique(topic, valid)
+        for q, (other_topic, other), score in duplicates:
+            print(f"♻️  {topic}: Duplikat verworfen ({score:.2f} zu [{other_topic}] {other[:60]})")
+        rejected += len(duplicates)
+    free = {d: n - len(accepted[d]) for d, n in difficulty_slots.items()}
+    surplus = []
+    for q in valid:
+        if free[q["difficulty"]] > 0:
+            free[q["difficulty"]] -= 1
+            accepted[q["difficulty"]].append(q)
+        else:
+            surplus.append(q)
+    if index is not None and surplus:
+        index.remove(topic, surplus)  # überzählige Fragen kommen nicht in den Katalog
+    return rejected
+
+def missing_slots(accepted: dict) -> dict:
+    return {d: n - len(accepted[d]) for d, n in difficulty_slots.items() if len(accepted[d]) < n}
+
+# === Checkpoint ===
+class QuizCheckpoint:
+    """Thema -> {"content_hash", "questions", "calls", "complete", "seconds"} der zuletzt erzeugten Quizze."""
+
+    def __init__(self, path: str = checkpoint_path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = json.load(f)
+
+    def is_current(self, topic: str, content_hash: str) -> bool:
+        entry = self.done.get(topic, {})
+        return entry.get("content_hash") == content_hash and entry.get("complete", True)
+
+    def mark(self, topic: str, content_hash: str, result: dict, seconds: float):
+        with self._lock:
+            self.done[topic] = {"content_hash": content_hash, **result, "seconds": round(seconds, 1)}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.done, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def content_hash(texts) -> str:
+    return hashlib.sha256("\n".join(texts).encode("utf-8")).hexdigest()
+
+
+# === Quiz für ein Thema ===
+def _ask(prompt: str, raw_path: str):
+    response = llm.invoke(prompt)
+    # 📝 Rohantwort speichern
+    with open(raw_path, "w") as f:
+        f.write(response)
+    return try_parse_json(response, raw_path=raw_path)
+
+
+def generate_topic_quiz(topic_store, topic: str, index: QuestionIndex = None) -> dict:
+    """
+    Erzeugt, prüft und speichert das Quiz eines Themas. Fragen werden einzeln geprüft; nur
+    ungültige oder fehlende Plätze werden in kleinen Folgeaufrufen nachgefordert.
+    Gibt {"questions", "calls", "complete"} zurück; Fehler werden als Exception gemeldet.
+    """
+    topic_safe = sanitize_topic_name(topic)
+    docs = topic_store.similarity_search("Generate quiz questions", k=4, filter={"topic": topic})
+    if not docs:
+        raise ValueError("kein Inhalt im Vektorstore")
+
+    context = "\n".join(d.page_content for d in docs[:4])
+    print(f"📤 Generiere Quiz für: {topic}...")
+
+    # Das Thema wird ersetzt, seine alten Fragen sind keine Duplikate. Scheitert es, bleiben
+    # die alten Fragen im Bundle und kommen deshalb auch in den Index zurück. write_topic_quiz
+    # ist eine Transaktion und der letzte Schritt: nach einer Exception wurde nichts geschrieben.
+    previous = index.drop_topic(topic) if index is not None else None
+    try:
+        accepted = {d: [] for d in difficulty_slots}
+        quiz_data = _ask(quiz_prompt.format(topic=topic, context=context),
+                         os.path.join(quiz_catalogs_dir, f"{topic_safe}.raw.txt"))
+        calls = 1
+        rejected = accept_questions(accepted, quiz_data, topic, index)
+
+        # 🔍 Nur ungültige oder fehlende Fragen nachfordern
+        for round_number in range(1, repair_rounds + 1):
+            missing = missing_slots(accepted)
+            if not missing:
+                break
+            print(f"🔧 {topic}: {rejected} verworfen, fordere {sum(missing.values())} Fragen nach ({', '.join(f'{n} {d}' for d, n in missing.items())})")
+            prompt = repair_prompt.format(
+                topic=topic, context=context,
+                missing="\n".join(f"- {n} {MISSING_DESCRIPTIONS[d]}" for d, n in missing.items()),
+                existing="\n".join(f"- {q['question']}" for questions in accepted.values() for q in questions) or "- (none)"
+            )
+            candidates = _ask(prompt, os.path.join(quiz_catalogs_dir, f"{topic_safe}.repair{round_number}.raw.txt"))
+            calls += 1
+            rejected = accept_questions(accepted, candidates, topic, index)
+
+        questions = [q for d in difficulty_slots for q in accepted[d]]
+        if not questions:
+            raise ValueError(f"keine gültigen Fragen nach {calls} Aufrufen")
+        complete = not missing_slots(accepted)
+
+        # ✅ Speichern (auch unvollständig – besser als kein Quiz; der Checkpoint fordert es beim nächsten Lauf neu an)
+        write_topic_quiz(topic, questions)
+    except Exception:
+        if index is not None:
+            index.restore_topic(topic, previous)
+        raise
+    status = "" if complete else f" – unvollständig, {len(questions)}/{sum(difficulty_slots.values())}"
+    print(f"✅ Gespeichert in {BUNDLE_PATH} (Thema: {topic}{status})")
+    return {"questions": len(questions), "calls": calls, "complete": complete}
+
+
 # === Hauptprozess ===
-print("📚 Starte Quiz-Generierung basierend auf Vektor-Matching...\n")
-all_topic_names = [f for f in os.listdir(vectorstore_base_dir) if os.path.isdir(os.path.join(vectorstore_base_dir, f))]
+def main(topics=None, workers=quiz_workers, force=False, progress=None) -> list:
+    """
+    progress(fertig, gesamt) wird nach jedem Thema aufgerufen, auch wenn es fehlschlägt
+    (z. B. vom Einlese-Job der App). Gibt die Themen zurück, für die kein Quiz erzeugt wurde.
+    """
+    print("📚 Starte Quiz-Generierung basierend auf Vektor-Matching...\n")
+    os.makedirs(quiz_catalogs_dir, exist_ok=True)
+    topic_store = open_topic_store(embedding_model, vectorstore_base_dir)
+    checkpoint = QuizCheckpoint()
+
+    available = stored_topics(topic_store)
+    selected = [t for t in available if not topics or t in topics]
+    for missing in sorted(set(topics or []) - set(available)):
+        print(f"⚠️  Thema nicht im Vektorstore: {missing}")
 
-for topic_folder in sorted(all_topic_names):
-    topic = topic_folder.replace("_", " ")
-    topic_safe = sanitize_topic_name(topic_folder)
-    topic_vector_dir = os.path.join(vectorstore_base_dir, topic_folder)
+    hashes = {topic: content_hash(topic_documents(topic_store, topic)) for topic in selected}
+    pending = [t for t in selected if force or not checkpoint.is_current(t, hashes[t])]
+    skipped = len(selected) - len(pending)
+    print(f"🔁 {len(pending)} Themen zu erzeugen, {skipped} unverändert übersprungen ({workers} parallel)\n")
 
+    # Index aller bisherigen Katalogfragen (Embeddings gecacht, daher nur beim ersten Lauf teuer)
     try:
-        vs = Chroma(
-            persist_directory=topic_vector_dir,
-            embedding_function=embedding_model,
-            collection_name=topic_safe
-        )
-        docs = vs.similarity_search("Generate quiz questions", k=4)
-        if not docs:
-            print(f"⚠️  Kein Inhalt im Vektorstore für Topic: {topic}")
-            continue
+        existing = load_catalog_questions(BUNDLE_PATH)
+    except FileNotFoundError:
+        existing = []
+    index = QuestionIndex.from_questions(embedding_model, existing, threshold=duplicate_threshold)
+    print(f"🗂️  Duplikat-Index mit {len(existing)} Katalogfragen\n")
 
-        context = "\n".join(d.page_content for d in docs[:4])
-        prompt = quiz_prompt.format(topic=topic)
-        print(f"📤 Generiere Quiz für: {topic}...")
+    timings = {}
+    generated = {}  # Thema -> Ergebnis, sobald das Quiz im Bundle steht
+    finished = 0
+    finished_lock = threading.Lock()
 
-        response = llm.invoke(prompt)
+    def report_progress():
+        nonlocal finished
+        with finished_lock:
+            finished += 1
+            done = finished
+        if progress is not None:
+            progress(done, len(pending))
 
-        # 📝 Rohantwort speichern
-        raw_path = os.path.join(quiz_catalogs_dir, f"{topic_safe}.raw.txt")
-        with open(raw_path, "w") as f:
-            f.write(response)
+    def attempt(topic):
+        # Ist das Quiz schon gespeichert, holt eine Wiederholung nur den Checkpoint nach
+        if topic not in generated:
+            started = time.perf_counter()
+            try:
+                generated[topic] = generate_topic_quiz(topic_store, topic, index)
+            finally:
+                timings[topic] = timings.get(topic, 0.0) + time.perf_counter() - started
+        checkpoint.mark(topic, hashes[topic], generated[topic], timings[topic])
+        return generated[topic]
 
-        quiz_data = try_parse_json(response, raw_path=raw_path)
-        if not quiz_data or not isinstance(quiz_data, list):
-            print(f"❌ Fehlerhafte JSON-Antwort für Topic: {topic}")
-            continue
+    def run(topic):
+        # Wiederholungen hier statt in map_ordered, damit der Fortschritt genau einmal pro Thema zählt
+        try:
+            return with_retries(attempt, topic, retries=quiz_retries, backoff=1.0)
+        finally:
+            report_progress()
 
-        # 🔍 Validierung
-        invalid = [q for q in quiz_data if not validate_mcq(q) or not validate_open_ended(q)]
-        if invalid:
-            print(f"⚠️  Ungültige Fragen für Topic: {topic} – werden nicht gespeichert.")
-            continue
+    results, failed = map_ordered(run, pending, workers=workers, retries=0, label="Themen")
 
-        # ✅ Speichern
-        quiz_path = os.path.join(quiz_catalogs_dir, f"{topic_safe}.pkl")
-        with open(quiz_path, "wb") as f:
-            pickle.dump(quiz_data, f)
+    print("\nThema                                    | Status | Zeit    | Fragen / Fehler")
+    for position, topic in enumerate(pending):
+        if position in failed:
+            print(f"{topic[:40]:40s} | ❌     | {timings.get(topic, 0):5.1f} s | {str(failed[position])[:80]}")
+        else:
+            result = results[position]
+            status = "✅" if result["complete"] else "⚠️ "
+            print(f"{topic[:40]:40s} | {status}     | {timings.get(topic, 0):5.1f} s | "
+                  f"{result['questions']} ({result['calls']} LLM-Aufrufe)")
 
-        print(f"✅ Gespeichert unter: {quiz_path}\n")
+    # Effizienz: LLM-Aufrufe pro übernommener Frage (fehlgeschlagene Themen nicht mitgezählt)
+    accepted = sum(r["questions"] for r in results if r)
+    calls = sum(r["calls"] for r in results if r)
+    if accepted:
+        print(f"\n📈 {calls} LLM-Aufrufe für {accepted} Fragen = {calls / accepted:.2f} Aufrufe pro Frage")
+    print(f"♻️  {index.rejected} Beinahe-Duplikate verworfen")
+    print(f"\n🎓 Quizgenerierung abgeschlossen: {len(pending) - len(failed)} erzeugt, "
+          f"{len(failed)} fehlgeschlagen, {skipped} übersprungen.")
+    # Angeforderte Themen ohne Chunks im Vektorstore haben ebenfalls kein Quiz
+    return sorted({pending[position] for position in failed} | (set(topics or []) - set(available)))
 
-    except Exception as e:
-        print(f"❌ Fehler beim Laden von Vectorstore für {topic}: {str(e)[:200]}\n")
 
-print("🎓 Quizgenerierung abgeschlossen.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erzeugt Quiz-Kataloge für die Themen der Themen-Collection.")
+    parser.add_argument("--topics", nargs="*", default=None, help="nur diese Themen (Standard: alle)")
+    parser.add_argument("--workers", type=int, default=quiz_workers, help="Themen gleichzeitig")
+    parser.add_argument("--force", action="store_true", help="auch unveränderte Themen neu erzeugen")
+    args = parser.parse_args()
+    main(args.topics, workers=args.workers, force=args.force)
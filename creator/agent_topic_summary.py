@@ -1,34 +1,59 @@
-# Re-import necessary packages after code execution state reset
+# --- creator/agent_topic_summary.py ---
+# Liest PDFs ein, ordnet die Chunks Themen zu, schreibt Zusammenfassungen ins Katalog-Bundle
+# und die Chunks in die gemeinsame Themen-Collection. Seiten werden im Prozess-Pool extrahiert
+# und fließen als Stream durch Splitter, Themen-Zuordnung und Embedding; unveränderte PDFs,
+# Chunks und Themen werden über das Manifest übersprungen.
+#
+#   python -m creator.agent_topic_summary [pdfs/ | datei.pdf ...] [--mode llm|cluster] [--workers 4] [--extract-workers 4]
+
 import os
-import pickle
-from langchain_community.document_loaders import PyPDFLoader
+import glob
+import time
+import argparse
+from collections import defaultdict
+
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
 from langchain_ollama import OllamaEmbeddings, OllamaLLM
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 
-# Paths
-pdf_path = ""
-vectorstore_dir = ""
-os.makedirs(vectorstore_dir, exist_ok=True)
-
-# Load and split PDF
-loader = PyPDFLoader(pdf_path)
-documents = loader.load()
-splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-chunks = splitter.split_documents(documents)
+from utils.catalog_bundle import write_topic_summary
+from utils.topic_retrieval import TOPIC_STORE_DIR, catalog_topic, open_topic_store, replace_topic_documents, remove_topic
+from creator.parallel_tasks import map_ordered, map_streaming
+from creator.map_reduce_summary import MapReduceSummarizer
+from creator.ingest_manifest import IngestManifest, file_hash, text_hash, cached_embeddings
+from creator.ingest_pipeline import StageTimer, iter_pages, split_pages, embed_batches, EXTRACT_WORKERS
 
-# Models
-embedding_model = OllamaEmbeddings(model="mxbai-embed-large")
+# Paths
+pdf_dir = "pdfs"
+vectorstore_dir = TOPIC_STORE_DIR  # eine Collection für alle Themen, wird zur Laufzeit vom Kapitel-Chat gelesen
+store_batch_size = 256  # Chunks pro Embedding-/Schreib-Batch
+
+# Themenbildung: "llm" = ein LLM-Label pro Chunk, "cluster" = Embedding-Clustering + ein LLM-Name pro Cluster
+topic_mode = "llm"
+num_clusters = None  # None = automatisch aus der Chunk-Anzahl
+
+# Parallelität der Themen-Zuordnung (an die Zahl der Ollama-Slots anpassen)
+classify_workers = 4
+classify_retries = 3
+classify_backoff = 1.0  # Sekunden, verdoppelt sich pro Wiederholung
+
+# Zusammenfassungen: Eingabe-Tokens pro LLM-Aufruf und parallele Map-Aufrufe
+summary_token_budget = 3000
+summary_workers = 4
+summary_topic_workers = 2  # Themen gleichzeitig; kleine Themen brauchen nur 2 Aufrufe nacheinander
+
+# Models (Embeddings pro Chunk-Text auf der Platte gecacht)
+embedding_model = cached_embeddings(OllamaEmbeddings(model="mxbai-embed-large"))
 llm = OllamaLLM(model="openhermes")
+splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
 
 # Topic extraction
 topic_prompt = PromptTemplate(
     input_variables=["text"],
     template="""
-You are a Lean Production expert. Based on the text, assign a concise topic category 
-that reflects the main idea, principle, or method described. 
+You are a Lean Production expert. Based on the text, assign a concise topic category
+that reflects the main idea, principle, or method described.
 Return only the topic name.
 
 Text:
@@ -37,65 +62,184 @@ Text:
 )
 topic_chain = LLMChain(prompt=topic_prompt, llm=llm)
 
-# Summary generation
-summary_prompt = PromptTemplate(
-    input_variables=["text"],
-    template="""
-You are a Lean Production tutor. Write a clear and extensive summary (10-15 sentences) of the following content 
-as if you're explaining it to a student. Focus on the key ideas and concepts.
-
-Text:
-{text}
-"""
-)
-summary_chain = LLMChain(prompt=summary_prompt, llm=llm)
-
-# Categorize and summarize
-# --- Neue Struktur ---
-from collections import defaultdict
-topics = defaultdict(list)
-
-# Zuweisung von Chunks zu Themen
-for chunk in chunks:
-    text = chunk.page_content.strip()
-    topic = topic_chain.run({"text": text}).strip()
-    topics[topic].append(chunk)
-
-# Erstellung von Zusammenfassungen pro Topic
-summaries = {}
-for topic, topic_chunks in topics.items():
-    combined_text = "\n".join([c.page_content for c in topic_chunks])
-    summary_text = summary_chain.run({"text": combined_text}).strip()
-    summaries[topic] = summary_text
-
-
-# Save vectorstores per topic
-stored_topics = []
-for topic, docs in topics.items():
-    topic_safe = topic.replace(" ", "_").replace("/", "_")
-    store_path = os.path.join(vectorstore_dir, topic_safe)
-    try:
-        Chroma.from_documents(
-            documents=docs,
-            embedding=embedding_model,
-            persist_directory=store_path,
-            collection_name=topic_safe
+# Summary generation: Map-Reduce mit Token-Budget pro Aufruf, kurze und lange Fassung
+summarizer = MapReduceSummarizer(llm, token_budget=summary_token_budget, workers=summary_workers,
+                                 retries=classify_retries, backoff=classify_backoff)
+
+
+def resolve_pdfs(inputs) -> list:
+    """Ordner werden nach *.pdf durchsucht, einzelne Dateien direkt übernommen."""
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths.extend(sorted(glob.glob(os.path.join(entry, "*.pdf"))))
+        else:
+            paths.append(entry)
+    return paths
+
+
+def classify(chunk):
+    return topic_chain.run({"text": chunk.page_content.strip()}).strip()
+
+
+def classify_stream(chunks, manifest, timer, workers):
+    """Ordnet Chunks bereits während der Extraktion Themen zu; bekannte Chunks kommen aus dem Manifest."""
+    def label(chunk):
+        known = manifest.label(text_hash(chunk.page_content))
+        return known or timer.measure("Zuordnung", lambda: classify(chunk))
+
+    for chunk, topic, error in map_streaming(label, chunks, workers=workers, retries=classify_retries, backoff=classify_backoff):
+        if error is not None:
+            print(f"⚠️  Chunk von Seite {chunk.metadata.get('page')} nicht zugeordnet: {str(error)[:120]}")
+        elif topic:
+            manifest.set_label(text_hash(chunk.page_content), topic)
+        yield chunk
+
+
+def ingest(manifest, pdf_paths, mode, timer, workers, extract_workers):
+    """Neue oder geänderte PDFs: extrahieren → splitten → (zuordnen) → einbetten, als ein Stream."""
+    changed = {}
+    for path in pdf_paths:
+        sha = file_hash(path)
+        if manifest.pdf_unchanged(path, sha):
+            print(f"⏭️  {path} unverändert")
+        else:
+            changed[path] = sha
+
+    if changed:
+        stream = split_pages(iter_pages(list(changed), timer, workers=extract_workers), splitter, timer)
+        if mode == "llm":
+            stream = classify_stream(stream, manifest, timer, workers)
+        per_pdf = defaultdict(list)
+        for chunk in embed_batches(stream, embedding_model, timer):
+            per_pdf[chunk.metadata["source"]].append(chunk)
+        for path, sha in changed.items():
+            hashes = manifest.set_pdf(path, sha, per_pdf[path])
+            print(f"📄 {path}: {len(hashes)} Chunks")
+
+    # Explizit angegebene PDFs bleiben, ebenso früher eingelesene, die noch existieren
+    keep = set(pdf_paths) | {p for p in manifest.known_pdfs() if os.path.exists(p)}
+    for path in manifest.keep_pdfs(keep):
+        print(f"🗑️  {path} entfernt")
+
+
+def assign_topics(manifest, chunk_hashes, chunks, mode, timer, workers):
+    """{Thema: [Chunks]} in Chunk-Reihenfolge."""
+    topics = defaultdict(list)
+    if mode == "cluster":
+        # O(Cluster) statt O(Chunks) LLM-Aufrufe; ähnliche Chunks landen im selben Thema.
+        # Das Clustering hängt von allen Chunks ab und wird nur bei geänderter Chunk-Menge wiederholt.
+        chunk_set = manifest.digest(chunk_hashes + [f"k={num_clusters}"])
+        labels = manifest.cluster_labels(chunk_set)
+        if labels is None:
+            from creator.topic_clustering import cluster_topics
+            clustered = timer.measure("Clustering", lambda: cluster_topics(
+                chunks, embedding_model, llm, k=num_clusters, workers=workers), len(chunks))
+            labels = {text_hash(c.page_content): topic for topic, docs in clustered.items() for c in docs}
+            manifest.set_cluster_labels(chunk_set, labels)
+        for h, chunk in zip(chunk_hashes, chunks):
+            topics[labels[h]].append(chunk)
+        return topics
+
+    # Chunks, deren Zuordnung in einem früheren Lauf fehlgeschlagen ist
+    pending = [i for i, h in enumerate(chunk_hashes) if manifest.label(h) is None]
+    if pending:
+        print(f"🏷️  Ordne {len(pending)} offene Chunks Themen zu ({workers} parallel)...")
+        labels, failed = map_ordered(
+            lambda chunk: timer.measure("Zuordnung", lambda: classify(chunk)),
+            [chunks[i] for i in pending], workers=workers, retries=classify_retries,
+            backoff=classify_backoff, label="Chunks"
         )
-        stored_topics.append(topic)
-    except Exception as e:
-        stored_topics.append(f"{topic} ❌ ({str(e)[:60]}...)")
-
-(stored_topics, summaries)
-
-summary_dir = "topic_summaries"
-os.makedirs(summary_dir, exist_ok=True)
-
-for topic, text in summaries.items():
-    topic_safe = topic.replace(" ", "_").replace("/", "_")
-    summary_data = {
-        "short": text,
-        "long": text
-    }
-    with open(os.path.join(summary_dir, f"{topic_safe}.pkl"), "wb") as f:
-        pickle.dump(summary_data, f)
-
+        for position, error in sorted(failed.items()):
+            print(f"⚠️  Chunk {pending[position]} nicht zugeordnet: {str(error)[:120]}")
+        for i, topic in zip(pending, labels):
+            if topic:
+                manifest.set_label(chunk_hashes[i], topic)
+    for h, chunk in zip(chunk_hashes, chunks):
+        if manifest.label(h):
+            topics[manifest.label(h)].append(chunk)
+    return topics
+
+
+def summarize_topics(manifest, topics, changed_topics, topic_digests, timer) -> dict:
+    """{Thema: (short, long)} für die geänderten Themen; gemerkte Zusammenfassungen werden wiederverwendet."""
+    summaries = {topic: manifest.summary(topic_digests[topic]) for topic in changed_topics}
+    pending_summaries = [topic for topic, cached in summaries.items() if cached is None]
+    results, failed = map_ordered(
+        lambda topic: timer.measure("Zusammenfassung", lambda: summarizer.summarize(
+            [c.page_content for c in topics[topic]], label=topic)),
+        pending_summaries, workers=summary_topic_workers, retries=0, label="Zusammenfassungen"
+    )
+    for position, (topic, result) in enumerate(zip(pending_summaries, results)):
+        if result is None:
+            print(f"⚠️  Keine Zusammenfassung für {topic}: {str(failed[position])[:120]}")
+            del summaries[topic]
+            continue
+        manifest.set_summary(topic_digests[topic], *result)
+        summaries[topic] = result
+    return summaries
+
+
+def store_topics(manifest, topics, changed_topics, topic_digests, timer) -> list:
+    """Chunks in die gemeinsame Themen-Collection schreiben (pro Thema ersetzt, in Batches eingebettet)."""
+    topic_store = open_topic_store(embedding_model, vectorstore_dir)
+    stored_topics = []
+    for topic in changed_topics:
+        try:
+            timer.measure("Vektorstore", lambda: replace_topic_documents(
+                topic_store, catalog_topic(topic), topics[topic], batch_size=store_batch_size), len(topics[topic]))
+            stored_topics.append(topic)
+            manifest.set_topic(topic, topic_digests[topic])
+        except Exception as e:
+            stored_topics.append(f"{topic} ❌ ({str(e)[:60]}...)")
+
+    # Themen, die es nicht mehr gibt: Chunks entfernen (Katalog-Einträge bleiben bestehen)
+    for topic in manifest.stale_topics(topics):
+        if catalog_topic(topic) not in {catalog_topic(t) for t in topics}:
+            remove_topic(topic_store, catalog_topic(topic))
+        manifest.drop_topic(topic)
+        print(f"🗑️  Thema {topic} entfernt")
+    return stored_topics
+
+
+def main(inputs, mode=topic_mode, workers=classify_workers, extract_workers=EXTRACT_WORKERS, timer=None) -> list:
+    """Gibt die Katalog-Themen zurück, deren Zusammenfassung neu geschrieben wurde."""
+    run_start = time.perf_counter()
+    timer = timer or StageTimer()
+    manifest = IngestManifest()
+
+    ingest(manifest, resolve_pdfs(inputs), mode, timer, workers, extract_workers)
+    chunk_hashes = manifest.chunk_hashes()
+    chunks = [manifest.document(h) for h in chunk_hashes]
+    topics = assign_topics(manifest, chunk_hashes, chunks, mode, timer, workers)
+    manifest.save()  # Zuordnungen sichern, bevor die teuren Schritte folgen
+
+    # Nur Themen mit geänderter Chunk-Menge werden neu zusammengefasst und eingebettet
+    topic_digests = {topic: manifest.digest([text_hash(c.page_content) for c in docs]) for topic, docs in topics.items()}
+    changed_topics = [topic for topic, digest in topic_digests.items()
+                      if not manifest.topic_unchanged(topic, digest) or manifest.summary(digest) is None]
+    print(f"🔁 {len(changed_topics)} von {len(topics)} Themen geändert")
+
+    summaries = summarize_topics(manifest, topics, changed_topics, topic_digests, timer)
+    store_topics(manifest, topics, changed_topics, topic_digests, timer)
+
+    # Zusammenfassungen ins Katalog-Bundle schreiben
+    # (Themenname wie das Metadatum "topic" im Vektorstore, aus dem der Quiz-Creator liest)
+    for topic, (short, long) in summaries.items():
+        write_topic_summary(catalog_topic(topic), short=short, long=long)
+
+    manifest.prune_summaries()
+    manifest.save()
+    timer.report(time.perf_counter() - run_start)
+    print("✅ Fertig")
+    return sorted({catalog_topic(topic) for topic in summaries})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Liest PDFs ein und erzeugt Themen, Zusammenfassungen und Vektorstore.")
+    parser.add_argument("inputs", nargs="*", default=[pdf_dir], help="PDF-Dateien oder Ordner (Standard: pdfs/)")
+    parser.add_argument("--mode", choices=("llm", "cluster"), default=topic_mode)
+    parser.add_argument("--workers", type=int, default=classify_workers, help="parallele LLM-Aufrufe der Themen-Zuordnung")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS, help="Prozesse für die Textextraktion")
+    args = parser.parse_args()
+    main(args.inputs, mode=args.mode, workers=args.workers, extract_workers=args.extract_workers)
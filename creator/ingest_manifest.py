@@ -0,0 +1,149 @@
+# --- creator/ingest_manifest.py ---
+# Manifest für inkrementelle Läufe von agent_topic_summary.py: Hashes pro PDF und pro Chunk,
+# gemerkte Themen-Zuordnungen und Zusammenfassungen. Ein erneuter Lauf verarbeitet nur neue
+# oder geänderte PDFs/Chunks und baut nur die Themen neu, deren Chunk-Menge sich geändert hat.
+
+import os
+import json
+import hashlib
+
+# === Einstellungen ===
+MANIFEST_PATH = "ingest_manifest.json"
+EMBEDDING_CACHE_DIR = "embedding_cache"  # LocalFileStore für CacheBackedEmbeddings
+MANIFEST_VERSION = 1
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cached_embeddings(embedding_model, cache_dir: str = EMBEDDING_CACHE_DIR):
+    """Embeddings werden pro Chunk-Text auf der Platte gemerkt und nie doppelt berechnet."""
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+    return CacheBackedEmbeddings.from_bytes_store(
+        embedding_model, LocalFileStore(cache_dir), namespace=embedding_model.model
+    )
+
+
+class IngestManifest:
+    """
+    Aufbau der JSON-Datei:
+      pdfs:      Pfad -> {"sha", "chunks": [Chunk-Hashes in Reihenfolge]}
+      chunks:    Chunk-Hash -> {"text", "metadata"}
+      labels:    Chunk-Hash -> Thema (LLM-Zuordnung, unabhängig von den anderen Chunks)
+      clusters:  {"digest", "labels"} des letzten Clustering-Laufs (gilt nur für genau diese Chunk-Menge)
+      topics:    Thema -> Digest der Chunk-Menge, aus der Store und Zusammenfassung gebaut wurden
+      summaries: Digest -> {"short", "long"}
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.data = {"version": MANIFEST_VERSION, "pdfs": {}, "chunks": {}, "labels": {},
+                     "clusters": {}, "topics": {}, "summaries": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == MANIFEST_VERSION:
+                self.data.update(stored)
+            else:
+                print(f"⚠️ Manifest {path} hat eine andere Version – alles wird neu aufgebaut.")
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # --- PDFs und Chunks ---
+    def pdf_unchanged(self, path: str, sha: str) -> bool:
+        return self.data["pdfs"].get(path, {}).get("sha") == sha
+
+    def set_pdf(self, path: str, sha: str, chunks) -> list:
+        """Speichert die Chunks (LangChain-Documents) einer PDF; gibt die Chunk-Hashes zurück."""
+        hashes = []
+        for chunk in chunks:
+            h = text_hash(chunk.page_content)
+            self.data["chunks"].setdefault(h, {"text": chunk.page_content, "metadata": dict(chunk.metadata)})
+            hashes.append(h)
+        self.data["pdfs"][path] = {"sha": sha, "chunks": hashes}
+        return hashes
+
+    def known_pdfs(self) -> list:
+        return list(self.data["pdfs"])
+
+    def keep_pdfs(self, paths):
+        """Entfernt PDFs, die nicht mehr vorhanden sind, und alle nicht mehr referenzierten Chunks."""
+        removed = [p for p in self.data["pdfs"] if p not in paths]
+        for path in removed:
+            del self.data["pdfs"][path]
+        referenced = set(self.chunk_hashes())
+        for h in [h for h in self.data["chunks"] if h not in referenced]:
+            del self.data["chunks"][h]
+            self.data["labels"].pop(h, None)
+        return removed
+
+    def chunk_hashes(self) -> list:
+        """Alle aktuellen Chunk-Hashes in PDF-/Chunk-Reihenfolge, ohne Duplikate."""
+        seen = {}
+        for path in sorted(self.data["pdfs"]):
+            for h in self.data["pdfs"][path]["chunks"]:
+                seen.setdefault(h, None)
+        return list(seen)
+
+    def document(self, h: str):
+        from langchain_core.documents import Document
+        chunk = self.data["chunks"][h]
+        return Document(page_content=chunk["text"], metadata=chunk["metadata"])
+
+    # --- Themen-Zuordnung ---
+    def label(self, h: str):
+        return self.data["labels"].get(h)
+
+    def set_label(self, h: str, topic: str):
+        self.data["labels"][h] = topic
+
+    def cluster_labels(self, digest: str):
+        clusters = self.data["clusters"]
+        return clusters.get("labels") if clusters.get("digest") == digest else None
+
+    def set_cluster_labels(self, digest: str, labels: dict):
+        self.data["clusters"] = {"digest": digest, "labels": labels}
+
+    # --- Themen, Stores und Zusammenfassungen ---
+    @staticmethod
+    def digest(hashes) -> str:
+        return text_hash("\n".join(hashes))
+
+    def topic_unchanged(self, topic: str, digest: str) -> bool:
+        return self.data["topics"].get(topic) == digest
+
+    def set_topic(self, topic: str, digest: str):
+        self.data["topics"][topic] = digest
+
+    def stale_topics(self, current) -> list:
+        """Themen aus dem letzten Lauf, die es nicht mehr gibt."""
+        return [t for t in self.data["topics"] if t not in current]
+
+    def drop_topic(self, topic: str):
+        self.data["topics"].pop(topic, None)
+
+    def summary(self, digest: str):
+        """(short, long) oder None; Einträge älterer Läufe (nur ein Text) gelten als fehlend."""
+        entry = self.data["summaries"].get(digest)
+        return (entry["short"], entry["long"]) if isinstance(entry, dict) else None
+
+    def set_summary(self, digest: str, short: str, long: str):
+        self.data["summaries"][digest] = {"short": short, "long": long}
+
+    def prune_summaries(self):
+        used = set(self.data["topics"].values())
+        self.data["summaries"] = {d: s for d, s in self.data["summaries"].items() if d in used}
@@ -0,0 +1,117 @@
+# --- creator/ingest_pipeline.py ---
+# Bausteine der Ingestion in agent_topic_summary.py: Seiten werden in einem Prozess-Pool aus
+# den PDFs gelesen und fließen als Generatoren mit begrenzten Puffern durch Splitter,
+# Themen-Zuordnung und Embedding. So bleibt der Speicher flach, und die CPU-Kerne lesen
+# weiter, während die LLM-Stufen auf Ollama warten.
+
+import time
+import threading
+from collections import deque, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# === Einstellungen ===
+EXTRACT_WORKERS = 4  # Prozesse für die Textextraktion
+PAGES_PER_TASK = 8  # Seiten pro Prozess-Aufgabe (PDF wird pro Aufgabe einmal geöffnet)
+EMBED_BATCH_SIZE = 64
+
+
+class StageTimer:
+    """
+    Arbeitszeit (über alle Worker summiert) und Anzahl Elemente pro Pipeline-Stufe.
+    Ein optionaler listener(stage, items, seconds) bekommt jede Messung (z. B. für Fortschrittsanzeigen).
+    """
+
+    def __init__(self, listener=None):
+        self.listener = listener
+        self._lock = threading.Lock()
+        self.busy = defaultdict(float)
+        self.items = defaultdict(int)
+        self._order = []
+
+    def add(self, stage: str, seconds: float, items: int = 1):
+        with self._lock:
+            if stage not in self.busy:
+                self._order.append(stage)
+            self.busy[stage] += seconds
+            self.items[stage] += items
+        if self.listener is not None:
+            self.listener(stage, items, seconds)
+
+    def measure(self, stage: str, fn, items: int = 1):
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.add(stage, time.perf_counter() - start, items)
+
+    def report(self, wall: float):
+        print("\n⏱️  Stufe            | Elemente | Arbeitszeit")
+        for stage in self._order:
+            print(f"   {stage:16s} | {self.items[stage]:8d} | {self.busy[stage]:8.1f} s")
+        print(f"   {'Gesamt (Wanduhr)':16s} |          | {wall:8.1f} s")
+
+
+# --- Extraktion (läuft in eigenen Prozessen, daher nur einfache Rückgabewerte) ---
+def _page_count(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_range(path: str, start: int, end: int):
+    from pypdf import PdfReader
+    began = time.perf_counter()
+    reader = PdfReader(path)
+    pages = [(i, reader.pages[i].extract_text() or "") for i in range(start, end)]
+    return pages, time.perf_counter() - began
+
+
+def iter_pages(paths, timer: StageTimer, workers: int = EXTRACT_WORKERS, pages_per_task: int = PAGES_PER_TASK):
+    """Seiten aller PDFs als Documents (Metadaten wie PyPDFLoader), in Reihenfolge, höchstens 2 × workers Aufgaben offen."""
+    from langchain_core.documents import Document
+
+    def tasks():
+        for path in paths:
+            count = _page_count(path)
+            for start in range(0, count, pages_per_task):
+                yield path, start, min(start + pages_per_task, count)
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        def collect():
+            path, future = pending.popleft()
+            pages, seconds = future.result()
+            timer.add("Extraktion", seconds, len(pages))
+            for page, text in pages:
+                yield Document(page_content=text, metadata={"source": path, "page": page})
+
+        for path, start, end in tasks():
+            pending.append((path, pool.submit(_extract_range, path, start, end)))
+            if len(pending) >= 2 * max(1, workers):
+                yield from collect()
+        while pending:
+            yield from collect()
+
+
+def split_pages(pages, splitter, timer: StageTimer):
+    """Zerlegt Seite für Seite (wie split_documents auf der geladenen PDF)."""
+    for page in pages:
+        chunks = timer.measure("Splitten", lambda: splitter.split_documents([page]))
+        yield from chunks
+
+
+def embed_batches(items, embedding_model, timer: StageTimer, text=lambda item: item.page_content,
+                  batch_size: int = EMBED_BATCH_SIZE):
+    """
+    Reicht items unverändert durch und bettet ihre Texte batchweise ein. Mit CacheBackedEmbeddings
+    landen die Vektoren im Cache, sodass Clustering und Vektorstore sie später nicht neu berechnen.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            timer.measure("Embedding", lambda: embedding_model.embed_documents([text(i) for i in batch]), len(batch))
+            yield from batch
+            batch = []
+    if batch:
+        timer.measure("Embedding", lambda: embedding_model.embed_documents([text(i) for i in batch]), len(batch))
+        yield from batch
@@ -0,0 +1,109 @@
+# --- creator/map_reduce_summary.py ---
+# Zusammenfassung großer Themen in mehreren Stufen statt in einem einzigen Riesen-Prompt:
+# Chunk-Gruppen werden parallel zu Stichpunkten verdichtet (Map), diese stufenweise weiter
+# zusammengefasst (Reduce), bis alles in ein Token-Budget passt. Daraus entstehen die lange
+# und – aus der langen – die kurze Zusammenfassung.
+
+from creator.parallel_tasks import map_ordered, DEFAULT_WORKERS, DEFAULT_RETRIES, DEFAULT_BACKOFF
+
+# === Einstellungen ===
+TOKEN_BUDGET = 3000  # Eingabe-Tokens pro LLM-Aufruf (ohne Anweisung); passt in num_ctx 4096
+CHARS_PER_TOKEN = 4  # grobe Schätzung für englischen Fließtext
+MAX_LEVELS = 5
+SEPARATOR = "\n---\n"
+
+MAP_PROMPT = """
+You are a Lean Production tutor. Condense the following course excerpts into concise bullet points.
+Keep every key idea, definition, method and example; drop repetitions and filler.
+
+Text:
+{text}
+"""
+
+REDUCE_PROMPT = """
+You are a Lean Production tutor. The following are bullet-point notes on parts of one topic.
+Merge them into one concise set of bullet points without losing key ideas, definitions or methods.
+
+Notes:
+{text}
+"""
+
+LONG_PROMPT = """
+You are a Lean Production tutor. Write a clear and extensive summary (10-15 sentences) of the following content
+as if you're explaining it to a student. Focus on the key ideas and concepts.
+
+Text:
+{text}
+"""
+
+SHORT_PROMPT = """
+You are a Lean Production tutor. Summarize the following explanation in 2-3 sentences
+that tell a student what the topic is about and why it matters.
+
+Text:
+{text}
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack(texts, budget: int = TOKEN_BUDGET) -> list:
+    """Fasst Texte der Reihe nach zu Gruppen bis zum Budget zusammen; zu lange Texte werden gekürzt."""
+    groups, current, used = [], [], 0
+    for text in texts:
+        text = text[:budget * CHARS_PER_TOKEN]
+        tokens = estimate_tokens(text)
+        if current and used + tokens > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+class MapReduceSummarizer:
+    """Erzeugt (short, long) für die Chunk-Texte eines Themas; große Themen in parallelen Stufen."""
+
+    def __init__(self, llm, token_budget: int = TOKEN_BUDGET, workers: int = DEFAULT_WORKERS,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+        self.llm = llm
+        self.token_budget = token_budget
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.calls = 0
+
+    def _call(self, template: str, text: str) -> str:
+        self.calls += 1
+        return self.llm.invoke(template.format(text=text)).strip()
+
+    def condense(self, texts, label: str = "Thema") -> list:
+        """Verdichtet die Texte stufenweise, bis sie zusammen ins Token-Budget passen."""
+        texts = [t for t in texts if t.strip()]
+        level = 0
+        while sum(estimate_tokens(t) for t in texts) > self.token_budget and level < MAX_LEVELS:
+            groups = pack(texts, self.token_budget)
+            template = MAP_PROMPT if level == 0 else REDUCE_PROMPT
+            results, errors = map_ordered(
+                lambda group: self._call(template, SEPARATOR.join(group)), groups,
+                workers=self.workers, retries=self.retries, backoff=self.backoff,
+                label=f"{label} Stufe {level + 1}"
+            )
+            for index in sorted(errors):
+                print(f"⚠️  {label}: Gruppe {index} der Stufe {level + 1} übersprungen ({str(errors[index])[:120]})")
+            if len(errors) == len(groups):
+                raise RuntimeError(f"Zusammenfassung von {label} fehlgeschlagen")
+            texts = [r for r in results if r]
+            level += 1
+        return texts
+
+    def summarize(self, texts, label: str = "Thema") -> tuple:
+        """(short, long): long aus den verdichteten Notizen, short aus long."""
+        notes = self.condense(texts, label)
+        long = self._call(LONG_PROMPT, SEPARATOR.join(notes)[:self.token_budget * CHARS_PER_TOKEN])
+        short = self._call(SHORT_PROMPT, long)
+        return short, long
@@ -0,0 +1,55 @@
+# --- creator/migrate_pickles_to_bundle.py ---
+# Einmalige Migration: quiz_catalogs/*.pkl und topic_summaries/*.pkl → Katalog-Bundle.
+# Nur für eigene, vertrauenswürdige Pickle-Dateien verwenden (pickle.load führt Code aus).
+#
+#   python -m creator.migrate_pickles_to_bundle [--quiz-dir quiz_catalogs] [--summary-dir topic_summaries] [--bundle lean_catalog.db]
+
+import os
+import pickle
+import argparse
+
+from utils.catalog_bundle import BUNDLE_PATH, write_topic_quiz, write_topic_summary
+
+
+def _iter_pickles(directory):
+    if not os.path.isdir(directory):
+        print(f"⚠️  Verzeichnis nicht gefunden: {directory}")
+        return
+    for file in sorted(os.listdir(directory)):
+        if not file.endswith(".pkl"):
+            continue
+        topic = file[:-4].replace("_", " ")
+        try:
+            with open(os.path.join(directory, file), "rb") as f:
+                yield topic, pickle.load(f)
+        except Exception as e:
+            print(f"❌ Konnte {file} nicht laden: {e}")
+
+
+def migrate(quiz_dir="quiz_catalogs", summary_dir="topic_summaries", bundle_path=BUNDLE_PATH):
+    quiz_count = summary_count = 0
+
+    for topic, questions in _iter_pickles(quiz_dir):
+        if not isinstance(questions, list):
+            print(f"⚠️  Unerwartetes Format für Quiz {topic} – übersprungen.")
+            continue
+        write_topic_quiz(topic, questions, path=bundle_path)
+        quiz_count += 1
+
+    for topic, summary in _iter_pickles(summary_dir):
+        if not isinstance(summary, dict):
+            print(f"⚠️  Unerwartetes Format für Zusammenfassung {topic} – übersprungen.")
+            continue
+        write_topic_summary(topic, summary.get("short"), summary.get("long"), path=bundle_path)
+        summary_count += 1
+
+    print(f"✅ {quiz_count} Quiz-Themen und {summary_count} Zusammenfassungen nach {bundle_path} migriert.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migriert Pickle-Kataloge in das Katalog-Bundle.")
+    parser.add_argument("--quiz-dir", default="quiz_catalogs")
+    parser.add_argument("--summary-dir", default="topic_summaries")
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    args = parser.parse_args()
+    migrate(args.quiz_dir, args.summary_dir, args.bundle)
@@ -0,0 +1,85 @@
+# --- creator/parallel_tasks.py ---
+# Gemeinsame Hilfsfunktion der Creator-Skripte: LLM-Aufrufe parallel, begrenzt und
+# mit Wiederholungen ausführen, Ergebnisse in Eingabereihenfolge.
+
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# === Einstellungen ===
+DEFAULT_WORKERS = 4  # ~ OLLAMA_NUM_PARALLEL; mehr Worker als Ollama-Slots bringen nichts
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # Sekunden; verdoppelt sich pro Versuch (plus Zufallsanteil)
+PROGRESS_EVERY = 10
+
+
+def with_retries(fn, item, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Ruft fn(item) auf; bei Fehlern bis zu `retries` weitere Versuche mit exponentiellem Backoff."""
+    for attempt in range(retries + 1):
+        try:
+            return fn(item)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+
+
+def map_ordered(fn, items, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                label="Aufgaben", progress_every=PROGRESS_EVERY):
+    """
+    Führt fn für alle items mit höchstens `workers` gleichzeitigen Aufrufen aus.
+    Gibt (Ergebnisse in Eingabereihenfolge, Fehler {Index: Exception}) zurück;
+    fehlgeschlagene Einträge sind None. Fortschritt und Durchsatz werden ausgegeben.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = {}
+    done = 0
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def run(index):
+        nonlocal done
+        try:
+            results[index] = with_retries(fn, items[index], retries, backoff)
+        except Exception as e:
+            errors[index] = e
+        with lock:
+            done += 1
+            if done % progress_every == 0 or done == len(items):
+                elapsed = time.perf_counter() - start
+                print(f"   {label}: {done}/{len(items)} ({done / elapsed:.2f}/s, {len(errors)} Fehler)")
+
+    if items:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(executor.map(run, range(len(items))))
+
+    elapsed = time.perf_counter() - start
+    print(f"⏱️  {label}: {len(items)} in {elapsed:.1f} s ({len(items) / elapsed if elapsed else 0:.2f}/s), {len(errors)} fehlgeschlagen")
+    return results, errors
+
+
+def map_streaming(fn, items, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, buffer=None):
+    """
+    Generator-Variante von map_ordered für Pipelines: liest items erst bei Bedarf und hat
+    höchstens `buffer` (Standard: 2 × workers) Aufgaben gleichzeitig offen. Liefert
+    (item, Ergebnis, Exception oder None) in Eingabereihenfolge.
+    """
+    buffer = buffer or 2 * max(1, workers)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        def collect():
+            item, future = pending.popleft()
+            try:
+                return item, future.result(), None
+            except Exception as e:
+                return item, None, e
+
+        for item in items:
+            pending.append((item, executor.submit(with_retries, fn, item, retries, backoff)))
+            if len(pending) >= buffer:
+                yield collect()
+        while pending:
+            yield collect()
@@ -0,0 +1,197 @@
+# --- creator/question_index.py ---
+# Embedding-Index aller übernommenen Quizfragen des Katalogs. Der Quiz-Creator prüft neue
+# Fragen gegen den Index (alle Kandidaten eines Aufrufs in einem vektorisierten Kosinus-Durchgang)
+# und verwirft Beinahe-Duplikate schon bei der Erzeugung. Als Skript listet das Modul die
+# Duplikat-Cluster im bestehenden Katalog auf.
+#
+#   python -m creator.question_index [--threshold 0.92] [--bundle lean_catalog.db | --quiz-dir quiz_catalogs]
+
+import argparse
+import threading
+from collections import Counter
+from contextlib import closing
+
+import numpy as np
+
+from utils.catalog_bundle import BUNDLE_PATH, open_bundle, read_quiz_revisions, read_topic_questions
+
+# === Einstellungen ===
+DUPLICATE_THRESHOLD = 0.92  # Kosinus-Ähnlichkeit der Fragetexte, ab der zwei Fragen als gleich gelten
+EMBED_BATCH_SIZE = 64
+BLOCK_SIZE = 1024  # Zeilen pro Block beim paarweisen Vergleich (begrenzt den Speicher)
+
+
+def _unit_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def embed_texts(embedding_model, texts, batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embedding_model.embed_documents(texts[start:start + batch_size]))
+    return _unit_rows(vectors)
+
+
+def load_catalog_questions(bundle_path: str = BUNDLE_PATH) -> list:
+    """[(Thema, Frage-Dict)] aller Fragen im Katalog-Bundle."""
+    with closing(open_bundle(bundle_path)) as conn:
+        return [(topic, q) for topic in sorted(read_quiz_revisions(conn)) for q in read_topic_questions(conn, topic)]
+
+
+def load_pickled_questions(quiz_dir: str) -> list:
+    """[(Thema, Frage-Dict)] aus alten quiz_catalogs/*.pkl (nur eigene, vertrauenswürdige Dateien)."""
+    from creator.migrate_pickles_to_bundle import _iter_pickles
+    return [(topic, q) for topic, questions in _iter_pickles(quiz_dir) if isinstance(questions, list)
+            for q in questions if isinstance(q, dict) and q.get("question")]
+
+
+class QuestionIndex:
+    """
+    Thema und Fragetext aller übernommenen Fragen mit normierten Embeddings (eine Matrix).
+    add_unique prüft Kandidaten gegen den Index und untereinander und übernimmt nur die,
+    die unter der Schwelle bleiben – atomar, damit parallel erzeugte Themen sich nicht doppeln.
+    """
+
+    def __init__(self, embedding_model, threshold: float = DUPLICATE_THRESHOLD):
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.entries = []  # [(Thema, Fragetext)]
+        self.vectors = None  # np.ndarray (n, d)
+        self.rejected = 0
+        self._topic_rejected = Counter()  # Thema -> verworfen seit drop_topic (für restore_topic)
+
+    @classmethod
+    def from_questions(cls, embedding_model, questions, threshold: float = DUPLICATE_THRESHOLD):
+        index = cls(embedding_model, threshold)
+        if questions:
+            index.entries = [(topic, q["question"]) for topic, q in questions]
+            index.vectors = embed_texts(embedding_model, [text for _, text in index.entries])
+        return index
+
+    def _keep_rows(self, keep: list):
+        self.entries = [self.entries[i] for i in keep]
+        self.vectors = self.vectors[keep] if self.vectors is not None and keep else None
+
+    def drop_topic(self, topic: str) -> tuple:
+        """
+        Vor der Neuerzeugung eines Themas: seine alten Fragen zählen nicht als Duplikate.
+        Gibt (Einträge, Vektoren) der entfernten Fragen für restore_topic zurück.
+        """
+        with self._lock:
+            dropped = [i for i, (t, _) in enumerate(self.entries) if t == topic]
+            removed = ([self.entries[i] for i in dropped], self.vectors[dropped] if dropped else None)
+            self._keep_rows([i for i, (t, _) in enumerate(self.entries) if t != topic])
+            self._topic_rejected[topic] = 0
+            return removed
+
+    def restore_topic(self, topic: str, removed: tuple):
+        """
+        Neuerzeugung gescheitert: bisher übernommene neue Fragen raus, die alten (drop_topic) wieder rein.
+        Die seitdem verworfenen Fragen zählen nicht mehr – eine Wiederholung prüft sie erneut.
+        """
+        entries, vectors = removed or ([], None)
+        with self._lock:
+            self.rejected -= self._topic_rejected.pop(topic, 0)
+            self._keep_rows([i for i, (t, _) in enumerate(self.entries) if t != topic])
+            if entries:
+                self.entries.extend(entries)
+                self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+
+    def remove(self, topic: str, questions: list):
+        """Nimmt von add_unique übernommene Fragen wieder heraus (z. B. ohne freien Platz im Quiz)."""
+        texts = {q["question"] for q in questions}
+        with self._lock:
+            self._keep_rows([i for i, (t, text) in enumerate(self.entries) if t != topic or text not in texts])
+
+    def add_unique(self, topic: str, questions: list) -> tuple:
+        """(übernommene, verworfene) Fragen; Duplikate werden mit der ähnlichsten Frage gemeldet."""
+        if not questions:
+            return [], []
+        candidates = embed_texts(self.embedding_model, [q["question"] for q in questions])
+        accepted, duplicates = [], []
+        with self._lock:
+            if self.vectors is not None and self.vectors.shape[1] == candidates.shape[1]:
+                similarities = candidates @ self.vectors.T
+                best = similarities.argmax(axis=1)
+                best_scores = similarities[np.arange(len(questions)), best]
+            else:
+                best = best_scores = None
+            # Kandidaten untereinander: nur gegen frühere Kandidaten desselben Aufrufs
+            internal = np.triu(candidates @ candidates.T, k=1).T
+            kept_rows = []
+            for i, q in enumerate(questions):
+                if best_scores is not None and best_scores[i] >= self.threshold:
+                    duplicates.append((q, self.entries[best[i]], float(best_scores[i])))
+                    continue
+                earlier = [j for j in kept_rows if internal[i, j] >= self.threshold]
+                if earlier:
+                    duplicates.append((q, (topic, questions[earlier[0]]["question"]), float(internal[i, earlier[0]])))
+                    continue
+                kept_rows.append(i)
+                accepted.append(q)
+            if kept_rows:
+                self.entries.extend((topic, questions[i]["question"]) for i in kept_rows)
+                new = candidates[kept_rows]
+                self.vectors = new if self.vectors is None else np.vstack([self.vectors, new])
+            self.rejected += len(duplicates)
+            self._topic_rejected[topic] += len(duplicates)
+        return accepted, duplicates
+
+
+def duplicate_clusters(vectors: np.ndarray, threshold: float = DUPLICATE_THRESHOLD, block_size: int = BLOCK_SIZE) -> list:
+    """Gruppen von Indizes, die über Ähnlichkeiten ≥ threshold verbunden sind (Union-Find, blockweise Matrixprodukte)."""
+    n = len(vectors)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start in range(0, n, block_size):
+        block = vectors[start:start + block_size] @ vectors.T
+        rows, cols = np.nonzero(block >= threshold)
+        for r, c in zip(rows + start, cols):
+            if r < c:
+                parent[find(r)] = find(c)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+
+def report(questions, embedding_model, threshold: float = DUPLICATE_THRESHOLD):
+    if not questions:
+        print("⚠️  Keine Fragen gefunden.")
+        return []
+    vectors = embed_texts(embedding_model, [q["question"] for _, q in questions])
+    clusters = duplicate_clusters(vectors, threshold)
+    for number, members in enumerate(clusters, 1):
+        topics = {questions[i][0] for i in members}
+        print(f"\n🔁 Cluster {number}: {len(members)} Fragen in {len(topics)} Thema/Themen")
+        for i in members:
+            topic, q = questions[i]
+            print(f"   [{topic}] ({q.get('difficulty', '?')}) {q['question']}")
+    duplicates = sum(len(c) - 1 for c in clusters)
+    print(f"\n📊 {len(questions)} Fragen, {len(clusters)} Duplikat-Cluster, {duplicates} überzählige Fragen "
+          f"({duplicates / len(questions):.0%}) bei Schwelle {threshold}")
+    return clusters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Listet Beinahe-Duplikate unter den Quizfragen des Katalogs.")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    parser.add_argument("--quiz-dir", default=None, help="alte Pickle-Kataloge statt des Bundles lesen")
+    args = parser.parse_args()
+
+    from langchain_ollama import OllamaEmbeddings
+    from creator.ingest_manifest import cached_embeddings
+    embedding_model = cached_embeddings(OllamaEmbeddings(model="mxbai-embed-large"))
+    questions = load_pickled_questions(args.quiz_dir) if args.quiz_dir else load_catalog_questions(args.bundle)
+    report(questions, embedding_model, args.threshold)
@@ -0,0 +1,107 @@
+# --- creator/topic_clustering.py ---
+# Themenbildung per Embedding-Clustering statt einem LLM-Label pro Chunk:
+# alle Chunks werden in Batches eingebettet, mit k-Means (NumPy) gruppiert, und
+# das LLM vergibt nur einen Namen pro Cluster.
+
+import math
+from collections import defaultdict
+
+import numpy as np
+
+# === Einstellungen ===
+EMBED_BATCH_SIZE = 64
+KMEANS_ITERATIONS = 50
+NAME_SAMPLES = 3  # Chunks nahe am Zentrum, die das LLM zur Benennung sieht
+MIN_CLUSTERS = 2
+MAX_CLUSTERS = 12
+
+NAME_PROMPT = """
+You are a Lean Production expert. The following text excerpts belong to one topic.
+Assign a concise topic category that reflects the main idea, principle, or method they share.
+Return only the topic name.
+
+Excerpts:
+{text}
+"""
+
+
+def embed_chunks(texts, embedding_model, batch_size=EMBED_BATCH_SIZE) -> np.ndarray:
+    """Embeddings in Batches (ein Ollama-Aufruf pro Batch), zeilenweise auf Länge 1 normiert."""
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embedding_model.embed_documents(texts[start:start + batch_size]))
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def choose_k(n: int) -> int:
+    """Nie mehr Cluster als Chunks (auch unter MIN_CLUSTERS)."""
+    return min(n, max(MIN_CLUSTERS, min(MAX_CLUSTERS, round(math.sqrt(n / 2)))))
+
+
+def kmeans(X: np.ndarray, k: int, iterations=KMEANS_ITERATIONS, seed=0):
+    """Sphärisches k-Means (Kosinus) mit k-means++-Start; gibt (Labels, Zentren) zurück."""
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+    centers = [X[rng.integers(n)]]
+    for _ in range(1, k):
+        distances = 1 - np.max(X @ np.stack(centers).T, axis=1)
+        distances = np.clip(distances, 0, None)
+        total = distances.sum()
+        probabilities = distances / total if total > 0 else None
+        centers.append(X[rng.choice(n, p=probabilities)])
+    centers = np.stack(centers)
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        new_labels = np.argmax(X @ centers.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(k):
+            members = X[labels == c]
+            if len(members):
+                center = members.sum(axis=0)
+                centers[c] = center / (np.linalg.norm(center) or 1)
+    return labels, centers
+
+
+def name_cluster(llm, texts) -> str:
+    excerpts = "\n---\n".join(t[:800] for t in texts)
+    return llm.invoke(NAME_PROMPT.format(text=excerpts)).strip().strip('"')
+
+
+def cluster_topics(chunks, embedding_model, llm, k=None, workers=4):
+    """
+    Gleiche Struktur wie die LLM-Zuordnung: {Themenname: [Chunks]} in Chunk-Reihenfolge.
+    Cluster, die denselben Namen bekommen, werden zusammengelegt.
+    """
+    from creator.parallel_tasks import map_ordered
+
+    if not chunks:
+        return {}
+    texts = [c.page_content.strip() for c in chunks]
+    X = embed_chunks(texts, embedding_model)
+    k = min(k or choose_k(len(chunks)), len(chunks))
+    labels, centers = kmeans(X, k)
+    print(f"🧩 {len(chunks)} Chunks in {k} Cluster gruppiert")
+
+    representatives = []
+    for c in range(k):
+        members = np.flatnonzero(labels == c)
+        if not len(members):
+            representatives.append(None)
+            continue
+        closest = members[np.argsort(-(X[members] @ centers[c]))[:NAME_SAMPLES]]
+        representatives.append([texts[i] for i in closest])
+
+    names, _ = map_ordered(
+        lambda reps: name_cluster(llm, reps) if reps else None,
+        representatives, workers=workers, label="Cluster-Namen"
+    )
+    topics = defaultdict(list)
+    for chunk, label in zip(chunks, labels):
+        name = names[label] or f"Topic {label + 1}"
+        topics[name].append(chunk)
+    return topics
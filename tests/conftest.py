@@ -0,0 +1,9 @@
+# --- tests/conftest.py ---
+# Tests der Laufzeit-Bausteine ohne Ollama/Streamlit (Fehlerpfade, Ergebnisse statt Zeiten).
+#
+#   python -m pytest -q tests
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+# --- tests/test_cancellation.py ---
+
+import threading
+import uuid
+
+import pytest
+
+from utils.cancellation import GenerationCancelled, current_token
+from utils.pregeneration import PregenerationScheduler
+from utils.step_cache import cancel_pending, foreground_token, run_foreground
+
+started = threading.Event()  # die Generierung läuft und wartet auf den Abbruch
+
+
+def _wait_for_cancel():
+    token = current_token()
+    started.set()
+    for _ in range(200):
+        token.raise_if_cancelled()
+        threading.Event().wait(0.01)
+    return "finished"
+
+
+def test_cancel_pending_stops_foreground_generation():
+    session_id = str(uuid.uuid4())
+    started.clear()
+    threading.Thread(target=lambda: started.wait(2) and cancel_pending(session_id)).start()
+    with pytest.raises(GenerationCancelled):
+        run_foreground(session_id, _wait_for_cancel)
+
+
+def test_new_token_after_cancel():
+    session_id = str(uuid.uuid4())
+    token = foreground_token(session_id)
+    assert foreground_token(session_id) is token
+    cancel_pending(session_id)
+    assert token.cancelled
+    assert not foreground_token(session_id).cancelled
+    assert run_foreground(session_id, lambda: "ok") == "ok"
+
+
+def test_discarded_pregeneration_is_cancelled():
+    scheduler = PregenerationScheduler(max_workers=1)
+    started.clear()
+    scheduler.schedule("run", "lecture", "digest", _wait_for_cancel)
+    assert started.wait(2)
+    job = scheduler._jobs[("run", "lecture")]
+    scheduler.discard_run("run")
+    with pytest.raises(GenerationCancelled):
+        job[1].result(timeout=2)
+    assert scheduler.stats() == {"started": 1, "used": 0, "discarded": 1, "pending": 0}
+
+
+def test_pregeneration_with_other_inputs_is_discarded():
+    scheduler = PregenerationScheduler(max_workers=1)
+    scheduler.schedule("run", "lecture", "easy", lambda: "easy lecture")
+    assert scheduler.take("run", "lecture", "hard") is None
+    assert scheduler.stats()["discarded"] == 1
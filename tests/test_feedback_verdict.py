@@ -0,0 +1,24 @@
+# --- tests/test_feedback_verdict.py ---
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from utils.feedback_tools import _parse_verdict
+
+
+def test_complete_verdict_with_surrounding_text():
+    assert _parse_verdict('Here you go:\n{"is_correct": true, "feedback": "Correct."}') == (True, "Correct.")
+
+
+def test_truncated_verdict_keeps_judgment_and_feedback_so_far():
+    verdict = _parse_verdict('{"is_correct": false, "feedback": "Missing the \\"pull\\" principle, the correct ans')
+    assert verdict == (False, 'Missing the "pull" principle, the correct ans …')
+
+
+def test_truncated_before_feedback():
+    assert _parse_verdict('{\n  "is_correct": TRUE,\n  "feedb') == (True, "No feedback provided.")
+
+
+def test_unparseable_output():
+    assert _parse_verdict("I cannot grade this answer.") is None
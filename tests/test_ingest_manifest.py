@@ -0,0 +1,65 @@
+# --- tests/test_ingest_manifest.py ---
+
+import json
+from types import SimpleNamespace
+
+from creator.ingest_manifest import IngestManifest, file_hash, text_hash
+
+
+def chunk(text):
+    return SimpleNamespace(page_content=text, metadata={"page": 1})
+
+
+def test_hashes_are_content_based(tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    first.write_bytes(b"%PDF lean")
+    second.write_bytes(b"%PDF lean")
+    assert file_hash(str(first)) == file_hash(str(second))
+    assert text_hash("Muda") != text_hash("Muda ")
+    assert IngestManifest.digest(["a", "b"]) != IngestManifest.digest(["b", "a"])
+
+
+def test_chunks_are_shared_and_pruned_with_their_pdf(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    a = manifest.set_pdf("a.pdf", "sha-a", [chunk("Muda"), chunk("Kanban")])
+    manifest.set_pdf("b.pdf", "sha-b", [chunk("Kanban"), chunk("Kaizen")])
+    for h in a:
+        manifest.set_label(h, "Lean")
+    assert len(manifest.chunk_hashes()) == 3
+
+    assert manifest.keep_pdfs(["b.pdf"]) == ["a.pdf"]
+    assert manifest.chunk_hashes() == [text_hash("Kanban"), text_hash("Kaizen")]
+    assert manifest.label(text_hash("Muda")) is None
+    assert manifest.label(text_hash("Kanban")) == "Lean"
+
+
+def test_topics_summaries_and_clusters_survive_a_reload(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestManifest(path)
+    hashes = manifest.set_pdf("a.pdf", "sha-a", [chunk("Muda")])
+    digest = IngestManifest.digest(hashes)
+    manifest.set_topic("Muda", digest)
+    manifest.set_summary(digest, "short", "long")
+    manifest.set_summary("stale", "x", "y")
+    manifest.set_cluster_labels(digest, {hashes[0]: "Muda"})
+    manifest.prune_summaries()
+    manifest.save()
+
+    reloaded = IngestManifest(path)
+    assert reloaded.pdf_unchanged("a.pdf", "sha-a") and not reloaded.pdf_unchanged("a.pdf", "sha-b")
+    assert reloaded.topic_unchanged("Muda", digest)
+    assert reloaded.summary(digest) == ("short", "long") and reloaded.summary("stale") is None
+    assert reloaded.cluster_labels(digest) == {hashes[0]: "Muda"} and reloaded.cluster_labels("other") is None
+    assert reloaded.stale_topics(["Kanban"]) == ["Muda"]
+
+
+def test_other_manifest_version_starts_fresh(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"version": 0, "pdfs": {"a.pdf": {"sha": "x", "chunks": []}}}))
+    assert IngestManifest(str(path)).known_pdfs() == []
+
+
+def test_old_single_text_summary_counts_as_missing(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    manifest.data["summaries"]["d"] = "old summary text"
+    assert manifest.summary("d") is None
@@ -0,0 +1,78 @@
+# --- tests/test_latency_budget.py ---
+
+import time
+
+import pytest
+
+from utils.cancellation import CancelToken, GenerationCancelled, bind_token
+from utils.latency_budget import (BUDGETS, BudgetExceeded, LatencyStats, budgeted_stream, is_truncated)
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def configure(**values):
+        settings = {"num_predict": 10, "deadline": 0.3, "first_token": 0.1, "fallback_model": None, "partial": True}
+        settings.update(values)
+        monkeypatch.setitem(BUDGETS, "test", settings)
+    return configure
+
+
+def slow_stream(delay_first=0.0, delay=0.05, count=50):
+    def open_stream(model, token):
+        start = time.monotonic()
+        while time.monotonic() - start < delay_first:
+            token.raise_if_cancelled()
+            time.sleep(0.01)
+        for i in range(count):
+            token.raise_if_cancelled()
+            time.sleep(delay)
+            yield f"{model}{i} "
+    return open_stream
+
+
+def test_complete_answer_is_primary(budget):
+    budget()
+    stats = LatencyStats()
+    text = "".join(budgeted_stream("test", "m", slow_stream(delay=0, count=3), stats))
+    assert text == "m0 m1 m2 " and not is_truncated(text)
+    assert stats.summary()["test"]["outcomes"] == {"primary": 1}
+
+
+def test_deadline_truncates_partial_answer(budget):
+    budget()
+    stats = LatencyStats()
+    text = "".join(budgeted_stream("test", "m", slow_stream(), stats))
+    assert text.startswith("m0 ") and is_truncated(text.strip())
+    assert stats.summary()["test"]["outcomes"] == {"truncated": 1}
+
+
+def test_deadline_without_partial_raises(budget):
+    budget(partial=False)
+    stats = LatencyStats()
+    with pytest.raises(BudgetExceeded):
+        "".join(budgeted_stream("test", "m", slow_stream(), stats))
+    assert stats.summary()["test"]["outcomes"] == {"exceeded": 1}
+
+
+def test_slow_first_token_switches_to_fallback_model(budget):
+    budget(fallback_model="small")
+    stats = LatencyStats()
+
+    def open_stream(model, token):
+        return slow_stream(delay_first=1.0 if model == "m" else 0, delay=0, count=2)(model, token)
+
+    assert "".join(budgeted_stream("test", "m", open_stream, stats)) == "small0 small1 "
+    assert stats.summary()["test"]["outcomes"] == {"fallback_model": 1}
+
+
+def test_parent_cancel_is_not_a_budget_failure(budget):
+    budget(deadline=5.0, first_token=5.0)
+    stats = LatencyStats()
+    parent = CancelToken()
+    with bind_token(parent):
+        stream = budgeted_stream("test", "m", slow_stream(), stats)
+        next(stream)
+        parent.cancel()
+        with pytest.raises(GenerationCancelled):
+            list(stream)
+    assert stats.summary()["test"]["outcomes"] == {"cancelled": 1}
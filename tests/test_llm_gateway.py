@@ -0,0 +1,104 @@
+# --- tests/test_llm_gateway.py ---
+
+import threading
+import time
+
+import pytest
+
+from utils.cancellation import CancelToken, GenerationCancelled
+from utils.llm_gateway import LLMGateway
+from utils.llm_scheduler import LLMScheduler
+
+
+class GatedClient:
+    """Liefert je freigegebenem Platz (open) ein Token; zählt Aufrufe und geschlossene Streams."""
+
+    def __init__(self, chunks=("Muda ", "is ", "waste."), error=None):
+        self.chunks = chunks
+        self.error = error
+        self._gate = threading.Semaphore(0)
+        self.calls = 0
+        self.closed = 0
+
+    def stream(self, prompt):
+        self.calls += 1
+        try:
+            for chunk in self.chunks:
+                self._gate.acquire(timeout=2)
+                yield chunk
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.closed += 1
+
+    def open(self, chunks: int = 100):
+        for _ in range(chunks):
+            self._gate.release()
+
+
+def _gateway(client):
+    return LLMGateway(client_factory=lambda model, **options: client, scheduler=LLMScheduler(timeouts={}))
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_identical_requests_share_one_generation():
+    client = GatedClient()
+    gateway = _gateway(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.invoke("m", "What is Muda?")))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert _wait_until(lambda: gateway.stats()["requests"] == 3)
+    client.open()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == ["Muda is waste."] * 3
+    assert client.calls == 1
+    assert gateway.stats()["coalesced"] == 2
+
+
+def test_different_options_are_not_coalesced():
+    client = GatedClient()
+    client.open()
+    gateway = _gateway(client)
+    gateway.invoke("m", "What is Muda?", num_predict=10)
+    gateway.invoke("m", "What is Muda?", num_predict=20)
+    assert gateway.stats()["generations"] == 2
+
+
+def test_error_reaches_every_follower():
+    client = GatedClient(error=RuntimeError("ollama down"))
+    client.open()
+    with pytest.raises(RuntimeError):
+        _gateway(client).invoke("m", "What is Muda?")
+
+
+def test_generation_is_aborted_when_the_last_follower_leaves():
+    client = GatedClient()
+    gateway = _gateway(client)
+    stream = gateway.stream("m", "What is Muda?")
+    client.open(1)
+    assert next(stream) == "Muda "
+    stream.close()
+    client.open(1)  # nächstes Token: der Generierungs-Thread bemerkt den Abbruch
+    assert _wait_until(lambda: gateway.stats()["aborted"] == 1 and client.closed == 1)
+    assert gateway.stats()["inflight"] == 0
+
+
+def test_cancelled_token_stops_waiting():
+    client = GatedClient()
+    gateway = _gateway(client)
+    token = CancelToken()
+    stream = gateway.stream("m", "What is Muda?", cancel_token=token)
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(GenerationCancelled):
+        list(stream)
+    client.open()
+    assert _wait_until(lambda: gateway.stats()["aborted"] == 1)
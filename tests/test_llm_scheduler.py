@@ -0,0 +1,55 @@
+# --- tests/test_llm_scheduler.py ---
+
+import threading
+import time
+
+import pytest
+
+from utils.llm_scheduler import LLMScheduler, QueueTimeout
+
+
+def test_queue_timeout_when_slot_stays_busy():
+    scheduler = LLMScheduler(concurrency={}, timeouts={"chat": 0.1, "background": 0.1})
+    scheduler.acquire("m", "chat")
+    with pytest.raises(QueueTimeout) as error:
+        scheduler.acquire("m", "background")
+    assert error.value.priority == "background"
+    assert scheduler.metrics()["models"]["m"]["timed_out"] == {"background": 1}
+    assert scheduler.metrics()["models"]["m"]["waiting"] == {}
+
+
+def test_timed_out_entry_does_not_block_the_queue():
+    scheduler = LLMScheduler(concurrency={}, timeouts={"chat": 5, "background": 0.1})
+    scheduler.acquire("m", "chat")
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire("m", "background")
+    scheduler.release("m")
+    with scheduler.slot("m", "chat"):
+        assert scheduler.metrics()["models"]["m"]["running"] == 1
+
+
+def test_free_slot_goes_to_most_important_class():
+    scheduler = LLMScheduler(concurrency={}, timeouts={})
+    scheduler.acquire("m", "chat")
+    order = []
+
+    def wait(priority):
+        with scheduler.slot("m", priority):
+            order.append(priority)
+
+    threads = []
+    for priority in ("background", "hint", "grading", "chat"):
+        thread = threading.Thread(target=wait, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        while sum(scheduler.metrics()["models"]["m"]["waiting"].values()) < len(threads):
+            time.sleep(0.01)
+    scheduler.release("m")
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == ["chat", "grading", "hint", "background"]
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        LLMScheduler().acquire("m", "urgent")
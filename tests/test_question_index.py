@@ -0,0 +1,75 @@
+# --- tests/test_question_index.py ---
+
+import zlib
+
+import numpy as np
+
+from creator.question_index import QuestionIndex, duplicate_clusters
+
+
+class WordEmbeddings:
+    """Gleiche Wortmenge → gleicher Vektor (kein Ollama nötig)."""
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(128, dtype=np.float32)
+            for word in text.lower().replace("?", "").split():
+                vector[zlib.crc32(word.encode()) % 128] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def q(text):
+    return {"question": text}
+
+
+def _index(*questions):
+    return QuestionIndex.from_questions(WordEmbeddings(), list(questions), threshold=0.9)
+
+
+def test_add_unique_rejects_catalog_and_batch_duplicates():
+    index = _index(("Muda", q("What is Muda?")))
+    accepted, duplicates = index.add_unique("Kanban", [q("what is muda"), q("What is a Kanban card?"),
+                                                       q("What is a kanban card")])
+    assert [a["question"] for a in accepted] == ["What is a Kanban card?"]
+    assert [d[1] for d in duplicates] == [("Muda", "What is Muda?"), ("Kanban", "What is a Kanban card?")]
+    assert index.rejected == 2
+
+
+def test_restore_topic_brings_back_old_questions_and_drops_new_ones():
+    index = _index(("Muda", q("What is Muda?")), ("Kanban", q("What is a Kanban card?")))
+    previous = index.drop_topic("Muda")
+    # Alte Frage zählt während der Neuerzeugung nicht als Duplikat
+    accepted, _ = index.add_unique("Muda", [q("What is Muda?"), q("Name the seven wastes")])
+    index.add_unique("Muda", [q("Name the seven wastes")])
+    assert len(accepted) == 2 and index.rejected == 1
+
+    index.restore_topic("Muda", previous)
+    assert sorted(index.entries) == [("Kanban", "What is a Kanban card?"), ("Muda", "What is Muda?")]
+    assert index.vectors.shape[0] == 2
+    assert index.rejected == 0
+    # Der wiederhergestellte Index erkennt die alte Frage wieder als Duplikat
+    assert index.add_unique("Kaizen", [q("What is Muda?")])[0] == []
+
+
+def test_restore_topic_without_previous_questions():
+    index = _index(("Kanban", q("What is a Kanban card?")))
+    previous = index.drop_topic("Muda")
+    index.add_unique("Muda", [q("What is Muda?")])
+    index.restore_topic("Muda", previous)
+    assert index.entries == [("Kanban", "What is a Kanban card?")]
+
+
+def test_remove_only_touches_the_given_topic():
+    index = _index(("Muda", q("What is Muda?")), ("Kanban", q("What is a Kanban card?")))
+    index.remove("Muda", [q("What is Muda?"), q("What is a Kanban card?")])
+    assert index.entries == [("Kanban", "What is a Kanban card?")]
+    assert index.vectors.shape[0] == 1
+
+
+def test_duplicate_clusters_across_blocks():
+    vectors = np.array(WordEmbeddings().embed_documents(
+        ["What is Muda?", "Explain Kaizen", "what is muda", "Define takt time", "explain kaizen"]))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert sorted(sorted(c) for c in duplicate_clusters(vectors, 0.9, block_size=2)) == [[0, 2], [1, 4]]
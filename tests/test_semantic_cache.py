@@ -0,0 +1,78 @@
+# --- tests/test_semantic_cache.py ---
+
+import time
+import zlib
+
+import numpy as np
+
+from utils.latency_budget import TRUNCATION_MARK
+from utils.llm_scheduler import busy_message
+from utils.semantic_cache import SemanticAnswerCache
+
+
+def embed(text):
+    # Gleiche Wortmenge → gleicher Vektor; reicht für Treffer/Nicht-Treffer
+    vector = np.zeros(64, dtype=np.float32)
+    for word in text.lower().replace("?", "").split():
+        vector[zlib.crc32(word.encode()) % 64] += 1.0
+    return vector
+
+
+def _wait_for_refresh(cache, count=1, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while cache.refreshes < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_similar_question_is_served_from_cache():
+    cache = SemanticAnswerCache(embed=embed)
+    calls = []
+    generate = lambda question: calls.append(question) or f"answer to {question}"
+    assert cache.get_or_answer("coach", "Muda", "What is Muda?", generate) == "answer to What is Muda?"
+    assert cache.get_or_answer("coach", "Muda", "what is muda", generate) == "answer to What is Muda?"
+    assert calls == ["What is Muda?"]
+    assert cache.stats()["Muda"]["hits"] == 1
+
+
+def test_incomplete_answers_are_not_cached():
+    cache = SemanticAnswerCache(embed=embed)
+    for answer in (busy_message("chat"), "Muda means" + TRUNCATION_MARK):
+        cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: answer)
+    assert cache.stats()["Muda"]["entries"] == 0
+
+
+def test_expired_answers_are_regenerated():
+    cache = SemanticAnswerCache(embed=embed, ttl=0.05)
+    cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "old")
+    time.sleep(0.1)
+    assert cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "new") == "new"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(embed=embed, max_entries=2)
+    for question in ("What is Muda?", "Explain Kanban boards", "Who invented Kaizen?"):
+        cache.get_or_answer("coach", "Lean", question, lambda q: q)
+    assert cache.stats()["Lean"]["entries"] == 2
+    assert cache.get_or_answer("coach", "Lean", "What is Muda?", lambda q: "regenerated") == "regenerated"
+
+
+def test_new_summary_revision_clears_the_topic():
+    cache = SemanticAnswerCache(embed=embed)
+    cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "from summary 1", revision=1)
+    assert cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "from summary 2",
+                               revision=2) == "from summary 2"
+    # Nachzügler aus der alten Zusammenfassung überschreibt nichts
+    cache.store("coach", "Muda", "What is Muda?", "late", revision=1)
+    assert cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "x", revision=2) == "from summary 2"
+
+
+def test_refresh_answers_the_stored_question():
+    cache = SemanticAnswerCache(embed=embed, refresh_after=-1)
+    cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "first")
+    asked = []
+    answer = cache.get_or_answer("coach", "Muda", "what is muda", lambda question: "unused",
+                                 refresh=lambda question: asked.append(question) or "refreshed")
+    assert answer == "first"
+    _wait_for_refresh(cache)
+    assert asked == ["What is Muda?"]
+    assert cache.get_or_answer("coach", "Muda", "What is Muda?", lambda question: "unused") == "refreshed"
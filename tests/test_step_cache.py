@@ -0,0 +1,82 @@
+# --- tests/test_step_cache.py ---
+
+import threading
+import time
+import uuid
+
+import pytest
+
+from utils.step_cache import StepOutputCache, cached_step, poll_step, pregenerate_step, step_cache
+
+
+def _wait_for_pending(run_id, step, inputs, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        output = poll_step(run_id, step, inputs)
+        if output is not None:
+            return output
+        time.sleep(0.01)
+    return None
+
+
+def test_generates_once_per_step_and_inputs():
+    cache = StepOutputCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_generate("run", "lecture", {"level": "easy"}, lambda: calls.append(1) or "text") == "text"
+    assert len(calls) == 1 and cache.hits == 2
+    cache.get_or_generate("run", "lecture", {"level": "hard"}, lambda: calls.append(1) or "other")
+    assert len(calls) == 2
+
+
+def test_concurrent_reruns_share_one_generation():
+    cache = StepOutputCache()
+    release = threading.Event()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        release.wait(2)
+        return "text"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate("run", "s", {}, generate)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert results == ["text"] * 4 and len(calls) == 1
+
+
+def test_failed_generation_is_not_cached():
+    cache = StepOutputCache()
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate("run", "s", {}, lambda: (_ for _ in ()).throw(RuntimeError("ollama down")))
+    assert cache.get_or_generate("run", "s", {}, lambda: "text") == "text"
+
+
+def test_failed_pregeneration_is_regenerated_in_foreground():
+    run_id = str(uuid.uuid4())
+    inputs = {"results": [True, False]}
+
+    def fail():
+        raise RuntimeError("ollama down")
+
+    pregenerate_step(run_id, "case_summary", inputs, fail)
+    time.sleep(0.1)
+    assert poll_step(run_id, "case_summary", inputs) is None
+    assert poll_step(run_id, "case_summary", inputs) is None
+    assert cached_step(run_id, "case_summary", inputs, lambda: "summary") == "summary"
+    assert poll_step(run_id, "case_summary", inputs) == "summary"
+    step_cache.clear_session(run_id)
+
+
+def test_finished_pregeneration_is_taken_over():
+    run_id = str(uuid.uuid4())
+    pregenerate_step(run_id, "briefing_addon", {"topic": "Muda"}, lambda: "addon")
+    assert _wait_for_pending(run_id, "briefing_addon", {"topic": "Muda"}) == "addon"
+    assert cached_step(run_id, "briefing_addon", {"topic": "Muda"}, lambda: "regenerated") == "addon"
+    step_cache.clear_session(run_id)
@@ -0,0 +1,53 @@
+# --- tests/test_topic_clustering.py ---
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from creator.topic_clustering import choose_k, cluster_topics, kmeans
+
+
+class AxisEmbeddings:
+    """Texte mit "kanban" zeigen in eine, alle anderen in eine zweite Richtung."""
+
+    def embed_documents(self, texts):
+        return [[1.0, 0.1] if "kanban" in t.lower() else [0.1, 1.0] for t in texts]
+
+
+class NamingLLM:
+    def __init__(self, name=None):
+        self.name = name
+
+    def invoke(self, prompt):
+        return self.name or ('"Kanban"' if "kanban" in prompt.lower() else "Muda")
+
+
+def chunk(text):
+    return SimpleNamespace(page_content=text, metadata={})
+
+
+def test_choose_k_never_exceeds_chunk_count():
+    assert [choose_k(n) for n in (1, 2, 8, 50, 10_000)] == [1, 2, 2, 5, 12]
+
+
+def test_kmeans_separates_clear_groups():
+    X = np.array([[1, 0], [0.99, 0.1], [0, 1], [0.1, 0.99]], dtype=np.float32)
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    labels, centers = kmeans(X, 2)
+    assert labels[0] == labels[1] != labels[2] == labels[3]
+    assert np.allclose(np.linalg.norm(centers, axis=1), 1)
+
+
+def test_cluster_topics_names_each_cluster():
+    chunks = [chunk("Kanban cards"), chunk("Waste of waiting"), chunk("Kanban board"), chunk("Overproduction")]
+    topics = cluster_topics(chunks, AxisEmbeddings(), NamingLLM(), k=2, workers=1)
+    assert {name: [c.page_content for c in members] for name, members in topics.items()} == {
+        "Kanban": ["Kanban cards", "Kanban board"], "Muda": ["Waste of waiting", "Overproduction"]}
+
+
+def test_cluster_topics_merges_equal_names_and_handles_few_chunks():
+    assert cluster_topics([], AxisEmbeddings(), NamingLLM()) == {}
+    topics = cluster_topics([chunk("Kanban cards")], AxisEmbeddings(), NamingLLM("Lean"), k=5, workers=1)
+    assert list(topics) == ["Lean"]
+    topics = cluster_topics([chunk("Kanban"), chunk("Muda")], AxisEmbeddings(), NamingLLM("Lean"), k=2, workers=1)
+    assert [len(members) for members in topics.values()] == [2]
@@ -7,6 +7,8 @@ from langchain_core.messages import HumanMessage, AIMessage
 from streamlit_mic_recorder import mic_recorder
 from audio_handler import transcribe_audio
 from gtts import gTTS
+from utils.llm_scheduler import scheduler, QueueTimeout, busy_message
+from utils.model_residency import residency
 
 def generate_audio(text):
     tts = gTTS(text)
@@ -104,7 +106,7 @@ def render_chat_ui():
         st.session_state.model = st.session_state.get("model", available_models[0])
 
     # --- MODEL INIT ---
-    llm = ChatOllama(model=st.session_state.model)
+    llm = ChatOllama(model=st.session_state.model, keep_alive=residency.keep_alive(st.session_state.model))
 
     # --- CHAT DISPLAY ---
     for idx, message in enumerate(st.session_state.messages):
@@ -144,6 +146,10 @@ def render_chat_ui():
         input_text = st.session_state.user_input_buffer
         st.session_state.user_input_buffer = None
         st.session_state.messages.append(HumanMessage(input_text))
-        response = llm.invoke(st.session_state.messages).content
+        try:
+            with scheduler.slot(st.session_state.model, "chat"):
+                response = llm.invoke(st.session_state.messages).content
+        except QueueTimeout:
+            response = busy_message("chat")
         st.session_state.messages.append(AIMessage(response))
         st.rerun()
\ No newline at end of file
@@ -5,6 +5,7 @@ from character_detective import run_detective_mode_streamlit
 from character_manager import run_manager_mode_streamlit
 from character_professor import run_professor_mode_streamlit
 from character_colleague import run_colleague_mode_streamlit
+from utils.step_cache import cancel_pending
  
 # Einmalige Initialisierung von States
 if "intro_shown" not in st.session_state:
@@ -14,6 +15,16 @@ if "selected_guide" not in st.session_state:
     st.session_state.selected_guide = None
 
 
+# Laufende Vorab- und Vordergrund-Generierungen aller Lernpartner abbrechen (Erzeugtes bleibt im Cache)
+def cancel_guide_generations():
+    run_ids = [st.session_state[key].get("run_id") for key in ("professor_state", "detective_state") if key in st.session_state]
+    run_ids.append(st.session_state.get("manager_state", {}).get("session_id"))
+    run_ids.append(st.session_state.get("colleague_session_id"))
+    for run_id in run_ids:
+        if run_id:
+            cancel_pending(run_id)
+
+
 # Typewriter-Effekt für Texte
 def typewriter_effect(text, delay=0.05, size="####"):
     placeholder = st.empty()
@@ -160,6 +171,8 @@ def render_game_ui():
         col_back, _ = st.columns([1, 9])
         with col_back:
             if st.button("⬅", help="Zurück zur Partnerwahl"):
+                # Laufende Generierungen des verlassenen Modus abbrechen
+                cancel_guide_generations()
                 st.session_state.game_started = False
                 st.session_state.selected_guide = None
                 st.session_state.intro_shown = False
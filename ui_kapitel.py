@@ -1,14 +1,20 @@
 # ui_kapitel.py
 import streamlit as st
-import pickle
 import random
+from contextlib import closing
 from langchain_community.chat_models import ChatOllama
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_community.document_loaders import PyPDFLoader
-from ui_game import render_game_ui
+from ui_game import render_game_ui, cancel_guide_generations
 from ui_chat import render_chat_ui
-import os
+from utils.load_quiz_data import load_quiz_catalog, get_quiz_index
 from utils.topic_selector import get_available_topics
+from utils.topic_summary_store import summary_store
+from utils.step_cache import discard_run
+from utils.llm_scheduler import scheduler, QueueTimeout, busy_message
+from utils.model_residency import residency
+from utils.topic_retrieval import grounded_messages
+from utils.ingestion_jobs import ingestion_queue, STAGES, STAGE_LABELS
 
 def show_themes():
     available_topics = get_available_topics()
@@ -16,8 +22,10 @@ def show_themes():
 
     # Wenn Thema sich geändert hat, reset
     if "current_topic" in st.session_state and st.session_state.current_topic != selected_topic:
-        # Reset für Detective/Game-Modi
+        # Reset für Detective/Game-Modi; laufende Generierungen aller Lernpartner abbrechen
+        cancel_guide_generations()
         if "detective_state" in st.session_state:
+            discard_run(st.session_state.detective_state.get("run_id"))
             del st.session_state.detective_state
         if "detective_chat" in st.session_state:
             del st.session_state.detective_chat
@@ -28,13 +36,45 @@ def show_themes():
         st.session_state.current_topic = selected_topic
 
 
+def show_pdf_upload():
+    # Einlesen läuft im Hintergrund-Worker; hier wird nur die Datei abgelegt und der Fortschritt gezeigt
+    with st.expander("📃 PDF einlesen", expanded=True):
+        uploaded = st.file_uploader("PDF hochladen", type="pdf", key="kapitel_pdf_upload")
+        if uploaded is not None and st.button("Einlesen starten", key="kapitel_pdf_start"):
+            job_id = ingestion_queue.submit(uploaded.name, uploaded.getvalue())
+            st.toast(f"Einlese-Job {job_id} eingereiht – läuft im Hintergrund weiter")
+
+        icons = {"queued": "⏳", "running": "⚙️", "done": "✅", "failed": "❌"}
+        stage_icons = {"pending": "▫️", "running": "⚙️", "done": "✅", "failed": "❌"}
+        jobs = ingestion_queue.jobs(limit=5)
+        for job in jobs:
+            st.markdown(f"{icons.get(job['status'], '')} **{job['filename']}** · {job['status']}")
+            stages = []
+            for stage in STAGES:
+                entry = job["progress"].get(stage, {"state": "pending", "items": 0})
+                count = f"{entry['items']}/{entry['total']}" if entry.get("total") else str(entry["items"])
+                stages.append(f"{stage_icons[entry['state']]} {STAGE_LABELS[stage]} ({count})")
+            st.caption(" · ".join(stages))
+            if job["status"] == "done" and job["topics"]:
+                st.caption("Neue Themen: " + ", ".join(job["topics"]))
+            if job["status"] == "done" and job["error"]:
+                st.caption(f"⚠️ {job['error'][-200:]}")
+            if job["status"] == "failed" and job["error"]:
+                st.caption(f"Fehler: {job['error'][-200:]}")
+        if any(job["status"] in ("queued", "running") for job in jobs):
+            st.button("🔄 Fortschritt aktualisieren", key="kapitel_pdf_refresh")
+
+
 def render_kapitel_ui():
     col1, col2 = st.columns([2,0.25])
     with col1: 
         st.subheader(":closed_book: Kapitel-Modus")
     with col2:
         if st.button("📃", help="pdf upload"):
-            st.toast("Noch nicht implementiert")
+            st.session_state.show_pdf_upload = not st.session_state.get("show_pdf_upload", False)
+
+    if st.session_state.get("show_pdf_upload"):
+        show_pdf_upload()
     
     #Learn Mode
     learn_mode = st.radio("Wähle Lernmodus", ["Chat", "Game-Modus", "Trainer-Unterstützung"], horizontal=True)
@@ -66,14 +106,22 @@ def render_kapitel_ui():
 
         prompt = st.chat_input(f"Frage zu {st.session_state.current_topic}")
         if prompt:
+            # Nur Textstellen des Themas + die letzten Runden statt des gesamten Verlaufs
+            topic = st.session_state.current_topic
+            messages = grounded_messages(topic, st.session_state.messages, prompt, summary=summary_store.get_short(topic))
             st.session_state.messages.append(HumanMessage(prompt))
             with st.chat_message("user"):
                 st.markdown(prompt)
-            llm = ChatOllama(model=model)
-            response = llm.invoke(st.session_state.messages).content
-            st.session_state.messages.append(AIMessage(response))
+            llm = ChatOllama(model=model, keep_alive=residency.keep_alive(model))
             with st.chat_message("assistant"):
-                st.markdown(response)
+                try:
+                    # Gestreamt: ein Rerun beendet st.write_stream; closing schließt die Verbindung zu Ollama sofort
+                    with scheduler.slot(model, "chat"), closing(llm.stream(messages)) as stream:
+                        response = st.write_stream(stream)
+                except QueueTimeout:
+                    response = busy_message("chat")
+                    st.markdown(response)
+            st.session_state.messages.append(AIMessage(response))
 
     # === GAME MODUS === #
     elif learn_mode == "Game-Modus":
@@ -86,20 +134,11 @@ def render_kapitel_ui():
 
     # === TRAINER MODUS === #
     elif learn_mode == "Trainer-Unterstützung":
-        quiz_catalog = {}
-        quiz_dir = "quiz_catalogs"
-        summary_dir = "topic_summaries"
-
-        for file in os.listdir(quiz_dir):
-            if file.endswith(".pkl"):
-                path = os.path.join(quiz_dir, file)
-                try:
-                    with open(path, "rb") as f:
-                        data = pickle.load(f)
-                        topic = file.replace(".pkl", "")
-                        quiz_catalog[topic] = data
-                except Exception as e:
-                    st.warning(f"⚠️ Konnte {file} nicht laden: {e}")
+        try:
+            quiz_catalog = load_quiz_catalog()
+        except Exception as e:
+            st.error(f"❌ Konnte den Quizkatalog nicht laden: {e}")
+            return
 
         if not quiz_catalog:
             st.error("❌ Keine Quiz-Dateien gefunden oder fehlerhaft.")
@@ -116,13 +155,13 @@ def render_kapitel_ui():
 
         for topic in selected_topics:
             if topic not in st.session_state.trainer_selected:
-                st.session_state.trainer_questions[topic] = random.sample(
-                    quiz_catalog[topic], min(2, len(quiz_catalog[topic]))
-                )
+                topic_ids = [q["id"] for q in quiz_catalog[topic]]
+                st.session_state.trainer_questions[topic] = random.sample(topic_ids, min(2, len(topic_ids)))
                 st.session_state.trainer_selected.add(topic)
 
             st.markdown(f"### Thema: {topic}")
-            questions = st.session_state.trainer_questions[topic]
+            quiz_index = get_quiz_index()
+            questions = [q for q in map(quiz_index.get, st.session_state.trainer_questions[topic]) if q]
 
             for idx, q in enumerate(questions):
                 st.markdown(f"**Frage {idx + 1}:** {q['question']}")
@@ -143,11 +182,8 @@ def render_kapitel_ui():
                     else:
                         st.error(f"❌ Falsch. Richtige Antwort: {q['correct_answer']}")
 
-            summary_file = os.path.join(summary_dir, topic + ".pkl")
-            if os.path.exists(summary_file):
-                with open(summary_file, "rb") as f:
-                    summary_data = pickle.load(f)
+            if topic in summary_store:
                 if st.button(f"📄 Zeige Zusammenfassung zu {topic}", key=f"summary_{topic}"):
                     st.markdown("### Zusammenfassung")
-                    st.markdown(summary_data["short"])
-                    st.download_button("Herunterladen", summary_data["long"], file_name=f"Zusammenfassung_{topic}.txt")
+                    st.markdown(summary_store.get_short(topic))
+                    st.download_button("Herunterladen", summary_store.get_long(topic), file_name=f"Zusammenfassung_{topic}.txt")
@@ -0,0 +1,69 @@
+# --- utils/cancellation.py ---
+
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+class GenerationCancelled(Exception):
+    """Die Generierung wurde abgebrochen (Navigation, Rerun oder neuere Eingabe)."""
+
+
+class CancelToken:
+    """
+    Abbruchsignal für Generierungen eines Schritts. Das Gateway hängt sich mit einem
+    Callback an; wird das Token abgebrochen, hört der Aufrufer auf zu warten und der
+    HTTP-Stream zu Ollama wird geschlossen, sobald niemand mehr auf ihn wartet.
+    """
+
+    def __init__(self, scope=None):
+        self.scope = scope  # z. B. (run_id, step)
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise GenerationCancelled(f"Generierung abgebrochen: {self.scope}")
+
+
+# Token des aktuell ausgeführten Schritts; GatewayLLM greift darauf zurück, ohne dass
+# jede Generierungsfunktion ein Token durchreichen muss
+_current_token = contextvars.ContextVar("cancel_token", default=None)
+
+def current_token():
+    return _current_token.get()
+
+
+@contextmanager
+def bind_token(token: CancelToken):
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
@@ -0,0 +1,210 @@
+# --- utils/catalog_bundle.py ---
+
+import os
+import json
+import sqlite3
+from contextlib import closing
+
+# === Konfiguration ===
+# Eine SQLite-Datei ersetzt quiz_catalogs/*.pkl und topic_summaries/*.pkl
+BUNDLE_PATH = "lean_catalog.db"
+FORMAT_VERSION = 2  # 2: Tabelle case_briefings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS topics (
+    name             TEXT PRIMARY KEY,
+    quiz_revision    INTEGER,
+    summary_revision INTEGER,
+    short            TEXT,
+    long             TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    topic          TEXT NOT NULL REFERENCES topics(name) ON DELETE CASCADE,
+    position       INTEGER NOT NULL,
+    difficulty     TEXT,
+    question       TEXT NOT NULL,
+    correct_answer TEXT,
+    options        TEXT,  -- JSON-Liste oder NULL
+    extra          TEXT,  -- JSON-Objekt mit weiteren Feldern oder NULL
+    PRIMARY KEY (topic, position)
+);
+CREATE TABLE IF NOT EXISTS case_briefings (
+    topic    TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    clue_ids TEXT NOT NULL,  -- JSON-Liste stabiler Frage-IDs
+    story    TEXT NOT NULL,
+    PRIMARY KEY (topic, position)
+);
+"""
+
+_QUESTION_FIELDS = ("difficulty", "question", "correct_answer", "options")
+
+
+# === Verbindungen ===
+def open_bundle(path: str = BUNDLE_PATH, readonly: bool = True, check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Öffnet das Katalog-Bundle. Lesend wird die Datei nur im ro-Modus geöffnet;
+    schreibend wird das Schema bei Bedarf angelegt.
+    Mit check_same_thread=False muss der Aufrufer den Zugriff selbst serialisieren.
+    """
+    if readonly:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Quiz catalog bundle not found: {path}")
+        conn = sqlite3.connect(
+            f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=10, check_same_thread=check_same_thread
+        )
+        _check_version(conn, path)
+        return conn
+
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('format_version', ?)", (str(FORMAT_VERSION),))
+        conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('revision', '0')")
+        conn.execute(
+            "UPDATE meta SET value = ? WHERE key = 'format_version' AND CAST(value AS INTEGER) < ?",
+            (str(FORMAT_VERSION), FORMAT_VERSION)
+        )
+    _check_version(conn, path)
+    return conn
+
+
+def _check_version(conn, path):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'format_version'").fetchone()
+    version = int(row[0]) if row else 0
+    if version > FORMAT_VERSION:
+        conn.close()
+        raise ValueError(f"Catalog bundle {path} has format version {version}, supported up to {FORMAT_VERSION}")
+
+
+def _next_revision(conn) -> int:
+    conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'revision'")
+    return int(conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0])
+
+
+def bundle_mtime(path: str = BUNDLE_PATH):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+# === Schreiben (Creator-Skripte, Migration) ===
+def write_topic_quiz(topic: str, questions: list, path: str = BUNDLE_PATH):
+    """Ersetzt die Fragen eines Themas vollständig."""
+    with closing(open_bundle(path, readonly=False)) as conn, conn:
+        revision = _next_revision(conn)
+        conn.execute(
+            "INSERT INTO topics(name, quiz_revision) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET quiz_revision = excluded.quiz_revision",
+            (topic, revision)
+        )
+        conn.execute("DELETE FROM questions WHERE topic = ?", (topic,))
+        conn.executemany(
+            "INSERT INTO questions(topic, position, difficulty, question, correct_answer, options, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [_question_row(topic, position, q) for position, q in enumerate(questions)]
+        )
+
+
+def write_topic_summary(topic: str, short: str, long: str, path: str = BUNDLE_PATH):
+    with closing(open_bundle(path, readonly=False)) as conn, conn:
+        revision = _next_revision(conn)
+        conn.execute(
+            "INSERT INTO topics(name, summary_revision, short, long) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET summary_revision = excluded.summary_revision, "
+            "short = excluded.short, long = excluded.long",
+            (topic, revision, short, long)
+        )
+
+
+def write_case_briefings(topic: str, briefings: list, path: str = BUNDLE_PATH):
+    """Ersetzt die Fallbeschreibungen eines Themas. briefings: [{"clue_ids": [...], "story": "..."}]"""
+    with closing(open_bundle(path, readonly=False)) as conn, conn:
+        _next_revision(conn)
+        conn.execute("DELETE FROM case_briefings WHERE topic = ?", (topic,))
+        conn.executemany(
+            "INSERT INTO case_briefings(topic, position, clue_ids, story) VALUES (?, ?, ?, ?)",
+            [(topic, position, json.dumps(b["clue_ids"]), b["story"]) for position, b in enumerate(briefings)]
+        )
+
+
+def _question_row(topic, position, q):
+    options = q.get("options")
+    extra = {k: v for k, v in q.items() if k not in _QUESTION_FIELDS}
+    return (
+        topic,
+        position,
+        q.get("difficulty"),
+        q.get("question", ""),
+        q.get("correct_answer"),
+        json.dumps(options, ensure_ascii=False) if options is not None else None,
+        json.dumps(extra, ensure_ascii=False) if extra else None
+    )
+
+
+# === Lesen (Runtime) ===
+def read_quiz_revisions(conn) -> dict:
+    """topic -> (quiz_revision, Anzahl Fragen) aller Themen mit Quiz – ohne Fragen zu laden."""
+    rows = conn.execute(
+        "SELECT t.name, t.quiz_revision, COUNT(q.position) FROM topics t "
+        "LEFT JOIN questions q ON q.topic = t.name "
+        "WHERE t.quiz_revision IS NOT NULL GROUP BY t.name"
+    )
+    return {name: (revision, count) for name, revision, count in rows}
+
+
+def read_summary_revisions(conn) -> dict:
+    return dict(conn.execute("SELECT name, summary_revision FROM topics WHERE summary_revision IS NOT NULL"))
+
+
+def read_topic_questions(conn, topic: str) -> list:
+    rows = conn.execute(
+        "SELECT difficulty, question, correct_answer, options, extra FROM questions "
+        "WHERE topic = ? ORDER BY position",
+        (topic,)
+    )
+    questions = []
+    for difficulty, question, correct_answer, options, extra in rows:
+        q = {"question": question}
+        if correct_answer is not None:
+            q["correct_answer"] = correct_answer
+        if difficulty is not None:
+            q["difficulty"] = difficulty
+        if options is not None:
+            q["options"] = json.loads(options)
+        if extra:
+            q.update(json.loads(extra))
+        questions.append(q)
+    return questions
+
+
+def read_short_summaries(conn, topics) -> dict:
+    """Nur die kurzen Zusammenfassungen der angegebenen Themen."""
+    wanted = set(topics)
+    if not wanted:
+        return {}
+    rows = conn.execute("SELECT name, short FROM topics WHERE summary_revision IS NOT NULL")
+    return {name: short for name, short in rows if name in wanted}
+
+
+def read_summary(conn, topic: str):
+    """(short, long, summary_revision) eines Themas oder (None, None, None)."""
+    row = conn.execute("SELECT short, long, summary_revision FROM topics WHERE name = ?", (topic,)).fetchone()
+    return row if row else (None, None, None)
+
+
+def read_case_briefings(conn, topic: str) -> list:
+    """Vorab erzeugte Fallbeschreibungen eines Themas (leer bei Bundles ohne Tabelle)."""
+    try:
+        rows = conn.execute(
+            "SELECT clue_ids, story FROM case_briefings WHERE topic = ? ORDER BY position", (topic,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+    return [{"clue_ids": json.loads(clue_ids), "story": story} for clue_ids, story in rows]
@@ -3,17 +3,25 @@
 import os
 import uuid
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from langchain_community.vectorstores import Chroma
 from langchain.docstore.document import Document
 from langchain_ollama import OllamaEmbeddings
 
+from utils.llm_scheduler import scheduler
+from utils.model_residency import EMBEDDING_MODEL
+
 # === Konfiguration ===
 PERSIST_DIR = "./chat_history_vectorstore"
 COLLECTION_NAME = "chat_history"
 os.makedirs(PERSIST_DIR, exist_ok=True)
 
+# === Speichern im Hintergrund ===
+# Ein Worker: Nachrichten landen in Reihenfolge im Store, das Skript wartet nie auf das Embedding
+_save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-save")
+
 # === Initialisiere Embedding-Modell ===
-embedding_model = OllamaEmbeddings(model="mxbai-embed-large")
+embedding_model = OllamaEmbeddings(model=EMBEDDING_MODEL)
 
 # === Initialisiere Vektorstore (global)
 vectorstore = Chroma(
@@ -27,6 +35,7 @@ def save_message(role: str, content: str, session_id: str = None):
     """
     Speichert eine Nachricht im Vektorstore.
     Metadaten enthalten: Rolle, UUID, optional Session-ID und role_session für kombinierte Filterung.
+    Das Embedding läuft im Hintergrund hinter den interaktiven Anfragen; der Aufrufer wartet nicht.
     """
     metadata = {
         "role": role,
@@ -40,7 +49,14 @@ def save_message(role: str, content: str, session_id: str = None):
         page_content=content,
         metadata=metadata
     )
-    vectorstore.add_documents([doc])
+    return _save_executor.submit(_store, doc)
+
+def _store(doc):
+    try:
+        with scheduler.slot(EMBEDDING_MODEL, "background"):
+            vectorstore.add_documents([doc])
+    except Exception as e:
+        print(f"⚠️ Nachricht nicht gespeichert: {e}")
 
 # === Ähnlichen Kontext abrufen (nach Rolle + optional Session-ID) ===
 def retrieve_similar_history(query: str, k: int = 3, role: str = None, session_id: str = None):
@@ -58,7 +74,9 @@ def retrieve_similar_history(query: str, k: int = 3, role: str = None, session_i
         elif session_id:
             filter_dict = {"session_id": session_id}
 
-        results = vectorstore.similarity_search(query, k=k, filter=filter_dict)
+        # Der Abruf blockiert eine Antwort → gleiche Klasse wie der Chat
+        with scheduler.slot(EMBEDDING_MODEL, "chat"):
+            results = vectorstore.similarity_search(query, k=k, filter=filter_dict)
         return [doc.page_content for doc in results]
 
     except Exception as e:
@@ -1,15 +1,22 @@
 # utils/feedback_tools.py
 
-import os
+import re
 import json
-import pickle
 from difflib import SequenceMatcher
-from langchain_ollama import OllamaLLM
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
-# === LLM Setup ===
-llm = OllamaLLM(model="llama3.2")
+from utils.topic_summary_store import summary_store
+from utils.llm_gateway import GatewayLLM
+from utils.llm_scheduler import QueueTimeout
+from utils.latency_budget import BudgetExceeded, latency_stats
+from utils.semantic_cache import answer_cache
+
+# === LLM Setup (eine Instanz pro Prioritätsklasse im Scheduler) ===
+llm = GatewayLLM("llama3.2", call_type="chat")
+grader_llm = GatewayLLM("llama3.2", priority="grading", call_type="grading")
+hint_llm = GatewayLLM("llama3.2", priority="hint", call_type="hint")
+refresh_llm = GatewayLLM("llama3.2", priority="background", call_type="chat")  # Erneuerung des Antwort-Caches
 
 # === FEEDBACK ===
 _feedback_prompt = ChatPromptTemplate.from_template("""
@@ -25,7 +32,32 @@ Respond in this exact JSON format:
   "feedback": "Brief explanation why the answer is correct or incorrect. If incorrect, always include the correct answer."
 }}
 """)
-_feedback_chain = _feedback_prompt | llm | StrOutputParser()
+_feedback_chain = _feedback_prompt | grader_llm.as_runnable() | StrOutputParser()
+
+def _parse_verdict(raw_output: str):
+    """
+    (is_correct, feedback) aus der JSON-Antwort oder None. Endet die Antwort mitten im Objekt
+    (num_predict erreicht), werden Urteil und bisheriger Feedback-Text trotzdem übernommen.
+    """
+    text = raw_output.strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(text[start:end + 1])
+            return parsed.get("is_correct", False), parsed.get("feedback", "No feedback provided.")
+        except json.JSONDecodeError:
+            pass
+    verdict = re.search(r'"is_correct"\s*:\s*(true|false)', text, re.IGNORECASE)
+    if verdict is None:
+        return None
+    latency_stats.count("grading", "truncated_verdict")
+    feedback = re.search(r'"feedback"\s*:\s*"((?:[^"\\]|\\.)*)', text, re.DOTALL)
+    partial = feedback.group(1).rstrip("\\").strip() if feedback else ""
+    try:
+        partial = json.loads(f'"{partial}"')
+    except json.JSONDecodeError:
+        pass
+    return verdict.group(1).lower() == "true", f"{partial} …" if partial else "No feedback provided."
 
 def get_feedback(question: str, correct_answer: str, user_answer: str, options: list = None) -> tuple[bool, str]:
     user_input_clean = user_answer.strip().lower()
@@ -69,7 +101,7 @@ def get_feedback(question: str, correct_answer: str, user_answer: str, options:
 
             Please explain why the user's answer is incorrect and what the correct answer is. Use a helpful and didactic tone.
             """)
-            chain = feedback_prompt | llm | StrOutputParser()
+            chain = feedback_prompt | grader_llm.as_runnable() | StrOutputParser()
             try:
                 explanation = chain.invoke({
                     "question": question,
@@ -81,16 +113,24 @@ def get_feedback(question: str, correct_answer: str, user_answer: str, options:
                 return False, f"❌ Incorrect. The correct answer is: {correct_answer}"
 
     # === FREITEXT-HANDLING (für Shopfloor & Detective) ===
-    raw_output = _feedback_chain.invoke({
-        "question": question,
-        "correct_answer": correct_answer,
-        "user_answer": user_answer
-    })
     try:
-        parsed = json.loads(raw_output)
-        return parsed.get("is_correct", False), parsed.get("feedback", "No feedback provided.")
-    except Exception:
+        raw_output = _feedback_chain.invoke({
+            "question": question,
+            "correct_answer": correct_answer,
+            "user_answer": user_answer
+        })
+    except QueueTimeout:
+        return False, "⏳ Die Bewertung ist gerade überlastet – deine Antwort konnte nicht geprüft werden. Bitte gleich erneut senden."
+    except BudgetExceeded:
+        # Latenzbudget überschritten → Schnellbewertung per Textähnlichkeit statt warten
+        similar = SequenceMatcher(None, user_input_clean, correct_answer_clean).ratio() > 0.6
+        if similar:
+            return True, "⏱️ Schnellbewertung: Deine Antwort entspricht der Musterlösung."
+        return False, f"⏱️ Schnellbewertung: Die Musterlösung lautet: {correct_answer}"
+    verdict = _parse_verdict(raw_output)
+    if verdict is None:
         return False, "⚠️ Error parsing feedback. Please try again."
+    return verdict
 
 
 
@@ -103,7 +143,7 @@ Correct Answer: {correct_answer}
 
 Output only the hint.
 """)
-_hint_chain = _hint_prompt | llm | StrOutputParser()
+_hint_chain = _hint_prompt | hint_llm.as_runnable() | StrOutputParser()
 
 def get_progressive_hint(question: str, correct_answer: str, level: int = 1) -> str:
     level = max(1, min(level, 3))
@@ -118,27 +158,10 @@ def get_progressive_hint(question: str, correct_answer: str, level: int = 1) ->
     })
 
 
-# === LOAD TOPIC SUMMARIES FROM FILE ===
-def load_topic_summaries(summary_dir="topic_summaries"):
-    summaries = {}
-    if not os.path.exists(summary_dir):
-        return summaries
-
-    for file in os.listdir(summary_dir):
-        if file.endswith(".pkl"):
-            topic_name = file[:-4].replace("_", " ")
-            with open(os.path.join(summary_dir, file), "rb") as f:
-                summaries[topic_name] = pickle.load(f)
-    return summaries
-
-topic_summaries = load_topic_summaries()
-
-
 # === SHORT SUMMARY ===
 def get_topic_summary(topic):
-    summary = topic_summaries.get(topic)
-    if summary:
-        return summary.get("short", "Lean focuses on improving flow and reducing waste.")
+    if topic in summary_store:
+        return summary_store.get_short(topic) or "Lean focuses on improving flow and reducing waste."
     return "This Lean topic is crucial for improving efficiency and reducing waste."
 
 
@@ -154,20 +177,25 @@ User Question:
 
 Answer:
 """)
-_topic_qa_chain = _topic_qa_prompt | llm | StrOutputParser()
+_topic_qa_chain = _topic_qa_prompt | llm.as_runnable() | StrOutputParser()
+_topic_qa_refresh_chain = _topic_qa_prompt | refresh_llm.as_runnable() | StrOutputParser()
 
 def get_topic_response(topic: str, user_question: str) -> str:
-    context = topic_summaries.get(topic, {})
-    long_text = context.get("long", "")
+    # Revision vor dem Text lesen: wird die Zusammenfassung dazwischen ersetzt, verfällt die Antwort beim nächsten Abruf
+    revision = summary_store.revision(topic)
+    long_text = summary_store.get_long(topic)
 
     if not long_text:
         return "🧠 I’m still gathering insights on that. But here's what I know so far: Lean focuses on eliminating waste and increasing value."
 
     try:
-        answer = _topic_qa_chain.invoke({
-            "summary": long_text,
-            "question": user_question
-        }).strip()
+        # Ähnliche Frage zum selben Thema schon beantwortet → gespeicherte Antwort
+        answer = answer_cache.get_or_answer(
+            "coach", topic, user_question,
+            lambda question: _topic_qa_chain.invoke({"summary": long_text, "question": question}).strip(),
+            refresh=lambda question: _topic_qa_refresh_chain.invoke({"summary": long_text, "question": question}).strip(),
+            revision=revision
+        )
         return f"🧠 {answer}"
     except Exception as e:
         return f"❗ Sorry, I couldn't process that right now. ({str(e)})"
@@ -191,13 +219,12 @@ def match_topic_name(query: str, available_topics: list[str]) -> str:
     return matches[0] if matches else query
 
 def get_lecture_context(topic: str, difficulty: str = "medium") -> str:
-    matched_topic = match_topic_name(topic, list(topic_summaries.keys()))
-    summary_data = topic_summaries.get(matched_topic)
+    matched_topic = match_topic_name(topic, summary_store.topics())
 
-    if not summary_data:
+    if matched_topic not in summary_store:
         return "This topic is a key part of Lean Production, focusing on waste reduction and process efficiency."
 
-    base_text = summary_data.get("long") or summary_data.get("short")
+    base_text = summary_store.get_long(matched_topic) or summary_store.get_short(matched_topic)
     if not base_text:
         return "This topic is essential in understanding Lean principles."
 
@@ -0,0 +1,289 @@
+# --- utils/ingestion_jobs.py ---
+# PDF-Upload im Kapitel-Modus: Hochgeladene PDFs landen als Job in einer lokalen, persistenten
+# Warteschlange (SQLite). Ein Worker-Thread der App arbeitet sie nacheinander ab; jeder Job läuft
+# als eigener Prozess (Creator-Pipeline: split → embed → classify → summarize → quiz) und meldet
+# seinen Fortschritt pro Stufe in die Job-Datenbank. Nach einem Neustart der App werden
+# unterbrochene Jobs erneut gestartet (die Creator überspringen bereits Erledigtes).
+#
+#   python -m utils.ingestion_jobs <job_id>   (wird vom Worker aufgerufen)
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+import subprocess
+from contextlib import closing
+
+# === Konfiguration ===
+JOBS_DB = "ingestion_jobs.db"
+UPLOAD_DIR = "pdfs"  # dort sucht auch creator/agent_topic_summary.py
+STAGES = ("split", "embed", "classify", "summarize", "quiz")
+STAGE_LABELS = {"split": "Zerlegen", "embed": "Einbetten", "classify": "Zuordnen",
+                "summarize": "Zusammenfassen", "quiz": "Quiz"}
+# Stufen des StageTimer im Creator -> Job-Stufe
+TIMER_STAGES = {"Extraktion": "split", "Splitten": "split", "Embedding": "embed", "Vektorstore": "embed",
+                "Zuordnung": "classify", "Clustering": "classify", "Zusammenfassung": "summarize"}
+POLL_INTERVAL = 2.0  # Sekunden, in denen der Worker nach neuen Jobs sieht
+PROGRESS_INTERVAL = 1.0  # höchstens so oft schreibt ein laufender Job seinen Fortschritt
+# Parallelität eines Jobs: der Job-Prozess ruft Ollama direkt auf (am LLMScheduler der App vorbei)
+# und teilt sich die Modelle mit Chat und Bewertung – daher ein Aufruf zur Zeit statt der CLI-Vorgaben
+JOB_WORKERS = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    pdf_path TEXT NOT NULL,
+    status   TEXT NOT NULL,          -- queued | running | done | failed
+    stage    TEXT,
+    progress TEXT NOT NULL DEFAULT '{}',  -- JSON: Stufe -> {"state", "items", "seconds"}
+    topics   TEXT,                   -- JSON-Liste der neuen/geänderten Themen
+    error    TEXT,
+    created  REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+"""
+
+
+def _connect(path: str = JOBS_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # App und Job-Prozess schreiben gleichzeitig
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _safe_filename(name: str) -> str:
+    base = os.path.basename(name or "upload.pdf")
+    base = re.sub(r"[^\w.\- ]+", "_", base).strip() or "upload.pdf"
+    return base if base.lower().endswith(".pdf") else base + ".pdf"
+
+
+def _row_to_job(row) -> dict:
+    job_id, filename, pdf_path, status, stage, progress, topics, error, created, updated = row
+    return {"id": job_id, "filename": filename, "pdf_path": pdf_path, "status": status, "stage": stage,
+            "progress": json.loads(progress or "{}"), "topics": json.loads(topics) if topics else [],
+            "error": error, "created": created, "updated": updated}
+
+
+class JobProgress:
+    """Fortschritt eines Jobs aus Sicht des Job-Prozesses (gedrosselt in die Job-Datenbank)."""
+
+    def __init__(self, job_id: int, db_path: str = JOBS_DB):
+        self.job_id = job_id
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self.stage = None
+        self.progress = {stage: {"state": "pending", "items": 0, "seconds": 0.0} for stage in STAGES}
+
+    def _write(self, force: bool = False, **fields):
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        assignments = ", ".join(f"{k} = ?" for k in ("stage", "progress", "updated", *fields))
+        values = [self.stage, json.dumps(self.progress), time.time(), *fields.values(), self.job_id]
+        with closing(_connect(self.db_path)) as conn, conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", values)
+
+    def start(self, stage: str):
+        with self._lock:
+            for earlier in STAGES[:STAGES.index(stage)]:
+                if self.progress[earlier]["state"] != "done":
+                    self.progress[earlier]["state"] = "done"
+            self.stage = stage
+            self.progress[stage]["state"] = "running"
+            self._write(force=True)
+
+    def on_timer(self, timer_stage: str, items: int, seconds: float):
+        """Listener für creator.ingest_pipeline.StageTimer (wird aus Worker-Threads aufgerufen)."""
+        stage = TIMER_STAGES.get(timer_stage)
+        if stage is None:
+            return
+        with self._lock:
+            entry = self.progress[stage]
+            entry["items"] += items
+            entry["seconds"] = round(entry["seconds"] + seconds, 1)
+            if entry["state"] == "pending":
+                entry["state"] = "running"
+            self.stage = stage
+            self._write()
+
+    def on_quiz(self, done: int, total: int):
+        """Listener für creator.agent_quiz_creator.main: fertige Themen von total."""
+        with self._lock:
+            self.progress["quiz"].update(items=done, total=total)
+            self._write(force=True)
+
+    def finish(self, topics, warning: str = None):
+        """warning: Job ist durchgelaufen, aber das Quiz fehlt für einzelne Themen."""
+        with self._lock:
+            for entry in self.progress.values():
+                entry["state"] = "done"
+            if warning:
+                self.progress["quiz"]["state"] = "failed"
+            self.stage = None
+            self._write(force=True, status="done", topics=json.dumps(topics, ensure_ascii=False), error=warning)
+
+    def fail(self, error: str):
+        with self._lock:
+            if self.stage:
+                self.progress[self.stage]["state"] = "failed"
+            self._write(force=True, status="failed", error=error[-2000:])
+
+
+def run_job(job_id: int, db_path: str = JOBS_DB):
+    """Im Job-Prozess: Creator-Pipeline für die PDF des Jobs ausführen."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT pdf_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        raise SystemExit(f"Job {job_id} nicht gefunden")
+    progress = JobProgress(job_id, db_path)
+    try:
+        from creator import agent_topic_summary, agent_quiz_creator
+        from creator.ingest_pipeline import StageTimer
+
+        agent_topic_summary.summary_topic_workers = JOB_WORKERS
+        agent_topic_summary.summarizer.workers = JOB_WORKERS
+
+        progress.start("split")
+        timer = StageTimer(listener=progress.on_timer)
+        topics = agent_topic_summary.main([row[0]], workers=JOB_WORKERS, extract_workers=JOB_WORKERS, timer=timer)
+
+        progress.start("quiz")
+        failed = agent_quiz_creator.main(topics, workers=JOB_WORKERS, progress=progress.on_quiz) if topics else []
+        # Themen ohne Quiz erscheinen nicht in get_available_topics und werden nicht als neu gemeldet
+        ready = [topic for topic in topics if topic not in failed]
+        if failed and not ready:
+            raise RuntimeError(f"Quiz-Erzeugung für alle Themen fehlgeschlagen: {', '.join(failed)}")
+        progress.finish(ready, warning=f"Kein Quiz für: {', '.join(failed)}" if failed else None)
+    except BaseException as e:
+        progress.fail(f"{type(e).__name__}: {e}")
+        raise
+
+
+class IngestionQueue:
+    """
+    Persistente Job-Warteschlange mit einem Worker-Thread pro App-Prozess. Der Streamlit-Thread
+    legt nur die Datei ab und trägt den Job ein; die Verarbeitung läuft in einem eigenen Prozess.
+    Nach Abschluss eines Jobs wird der Katalog invalidiert, sodass neue Themen sofort erscheinen.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB, upload_dir: str = UPLOAD_DIR, poll_interval: float = POLL_INTERVAL):
+        self.db_path = db_path
+        self.upload_dir = upload_dir
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._started = False
+        self._wake = threading.Event()
+        self.completed = 0
+
+    def start(self):
+        """Einmal pro Prozess: unterbrochene Jobs wieder einreihen und den Worker starten."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        with closing(_connect(self.db_path)) as conn, conn:
+            resumed = conn.execute(
+                "UPDATE jobs SET status = 'queued', updated = ? WHERE status = 'running'", (time.time(),)
+            ).rowcount
+        if resumed:
+            print(f"🔁 {resumed} unterbrochene Einlese-Jobs werden fortgesetzt")
+        threading.Thread(target=self._worker, daemon=True, name="ingestion").start()
+
+    def submit(self, filename: str, data: bytes) -> int:
+        """Speichert die PDF und reiht einen Job ein; gibt die Job-ID zurück."""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        filename = _safe_filename(filename)
+        pdf_path = os.path.join(self.upload_dir, filename)
+        tmp_path = pdf_path + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, pdf_path)
+        now = time.time()
+        with closing(_connect(self.db_path)) as conn, conn:
+            job_id = conn.execute(
+                "INSERT INTO jobs(filename, pdf_path, status, created, updated) VALUES (?, ?, 'queued', ?, ?)",
+                (filename, pdf_path, now, now)
+            ).lastrowid
+        self._wake.set()
+        return job_id
+
+    def jobs(self, limit: int = 10) -> list:
+        """Die neuesten Jobs mit Status und Fortschritt pro Stufe."""
+        if not os.path.exists(self.db_path):
+            return []
+        with closing(_connect(self.db_path)) as conn:
+            rows = conn.execute(
+                "SELECT id, filename, pdf_path, status, stage, progress, topics, error, created, updated "
+                "FROM jobs ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def _next_job(self):
+        with closing(_connect(self.db_path)) as conn, conn:
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row:
+                conn.execute("UPDATE jobs SET status = 'running', error = NULL, updated = ? WHERE id = ?",
+                             (time.time(), row[0]))
+            return row[0] if row else None
+
+    def _worker(self):
+        while True:
+            try:
+                job_id = self._next_job()
+            except Exception as e:
+                print(f"❌ Job-Warteschlange nicht lesbar: {e}")
+                job_id = None
+            if job_id is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(job_id)
+
+    def _run(self, job_id: int):
+        print(f"📥 Einlese-Job {job_id} gestartet")
+        result = subprocess.run(
+            [sys.executable, "-m", "utils.ingestion_jobs", str(job_id), "--db", self.db_path],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        with closing(_connect(self.db_path)) as conn, conn:
+            status = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            if result.returncode != 0 and status != "failed":
+                # Prozess ist abgestürzt, bevor er den Fehler selbst eintragen konnte
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+                             ((result.stderr or f"Exit-Code {result.returncode}")[-2000:], time.time(), job_id))
+                status = "failed"
+        if status == "done":
+            self.completed += 1
+            self._invalidate_catalog()
+        print(f"{'✅' if status == 'done' else '❌'} Einlese-Job {job_id}: {status}")
+
+    @staticmethod
+    def _invalidate_catalog():
+        # Neue Themen und Zusammenfassungen beim nächsten Zugriff laden (get_available_topics)
+        from utils.load_quiz_data import get_catalog_service
+        from utils.topic_summary_store import summary_store
+        from utils.topic_retrieval import topic_retriever
+        get_catalog_service().invalidate()
+        summary_store.refresh(force=True)
+        topic_retriever.invalidate()  # der Job-Prozess hat neue Chunks in die Collection geschrieben
+
+
+# === Globale Instanz ===
+ingestion_queue = IngestionQueue()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Führt einen Einlese-Job aus der Job-Datenbank aus.")
+    parser.add_argument("job_id", type=int)
+    parser.add_argument("--db", default=JOBS_DB)
+    args = parser.parse_args()
+    run_job(args.job_id, args.db)
@@ -0,0 +1,151 @@
+# --- utils/latency_budget.py ---
+
+import time
+import threading
+from collections import Counter, defaultdict, deque
+
+from utils.cancellation import CancelToken, GenerationCancelled, current_token
+
+# === Konfiguration ===
+# num_predict: maximale Antwortlänge; deadline: Sekunden bis die Antwort fertig sein muss;
+# first_token: Sekunden bis zum ersten Token, danach wird auf fallback_model gewechselt;
+# partial: ob bei Ablauf der Deadline die bisher erzeugte Antwort gekürzt ausgeliefert wird
+# (grading: Platz für das vollständige JSON-Urteil; abgeschnittene Urteile zählt feedback_tools als "truncated_verdict")
+BUDGETS = {
+    "chat":       {"num_predict": 320, "deadline": 30.0, "first_token": 10.0, "fallback_model": "llama3.2", "partial": True},
+    "grading":    {"num_predict": 300, "deadline": 20.0, "first_token": 8.0,  "fallback_model": None,       "partial": False},
+    "hint":       {"num_predict": 120, "deadline": 12.0, "first_token": 6.0,  "fallback_model": None,       "partial": True},
+    "lecture":    {"num_predict": 400, "deadline": 40.0, "first_token": 12.0, "fallback_model": "llama3.2", "partial": True},
+    "reflection": {"num_predict": 400, "deadline": 40.0, "first_token": 12.0, "fallback_model": "llama3.2", "partial": True}
+}
+WINDOW = 500  # Messwerte pro Aufruftyp für p50/p95
+TRUNCATION_MARK = " … ⏱️"  # letztes Stück einer per Deadline gekürzten Antwort
+
+
+class BudgetExceeded(TimeoutError):
+    """Weder das Modell noch das Ausweichmodell haben innerhalb der Deadline geantwortet."""
+
+
+class LatencyStats:
+    """Laufzeiten und Ausgang (primary, fallback_model, truncated, exceeded, …) pro Aufruftyp."""
+
+    def __init__(self, window: int = WINDOW):
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=window))
+        self._outcomes = defaultdict(Counter)
+
+    def record(self, call_type: str, seconds: float, outcome: str):
+        with self._lock:
+            self._durations[call_type].append(seconds)
+            self._outcomes[call_type][outcome] += 1
+
+    def count(self, call_type: str, outcome: str):
+        with self._lock:
+            self._outcomes[call_type][outcome] += 1
+
+    @staticmethod
+    def _percentile(values, q):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> dict:
+        with self._lock:
+            result = {}
+            for call_type, durations in self._durations.items():
+                if not durations:
+                    continue
+                result[call_type] = {
+                    "n": len(durations),
+                    "p50": self._percentile(durations, 0.50),
+                    "p95": self._percentile(durations, 0.95),
+                    "deadline": BUDGETS.get(call_type, {}).get("deadline"),
+                    "outcomes": dict(self._outcomes[call_type])
+                }
+            return result
+
+
+# === Globale Instanz ===
+latency_stats = LatencyStats()
+
+
+def is_truncated(text: str) -> bool:
+    """Ob die Antwort per Deadline gekürzt wurde (endet mit TRUNCATION_MARK)."""
+    return text.rstrip().endswith(TRUNCATION_MARK.strip())
+
+
+def budget_options(call_type: str) -> dict:
+    """Ollama-Optionen des Aufruftyps (num_predict)."""
+    return {"num_predict": BUDGETS[call_type]["num_predict"]}
+
+
+def budgeted_stream(call_type: str, model: str, open_stream, stats: LatencyStats = latency_stats):
+    """
+    Streamt die Antwort innerhalb des Budgets von `call_type`. `open_stream(model, token)`
+    öffnet den Token-Stream eines Modells mit CancelToken. Kommt das erste Token nicht
+    rechtzeitig, wird die Anfrage abgebrochen und auf das Ausweichmodell gewechselt; läuft
+    die Deadline mitten in der Antwort ab, endet sie dort (falls `partial`) mit TRUNCATION_MARK –
+    so erkennen auch Aufrufer hinter LCEL-Ketten oder st.write_stream die Kürzung. Ohne jede
+    Antwort wird BudgetExceeded ausgelöst – der Aufrufer liefert dann eine vorbereitete Antwort.
+    """
+    budget = BUDGETS[call_type]
+    candidates = [model]
+    if budget["fallback_model"] and budget["fallback_model"] != model:
+        candidates.append(budget["fallback_model"])
+
+    start = time.monotonic()
+    deadline = start + budget["deadline"]
+    parent = current_token()
+    outcome = "exceeded"
+    produced = False
+    try:
+        for attempt, candidate in enumerate(candidates):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            last = attempt == len(candidates) - 1
+            token = CancelToken(scope=(call_type, candidate))
+            if parent is not None:
+                parent.add_callback(token.cancel)
+            first_timer = threading.Timer(remaining if last else min(budget["first_token"], remaining), token.cancel)
+            end_timer = threading.Timer(remaining, token.cancel)
+            first_timer.daemon = end_timer.daemon = True
+            first_timer.start()
+            end_timer.start()
+            try:
+                for chunk in open_stream(candidate, token):
+                    if not produced:
+                        first_timer.cancel()
+                        produced = True
+                    yield chunk
+                outcome = "primary" if attempt == 0 else "fallback_model"
+                return
+            except GenerationCancelled:
+                if parent is not None and parent.cancelled:
+                    outcome = "cancelled"
+                    raise
+                if produced:
+                    if not budget["partial"]:
+                        raise BudgetExceeded(f"{call_type}: Deadline von {budget['deadline']} s überschritten")
+                    outcome = "truncated"
+                    yield TRUNCATION_MARK
+                    return
+                # Erstes Token zu spät → nächstes Modell
+            finally:
+                first_timer.cancel()
+                end_timer.cancel()
+                if parent is not None:
+                    parent.remove_callback(token.cancel)
+        raise BudgetExceeded(f"{call_type}: keine Antwort innerhalb von {budget['deadline']} s")
+    except GeneratorExit:
+        outcome = "cancelled"
+        raise
+    except BudgetExceeded:
+        outcome = "exceeded"
+        raise
+    except GenerationCancelled:
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        stats.record(call_type, time.monotonic() - start, outcome)
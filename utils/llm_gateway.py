@@ -0,0 +1,290 @@
+# --- utils/llm_gateway.py ---
+
+import json
+import threading
+
+from utils.llm_scheduler import scheduler as default_scheduler, QueueTimeout, busy_message
+from utils.model_residency import residency
+from utils.cancellation import current_token
+from utils.latency_budget import BudgetExceeded, budgeted_stream, budget_options, latency_stats
+
+
+class OllamaStreamingClient:
+    """
+    Direkter Ollama-Client (Paket `ollama`, Host aus OLLAMA_HOST) statt OllamaLLM:
+    setzt keep_alive laut Residency-Manager und liest load_duration aus dem letzten Chunk.
+    Wird der Generator geschlossen, wird auch der HTTP-Stream geschlossen – Ollama hört auf zu decodieren.
+    """
+
+    def __init__(self, model: str, client=None, **options):
+        if client is None:
+            import ollama
+            client = ollama.Client()
+        self.model = model
+        self.options = options
+        self._client = client
+
+    def stream(self, prompt):
+        chunks = self._client.generate(
+            model=self.model, prompt=prompt, stream=True,
+            options=self.options or None, keep_alive=residency.keep_alive(self.model)
+        )
+        try:
+            for chunk in chunks:
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    residency.record_load(self.model, chunk.get("load_duration"), "request")
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+
+
+def _ollama_client(model: str, **options):
+    return OllamaStreamingClient(model, **options)
+
+
+def _prompt_text(prompt) -> str:
+    """Prompt als Text – auch PromptValues aus LCEL-Ketten (ChatPromptTemplate → to_string())."""
+    return prompt if isinstance(prompt, str) else prompt.to_string()
+
+
+def request_key(model: str, prompt: str, options: dict) -> tuple:
+    return (model, json.dumps(options, sort_keys=True, default=str), prompt)
+
+
+class _Flight:
+    """Eine laufende Generierung; alle Wartenden lesen dieselben Token mit."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self.aborted = False  # niemand wartet mehr → Generierung abbrechen
+        self.cond = threading.Condition()
+
+    def push(self, chunk: str):
+        with self.cond:
+            self.chunks.append(chunk)
+            self.cond.notify_all()
+
+    def finish(self, error=None):
+        with self.cond:
+            self.done = True
+            self.error = error
+            self.cond.notify_all()
+
+    def wake(self):
+        with self.cond:
+            self.cond.notify_all()
+
+    def follow(self, token=None):
+        """Liefert alle Token von Anfang an und dann live, bis die Generierung fertig ist."""
+        position = 0
+        while True:
+            with self.cond:
+                while True:
+                    if token is not None:
+                        token.raise_if_cancelled()
+                    if position < len(self.chunks) or self.done:
+                        break
+                    self.cond.wait()
+                new = self.chunks[position:]
+                position = len(self.chunks)
+                done, error = self.done, self.error
+            yield from new
+            if done and position == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class LLMGateway:
+    """
+    Vorgeschaltete Schicht vor den Ollama-Clients: Gleichzeitige identische Anfragen
+    (Modell, Prompt, Optionen) teilen sich eine laufende Generierung – etwa wenn eine
+    ganze Klasse dasselbe Thema wählt oder ein Button doppelt geklickt wird. Die Token
+    werden an alle Wartenden verteilt. Kein Cache: ist die Generierung fertig, löst die
+    nächste identische Anfrage eine neue aus (Wiederverwendung siehe utils.step_cache).
+    Jede Generierung wartet vorher auf einen Platz im LLMScheduler (Priorität des ersten Aufrufers).
+    Steigen alle Wartenden aus (CancelToken, geschlossener Stream bei einem Streamlit-Rerun),
+    wird die Generierung abgebrochen und der Stream zu Ollama geschlossen.
+    """
+
+    def __init__(self, client_factory=_ollama_client, scheduler=default_scheduler):
+        self._client_factory = client_factory
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._clients = {}  # (model, Optionen) -> Client
+        self._inflight = {}  # request_key -> _Flight
+        self._avg_tokens = {}  # model -> gleitender Mittelwert der Antwortlänge (Chunks)
+        self.requests = 0
+        self.generations = 0
+        self.coalesced = 0
+        self.aborted = 0
+        self.tokens_saved = 0
+
+    def client(self, model: str, **options):
+        key = (model, json.dumps(options, sort_keys=True, default=str))
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self._client_factory(model, **options)
+            return self._clients[key]
+
+    def _run(self, key, flight, client, model, prompt, priority, options):
+        try:
+            with self._scheduler.slot(model, priority):
+                if not flight.aborted:
+                    stream = client.stream(prompt)
+                    try:
+                        for chunk in stream:
+                            if flight.aborted:
+                                break
+                            flight.push(chunk)
+                    finally:
+                        stream.close()
+            if flight.aborted:
+                self._record_abort(model, len(flight.chunks), options)
+            else:
+                self._record_length(model, len(flight.chunks))
+            flight.finish()
+        except Exception as e:
+            flight.finish(e)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    def _record_length(self, model, produced):
+        with self._lock:
+            average = self._avg_tokens.get(model)
+            self._avg_tokens[model] = produced if average is None else 0.8 * average + 0.2 * produced
+
+    def _record_abort(self, model, produced, options):
+        # Geschätzt: erwartete Länge (num_predict bzw. bisheriger Mittelwert) minus bereits erzeugt
+        with self._lock:
+            expected = options.get("num_predict") or self._avg_tokens.get(model, 0)
+            self.aborted += 1
+            self.tokens_saved += max(0, int(expected) - produced)
+
+    def _detach(self, key, flight):
+        with self._lock:
+            flight.followers -= 1
+            if flight.followers > 0 or flight.done:
+                return
+            flight.aborted = True
+            # Neue identische Anfragen starten frisch statt sich an den Abbruch zu hängen
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+
+    def _follow(self, key, flight, token):
+        if token is not None:
+            token.add_callback(flight.wake)
+        try:
+            yield from flight.follow(token)
+        finally:
+            if token is not None:
+                token.remove_callback(flight.wake)
+            self._detach(key, flight)
+
+    def stream(self, model: str, prompt, priority: str = "chat", cancel_token=None, **options):
+        """Token-Stream der Antwort; hängt sich an eine laufende identische Generierung an."""
+        prompt = _prompt_text(prompt)
+        key = request_key(model, prompt, options)
+        client = self.client(model, **options)
+        token = cancel_token if cancel_token is not None else current_token()
+        if token is not None:
+            token.raise_if_cancelled()
+        with self._lock:
+            self.requests += 1
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+            else:
+                flight = self._inflight[key] = _Flight()
+                self.generations += 1
+                # Eigener Thread: bricht der erste Aufrufer ab, laufen die anderen weiter
+                threading.Thread(
+                    target=self._run, args=(key, flight, client, model, prompt, priority, options), daemon=True
+                ).start()
+            flight.followers += 1
+        return self._follow(key, flight, token)
+
+    def invoke(self, model: str, prompt, priority: str = "chat", cancel_token=None, **options) -> str:
+        return "".join(self.stream(model, prompt, priority, cancel_token, **options))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "generations": self.generations,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "aborted": self.aborted,
+                "tokens_saved": self.tokens_saved
+            }
+
+
+# === Globale Instanz ===
+gateway = LLMGateway()
+
+
+class GatewayLLM:
+    """
+    Ersatz für OllamaLLM an den Aufrufstellen: invoke()/stream() laufen über das Gateway.
+    Mit `call_type` gilt das Latenzbudget des Typs (num_predict, Deadline, Ausweichmodell;
+    siehe utils.latency_budget). Reicht das Budget nicht oder wartet die Anfrage zu lange,
+    liefert invoke() die übergebene `fallback`-Antwort bzw. die Hinweismeldung der
+    Prioritätsklasse; sonst wird BudgetExceeded/QueueTimeout durchgereicht.
+    Vorab-Generierungen und Cache-Erneuerungen laufen mit priority="background" hinter den
+    Anfragen der Lernenden; dort gibt es keine Ersatzantwort, damit kein Platzhalter als
+    fertiges Ergebnis übernommen wird – der Schritt wird dann im Vordergrund neu erzeugt.
+    """
+
+    def __init__(self, model: str, priority: str = "chat", call_type: str = None, gateway: LLMGateway = gateway, **options):
+        self.model = model
+        self.priority = priority
+        self.call_type = call_type
+        self.options = {**budget_options(call_type), **options} if call_type else options
+        self._gateway = gateway
+
+    def _model(self) -> str:
+        # Bewertung/Tipps weichen bei knappem Speicher auf das geladene Chat-Modell aus
+        return residency.route(self.model, self.priority)
+
+    def _stream(self, prompt):
+        if self.call_type is None:
+            return self._gateway.stream(self._model(), prompt, self.priority, **self.options)
+        return budgeted_stream(
+            self.call_type, self._model(),
+            lambda model, token: self._gateway.stream(model, prompt, self.priority, token, **self.options)
+        )
+
+    def invoke(self, prompt, *args, fallback: str = None, **kwargs) -> str:
+        try:
+            return "".join(self._stream(prompt))
+        except (BudgetExceeded, QueueTimeout):
+            if fallback is not None and self.priority != "background":
+                latency_stats.count(self.call_type or self.priority, "fallback_answer")
+                return fallback
+            message = busy_message(self.priority)
+            if message is None:
+                raise
+            return message
+
+    def stream(self, prompt, *args, **kwargs):
+        """Token-Stream (z. B. für st.write_stream); ein Streamlit-Rerun schließt ihn und bricht so ab."""
+        try:
+            yield from self._stream(prompt)
+        except (BudgetExceeded, QueueTimeout):
+            message = busy_message(self.priority)
+            if message is None:
+                raise
+            yield message
+
+    def as_runnable(self):
+        """Für LCEL-Ketten: prompt | llm.as_runnable() | parser."""
+        from langchain_core.runnables import RunnableLambda
+        return RunnableLambda(self.invoke)
@@ -0,0 +1,144 @@
+# --- utils/llm_scheduler.py ---
+
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# === Konfiguration ===
+PRIORITIES = {"chat": 0, "grading": 1, "hint": 2, "background": 3}  # kleiner = wichtiger
+DEFAULT_CONCURRENCY = 1  # gleichzeitige Generierungen pro Modell (OLLAMA_NUM_PARALLEL auf CPU-Rechnern)
+MODEL_CONCURRENCY = {}  # z. B. {"mxbai-embed-large": 2}
+QUEUE_TIMEOUTS = {"chat": 90, "grading": 60, "hint": 30, "background": 300}  # Sekunden in der Warteschlange
+
+# Antwort, wenn eine Anfrage zu lange wartet; None → QueueTimeout wird an den Aufrufer durchgereicht
+BUSY_MESSAGES = {
+    "chat": "⏳ Gerade sind sehr viele Anfragen offen – bitte stell deine Frage gleich noch einmal.",
+    "grading": None,
+    "hint": "⏳ Für einen Tipp ist gerade keine Kapazität frei – versuch es gleich noch einmal.",
+    "background": None
+}
+
+
+class QueueTimeout(TimeoutError):
+    """Die Anfrage hat länger als QUEUE_TIMEOUTS[priority] auf einen freien Platz gewartet."""
+
+    def __init__(self, model: str, priority: str, waited: float):
+        super().__init__(f"{model}/{priority}: nach {waited:.1f} s in der Warteschlange abgebrochen")
+        self.model = model
+        self.priority = priority
+        self.waited = waited
+
+
+def busy_message(priority: str):
+    return BUSY_MESSAGES.get(priority)
+
+
+class _ModelQueue:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.running = 0
+        self.waiting = []  # Heap aus (Priorität, Reihenfolge, Klasse)
+        self.cond = threading.Condition()
+
+
+class LLMScheduler:
+    """
+    Zentrale Warteschlange vor Ollama. Jede Generierung bzw. jeder Embedding-Aufruf
+    belegt einen Platz ihres Modells; pro Modell laufen höchstens `concurrency` Aufrufe
+    gleichzeitig. Freie Plätze gehen an die wichtigste wartende Klasse (chat > grading
+    > hint > background), innerhalb einer Klasse in Ankunftsreihenfolge. Wer länger
+    als das Timeout seiner Klasse wartet, bekommt QueueTimeout.
+    """
+
+    def __init__(self, concurrency: dict = None, default_concurrency: int = DEFAULT_CONCURRENCY, timeouts: dict = None):
+        self._concurrency = dict(MODEL_CONCURRENCY if concurrency is None else concurrency)
+        self._default_concurrency = default_concurrency
+        self._timeouts = dict(QUEUE_TIMEOUTS if timeouts is None else timeouts)
+        self._lock = threading.Lock()
+        self._queues = {}  # model -> _ModelQueue
+        self._seq = itertools.count()
+        self._served = defaultdict(Counter)  # model -> priority -> Anzahl
+        self._timed_out = defaultdict(Counter)
+        self._wait_total = defaultdict(float)  # priority -> Sekunden gesamt
+
+    def _queue(self, model: str) -> _ModelQueue:
+        with self._lock:
+            queue = self._queues.get(model)
+            if queue is None:
+                queue = self._queues[model] = _ModelQueue(self._concurrency.get(model, self._default_concurrency))
+            return queue
+
+    def acquire(self, model: str, priority: str = "chat"):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unbekannte Prioritätsklasse: {priority}")
+        queue = self._queue(model)
+        entry = (PRIORITIES[priority], next(self._seq), priority)
+        timeout = self._timeouts.get(priority)
+        start = time.monotonic()
+
+        with queue.cond:
+            heapq.heappush(queue.waiting, entry)
+            while not (queue.running < queue.concurrency and queue.waiting[0] is entry):
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    queue.waiting.remove(entry)
+                    heapq.heapify(queue.waiting)
+                    queue.cond.notify_all()
+                    waited = time.monotonic() - start
+                    with self._lock:
+                        self._timed_out[model][priority] += 1
+                    raise QueueTimeout(model, priority, waited)
+                queue.cond.wait(remaining)
+            heapq.heappop(queue.waiting)
+            queue.running += 1
+            queue.cond.notify_all()
+
+        with self._lock:
+            self._served[model][priority] += 1
+            self._wait_total[priority] += time.monotonic() - start
+
+    def release(self, model: str):
+        queue = self._queue(model)
+        with queue.cond:
+            queue.running -= 1
+            queue.cond.notify_all()
+
+    @contextmanager
+    def slot(self, model: str, priority: str = "chat"):
+        self.acquire(model, priority)
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def metrics(self) -> dict:
+        """Momentaufnahme pro Modell: laufend, wartend je Klasse, bedient, Timeouts, mittlere Wartezeit."""
+        with self._lock:
+            queues = dict(self._queues)
+            served = {m: dict(c) for m, c in self._served.items()}
+            timed_out = {m: dict(c) for m, c in self._timed_out.items()}
+            served_by_class = Counter()
+            for counts in self._served.values():
+                served_by_class.update(counts)
+            avg_wait = {p: self._wait_total[p] / n for p, n in served_by_class.items() if n}
+
+        result = {}
+        for model, queue in queues.items():
+            with queue.cond:
+                waiting = Counter(priority for _, _, priority in queue.waiting)
+                running = queue.running
+            result[model] = {
+                "concurrency": queue.concurrency,
+                "running": running,
+                "waiting": dict(waiting),
+                "served": served.get(model, {}),
+                "timed_out": timed_out.get(model, {})
+            }
+        return {"models": result, "avg_wait": avg_wait}
+
+
+# === Globale Instanz ===
+scheduler = LLMScheduler()
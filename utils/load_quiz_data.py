@@ -1,17 +1,149 @@
 # --- utils/load_quiz_data.py ---
 
-import os
-import pickle
-
-def load_quiz_catalog(catalog_dir="quiz_catalogs"):
-    quiz_catalog = {}
-    if not os.path.exists(catalog_dir):
-        raise FileNotFoundError(f"Quiz directory not found: {catalog_dir}")
-    
-    for file in os.listdir(catalog_dir):
-        if file.endswith(".pkl"):
-            topic_name = file[:-4].replace("_", " ")
-            with open(os.path.join(catalog_dir, file), "rb") as f:
-                quiz_catalog[topic_name] = pickle.load(f)
-    
-    return quiz_catalog
+import time
+import threading
+from collections.abc import Mapping
+
+from utils.catalog_bundle import (
+    BUNDLE_PATH, open_bundle, bundle_mtime, read_quiz_revisions, read_topic_questions, read_case_briefings
+)
+from utils.quiz_index import QuizIndex, compile_topic
+
+# === Konfiguration ===
+CHECK_INTERVAL = 2.0  # Sekunden zwischen zwei mtime-Prüfungen
+
+
+class _CatalogView(Mapping):
+    """Schreibgeschützte Katalogansicht; die Fragen eines Themas werden erst beim ersten Zugriff geladen."""
+
+    def __init__(self, service, topics):
+        self._service = service
+        self._topics = tuple(topics)
+        self._topic_set = frozenset(self._topics)
+
+    def __getitem__(self, topic):
+        if topic not in self._topic_set:
+            raise KeyError(topic)
+        return self._service._load_topic(topic)
+
+    def __contains__(self, topic):
+        return topic in self._topic_set
+
+    def __iter__(self):
+        return iter(self._topics)
+
+    def __len__(self):
+        return len(self._topics)
+
+
+class QuizCatalogService:
+    """
+    Prozessweiter Quizkatalog aus dem Katalog-Bundle, von allen Sessions geteilt.
+    Pro Prüfung wird nur die mtime des Bundles gelesen; hat sie sich geändert, werden
+    die Themen-Revisionen verglichen und nur geänderte Themen verworfen. Fragen werden
+    pro Thema beim ersten Zugriff geladen. Ausgegeben werden nur schreibgeschützte
+    Ansichten sowie der bei jeder Änderung neu aufgebaute QuizIndex.
+    """
+
+    def __init__(self, bundle_path: str = BUNDLE_PATH, check_interval: float = CHECK_INTERVAL):
+        self.bundle_path = bundle_path
+        self.check_interval = check_interval
+        self.version = 0
+        self._lock = threading.RLock()
+        self._revisions = {}  # topic -> (quiz_revision, Anzahl Fragen)
+        self._loaded = {}  # topic -> (quiz_revision, tuple(questions))
+        self._briefings = {}  # topic -> Fallbeschreibungen (bis zur nächsten Bundle-Änderung)
+        self._view = _CatalogView(self, ())
+        self._index = QuizIndex(self._view)
+        self._conn = None  # lesende Verbindung, bei jeder Bundle-Änderung neu geöffnet
+        self._mtime = None
+        self._last_check = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Gleicht mit dem Bundle ab. Gibt True zurück, wenn sich der Katalog geändert hat."""
+        now = time.monotonic()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            mtime = bundle_mtime(self.bundle_path)
+            if mtime is None:
+                raise FileNotFoundError(f"Quiz catalog bundle not found: {self.bundle_path}")
+            if mtime == self._mtime:
+                return False
+
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = open_bundle(self.bundle_path, check_same_thread=False)
+            revisions = read_quiz_revisions(self._conn)
+            self._mtime = mtime
+            self._briefings.clear()
+            if revisions == self._revisions:
+                return False
+
+            for topic in list(self._loaded):
+                if topic not in revisions or revisions[topic][0] != self._loaded[topic][0]:
+                    del self._loaded[topic]
+            self._revisions = revisions
+            self._view = _CatalogView(self, sorted(revisions))
+            self._index = QuizIndex(self._view)
+            self.version += 1
+            return True
+
+    def _load_topic(self, topic: str) -> tuple:
+        with self._lock:
+            if topic not in self._revisions:
+                return ()
+            revision = self._revisions[topic][0]
+            entry = self._loaded.get(topic)
+            if entry and entry[0] == revision:
+                return entry[1]
+            compiled = compile_topic(topic, read_topic_questions(self._conn, topic))
+            self._loaded[topic] = (revision, compiled)
+            return compiled
+
+    def case_briefings(self, topic: str) -> tuple:
+        """Vorab erzeugte Detective-Fallbeschreibungen eines Themas."""
+        self.refresh()
+        with self._lock:
+            if topic not in self._briefings:
+                self._briefings[topic] = tuple(read_case_briefings(self._conn, topic)) if self._conn else ()
+            return self._briefings[topic]
+
+    def invalidate(self):
+        """Erzwingt die Prüfung beim nächsten Zugriff (z. B. nach einem Creator-Lauf)."""
+        self._last_check = None
+
+    def catalog(self) -> Mapping:
+        self.refresh()
+        return self._view
+
+    def index(self) -> QuizIndex:
+        self.refresh()
+        return self._index
+
+    def topic_sizes(self) -> dict:
+        """topic -> Anzahl Fragen, ohne Fragen zu laden."""
+        self.refresh()
+        return {topic: count for topic, (_, count) in self._revisions.items()}
+
+
+# === Globale Instanzen (eine pro Bundle) ===
+_services = {}
+_services_lock = threading.Lock()
+
+def get_catalog_service(bundle_path: str = BUNDLE_PATH) -> QuizCatalogService:
+    with _services_lock:
+        service = _services.get(bundle_path)
+        if service is None:
+            service = _services[bundle_path] = QuizCatalogService(bundle_path)
+        return service
+
+
+def load_quiz_catalog(bundle_path=BUNDLE_PATH):
+    return get_catalog_service(bundle_path).catalog()
+
+
+def get_quiz_index(bundle_path=BUNDLE_PATH) -> QuizIndex:
+    return get_catalog_service(bundle_path).index()
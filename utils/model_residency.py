@@ -0,0 +1,159 @@
+# --- utils/model_residency.py ---
+
+import time
+import threading
+from collections import deque
+
+# === Konfiguration ===
+CHAT_MODEL = "openhermes"
+GRADER_MODEL = "llama3.2"
+EMBEDDING_MODEL = "mxbai-embed-large"
+KEEP_ALIVE = {  # Ollama keep_alive pro Modell; "-1" = dauerhaft geladen
+    CHAT_MODEL: "60m",
+    GRADER_MODEL: "20m",
+    EMBEDDING_MODEL: "60m"
+}
+DEFAULT_KEEP_ALIVE = "5m"
+ROUTED_PRIORITIES = ("grading", "hint")  # dürfen bei Speichermangel auf das Chat-Modell ausweichen
+MIN_FREE_MB = 2048  # darunter gilt der Speicher als knapp
+REFRESH_INTERVAL = 240  # Sekunden; hält die Embeddings geladen (Ollama-Standard: 5 Minuten)
+PS_CHECK_INTERVAL = 5.0  # Sekunden zwischen zwei /api/ps-Abfragen
+LOAD_EVENT_THRESHOLD = 0.05  # Sekunden load_duration, ab denen ein Aufruf als Modell-Ladevorgang zählt
+
+
+def _available_memory_mb():
+    """MemAvailable aus /proc/meminfo (Linux); sonst None."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _ollama_client():
+    import ollama
+    return ollama.Client()  # Host aus OLLAMA_HOST
+
+
+class ModelResidencyManager:
+    """
+    Hält die konfigurierten Modelle in Ollama geladen, statt sie pro Lernschritt
+    zwischen Chat-, Bewertungs- und Embedding-Modell hin- und herzuladen:
+    Aufwärmen beim Start, keep_alive pro Modell und ein Hintergrund-Thread, der die
+    Embeddings vor Ablauf erneut anstößt. Ist der Speicher knapp und das Bewertungsmodell
+    nicht geladen, werden Bewertung und Tipps an das geladene Chat-Modell geleitet.
+    Jeder Ladevorgang wird mit seiner Dauer (load_duration) protokolliert.
+    """
+
+    def __init__(self, client_factory=_ollama_client, keep_alive: dict = None, min_free_mb: int = MIN_FREE_MB):
+        self._client_factory = client_factory
+        self._client = None
+        self.keep_alive_policy = dict(KEEP_ALIVE if keep_alive is None else keep_alive)
+        self.min_free_mb = min_free_mb
+        self._lock = threading.Lock()
+        self._resident = set()
+        self._last_ps = None
+        self._started = False
+        self.load_events = deque(maxlen=200)  # (Zeitpunkt, Modell, Sekunden, Anlass)
+        self.routed = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def keep_alive(self, model: str) -> str:
+        return self.keep_alive_policy.get(model, DEFAULT_KEEP_ALIVE)
+
+    # === Ladevorgänge ===
+    def record_load(self, model: str, load_duration_ns, source: str):
+        """Wertet load_duration einer Ollama-Antwort aus und protokolliert echte Ladevorgänge."""
+        seconds = (load_duration_ns or 0) / 1e9
+        if seconds < LOAD_EVENT_THRESHOLD:
+            return
+        with self._lock:
+            self.load_events.append((time.time(), model, seconds, source))
+            self._resident.add(model)
+        print(f"📦 Modell geladen: {model} ({seconds:.2f} s, {source})")
+
+    def warm(self, model: str, source: str = "warmup"):
+        """Lädt ein Modell (leerer Prompt bzw. kurzes Embedding) und setzt seinen keep_alive."""
+        try:
+            if model == EMBEDDING_MODEL:
+                response = self.client.embed(model=model, input="warmup", keep_alive=self.keep_alive(model))
+            else:
+                response = self.client.generate(model=model, prompt="", keep_alive=self.keep_alive(model))
+            self.record_load(model, response.get("load_duration"), source)
+        except Exception as e:
+            print(f"⚠️ Modell {model} konnte nicht vorgeladen werden: {e}")
+
+    def start(self, models=None):
+        """Einmal pro Prozess: Hintergrund-Thread starten, der die Modelle aufwärmt und geladen hält."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        models = list(models or self.keep_alive_policy)
+        threading.Thread(target=self._refresh_loop, args=(models,), daemon=True, name="residency").start()
+
+    def _refresh_loop(self, models):
+        # Aufwärmen im Thread: die erste Seite rendert sofort, auch wenn Ollama langsam lädt oder nicht läuft
+        for model in models:
+            self.warm(model)
+        # Embedding-Aufrufe über LangChain setzen keinen keep_alive → regelmäßig erneuern
+        while True:
+            time.sleep(REFRESH_INTERVAL)
+            for model in models:
+                if model == EMBEDDING_MODEL:
+                    self.warm(model, source="keep-alive")
+
+    # === Routing ===
+    def resident_models(self) -> set:
+        """Aktuell in Ollama geladene Modelle (/api/ps, höchstens alle PS_CHECK_INTERVAL Sekunden)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_ps is not None and now - self._last_ps < PS_CHECK_INTERVAL:
+                return set(self._resident)
+            self._last_ps = now
+        try:
+            models = self.client.ps().get("models") or []
+            resident = {m.get("model", m.get("name", "")).split(":")[0] for m in models}
+        except Exception:
+            return set(self._resident)
+        with self._lock:
+            self._resident = resident
+            return set(resident)
+
+    def memory_tight(self) -> bool:
+        free = _available_memory_mb()
+        return free is not None and free < self.min_free_mb
+
+    def route(self, model: str, priority: str) -> str:
+        """Modell, das für den Aufruf tatsächlich verwendet wird."""
+        if priority not in ROUTED_PRIORITIES or model == CHAT_MODEL:
+            return model
+        if not self.memory_tight():
+            return model
+        resident = self.resident_models()
+        if model in resident or CHAT_MODEL not in resident:
+            return model
+        with self._lock:
+            self.routed += 1
+        return CHAT_MODEL
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loads": len(self.load_events),
+                "load_seconds": sum(e[2] for e in self.load_events),
+                "routed": self.routed,
+                "resident": sorted(self._resident)
+            }
+
+
+# === Globale Instanz ===
+residency = ModelResidencyManager()
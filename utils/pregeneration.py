@@ -0,0 +1,99 @@
+# --- utils/pregeneration.py ---
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.cancellation import CancelToken, bind_token
+
+# === Konfiguration ===
+MAX_WORKERS = 2
+STALE_AFTER = 600  # Sekunden; nicht abgeholte Vorab-Generierungen gelten danach als verworfen
+
+
+class PregenerationScheduler:
+    """
+    Startet die LLM-Ausgabe eines absehbaren nächsten Schritts im Hintergrund,
+    während der Lernende noch liest oder antwortet. Erreicht er den Schritt mit
+    denselben Eingaben, wird das Ergebnis übernommen; sonst wird es verworfen.
+    Die Generierungsfunktion darf nicht auf st.session_state zugreifen.
+    Eingaben werden als Hash übergeben (siehe utils.step_cache.inputs_hash).
+    Jede Vorab-Generierung läuft mit eigenem CancelToken; beim Verwerfen wird
+    auch eine bereits laufende Generierung bei Ollama abgebrochen.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pregen")
+        self._lock = threading.Lock()
+        self._jobs = {}  # (run_id, step) -> (inputs_hash, future, gestartet, CancelToken)
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+
+    def _discard(self, key):
+        _, future, _, token = self._jobs.pop(key)
+        future.cancel()
+        token.cancel()
+        self.discarded += 1
+
+    @staticmethod
+    def _run(token, generate):
+        with bind_token(token):
+            return generate()
+
+    def schedule(self, run_id: str, step: str, digest: str, generate):
+        """Plant die Generierung ein; eine ältere mit anderen Eingaben für denselben Schritt wird verworfen."""
+        key = (run_id, step)
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, job in self._jobs.items() if now - job[2] > STALE_AFTER]:
+                self._discard(stale)
+            job = self._jobs.get(key)
+            if job and job[0] == digest:
+                return
+            if job:
+                self._discard(key)
+            token = CancelToken(scope=key)
+            self._jobs[key] = (digest, self._executor.submit(self._run, token, generate), now, token)
+            self.started += 1
+
+    def take(self, run_id: str, step: str, digest: str):
+        """Future der passenden Vorab-Generierung oder None. Passt sie nicht, wird sie verworfen."""
+        key = (run_id, step)
+        with self._lock:
+            job = self._jobs.get(key)
+            if not job:
+                return None
+            if job[0] != digest:
+                self._discard(key)
+                return None
+            del self._jobs[key]
+            self.used += 1
+            return job[1]
+
+    def poll(self, run_id: str, step: str, digest: str):
+        """Wie take(), aber nur wenn die Generierung schon fertig ist – blockiert nie."""
+        with self._lock:
+            job = self._jobs.get((run_id, step))
+            if not job or job[0] != digest or not job[1].done():
+                return None
+        return self.take(run_id, step, digest)
+
+    def discard_run(self, run_id: str):
+        """Verwirft alle offenen Vorab-Generierungen eines Durchlaufs (Neustart, Navigation)."""
+        with self._lock:
+            for key in [k for k in self._jobs if k[0] == run_id]:
+                self._discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "used": self.used,
+                "discarded": self.discarded,
+                "pending": len(self._jobs)
+            }
+
+
+# === Globale Instanz ===
+pregenerator = PregenerationScheduler()
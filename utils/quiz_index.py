@@ -0,0 +1,141 @@
+# --- utils/quiz_index.py ---
+
+import random
+import hashlib
+import threading
+from types import MappingProxyType
+
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+DEFAULT_DIFFICULTY = "medium"
+MAX_DRAW_ATTEMPTS = 8  # Zufallsversuche, bevor auf die Restliste ausgewichen wird
+
+
+def question_id(topic: str, question_text: str, occurrence: int = 0) -> str:
+    """Stabile ID aus Thema + Fragetext – bleibt über Neuladen und Neustarts gleich."""
+    digest = hashlib.sha1(f"{topic}\x1f{question_text}".encode("utf-8")).hexdigest()[:12]
+    return f"{digest}-{occurrence}" if occurrence else digest
+
+
+def compile_topic(topic: str, questions) -> tuple:
+    """
+    Fragenliste eines Themas → Tupel schreibgeschützter Mappings mit "id" und "topic".
+    Doppelte Fragetexte im selben Thema erhalten eine laufende Nummer an der ID.
+    """
+    if not isinstance(questions, (list, tuple)):
+        return ()
+    compiled = []
+    seen = {}
+    for q in questions:
+        if not isinstance(q, dict):
+            continue
+        text = q.get("question", "")
+        occurrence = seen.get(text, 0)
+        seen[text] = occurrence + 1
+        compiled.append(MappingProxyType({**q, "id": question_id(topic, text, occurrence), "topic": topic}))
+    return tuple(compiled)
+
+
+class QuizIndex:
+    """
+    Index über den ganzen Katalog: ID → Frage, Buckets pro (Thema, Schwierigkeit) und
+    pro Thema sowie das globale Fragen-Array. Ein Thema wird beim ersten Zugriff
+    kompiliert, das globale Array erst, wenn es gebraucht wird (z. B. Prüfungsmodus).
+    Die Ziehung ohne Zurücklegen läuft über ID-Mengen, die jede Session selbst hält.
+    """
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_topic = {}
+        self._buckets = {}
+        self._questions = None
+        self._all_ids = None
+
+    def _compile(self, topic: str) -> tuple:
+        ids = self._by_topic.get(topic)
+        if ids is not None:
+            return ids
+        with self._lock:
+            if topic in self._by_topic:
+                return self._by_topic[topic]
+            topic_questions = self._catalog[topic] if topic in self._catalog else ()
+            buckets = {}
+            for q in topic_questions:
+                self._by_id[q["id"]] = q
+                buckets.setdefault(q.get("difficulty", DEFAULT_DIFFICULTY), []).append(q["id"])
+            for difficulty, bucket_ids in buckets.items():
+                self._buckets[(topic, difficulty)] = tuple(bucket_ids)
+            ids = self._by_topic[topic] = tuple(q["id"] for q in topic_questions)
+            return ids
+
+    # === Nachschlagen ===
+    @property
+    def topics(self) -> list[str]:
+        return list(self._catalog.keys())
+
+    @property
+    def questions(self) -> tuple:
+        """Globales Fragen-Array über alle Themen."""
+        if self._questions is None:
+            self._all_ids = tuple(qid for topic in self._catalog for qid in self._compile(topic))
+            self._questions = tuple(self._by_id[qid] for qid in self._all_ids)
+        return self._questions
+
+    @property
+    def all_ids(self) -> tuple:
+        self.questions
+        return self._all_ids
+
+    def __contains__(self, qid) -> bool:
+        return self.get(qid) is not None
+
+    def get(self, qid):
+        if qid is None:
+            return None
+        q = self._by_id.get(qid)
+        if q is None and self._questions is None:
+            # ID aus einem noch nicht kompilierten Thema
+            self.questions
+            q = self._by_id.get(qid)
+        return q
+
+    def bucket(self, topic: str, difficulty: str = None) -> tuple:
+        """IDs eines Themas, optional nur einer Schwierigkeit (in Katalogreihenfolge)."""
+        ids = self._compile(topic)
+        if difficulty is None:
+            return ids
+        return self._buckets.get((topic, difficulty), ())
+
+    def ordered_by_difficulty(self, topic: str) -> list:
+        """IDs eines Themas sortiert nach easy → medium → hard."""
+        return [qid for level in DIFFICULTY_LEVELS for qid in self.bucket(topic, level)]
+
+    # === Ziehen ohne Zurücklegen ===
+    def draw(self, ids, used=frozenset()):
+        """
+        Zieht eine ID aus `ids`, die nicht in `used` liegt (erwartet O(1)).
+        Erst wenn die Zufallsversuche scheitern, wird die Restliste gebildet.
+        """
+        if not ids:
+            return None
+        for _ in range(MAX_DRAW_ATTEMPTS):
+            qid = random.choice(ids)
+            if qid not in used:
+                return qid
+        remaining = [qid for qid in ids if qid not in used]
+        return random.choice(remaining) if remaining else None
+
+    def sample(self, ids, k: int, used=frozenset()) -> list:
+        """Bis zu k verschiedene IDs aus `ids`, ohne bereits benutzte."""
+        if not used:
+            return random.sample(ids, min(k, len(ids)))
+        picked = []
+        taken = set(used)
+        while len(picked) < k:
+            qid = self.draw(ids, taken)
+            if qid is None:
+                break
+            picked.append(qid)
+            taken.add(qid)
+        return picked
@@ -0,0 +1,220 @@
+# --- utils/semantic_cache.py ---
+
+import re
+import time
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.llm_scheduler import scheduler, busy_message
+from utils.latency_budget import is_truncated
+
+# === Konfiguration ===
+SIMILARITY_THRESHOLD = 0.90  # Kosinus-Ähnlichkeit, ab der eine Frage als "dieselbe" gilt
+TTL = 24 * 3600  # Sekunden, danach wird eine Antwort verworfen
+REFRESH_AFTER = 3600  # Sekunden, danach wird eine Antwort bei einem Treffer im Hintergrund erneuert
+MAX_ENTRIES_PER_SCOPE = 200  # pro (Persona, Thema); älteste Nutzung fliegt zuerst
+
+
+def _normalize(question: str) -> str:
+    return re.sub(r"[^\w ]+", "", " ".join(question.lower().split()))
+
+
+def _default_embed(text: str):
+    from utils.chat_history_memory import embedding_model, EMBEDDING_MODEL
+    with scheduler.slot(EMBEDDING_MODEL, "chat"):
+        return embedding_model.embed_query(text)
+
+
+def complete_answer(answer: str) -> bool:
+    """Nur vollständige Antworten cachen: keine Überlastungsmeldung, keine per Deadline gekürzte Antwort."""
+    return answer != busy_message("chat") and not is_truncated(answer)
+
+
+class _Scope:
+    def __init__(self):
+        self.entries = OrderedDict()  # normalisierte Frage -> {"question", "answer", "created"}
+        self.vectors = None  # np.ndarray (n, d), normiert; Zeilen in Reihenfolge von entries
+        self.keys = []
+        self.revision = None  # Revision der Themen-Zusammenfassung, aus der die Antworten stammen
+
+
+class SemanticAnswerCache:
+    """
+    Antwort-Cache für Themenfragen, getrennt nach Persona und Thema. Eine neue Frage wird
+    eingebettet und mit den bisherigen Fragen des Themas verglichen; liegt eine innerhalb
+    der Ähnlichkeitsschwelle, wird deren Antwort sofort geliefert (und, wenn sie älter als
+    REFRESH_AFTER ist, im Hintergrund erneuert). Einträge laufen nach TTL ab; pro Thema
+    werden höchstens MAX_ENTRIES_PER_SCOPE gehalten. Mit `revision` (Revision der
+    Themen-Zusammenfassung) wird das Thema geleert, sobald sich die Zusammenfassung ändert.
+    """
+
+    def __init__(self, embed=_default_embed, threshold: float = SIMILARITY_THRESHOLD, ttl: float = TTL,
+                 refresh_after: float = REFRESH_AFTER, max_entries: int = MAX_ENTRIES_PER_SCOPE):
+        self._embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._scopes = defaultdict(_Scope)  # (persona, topic) -> _Scope
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="answer-refresh")
+        self._hits = Counter()  # topic -> Treffer
+        self._misses = Counter()
+        self.refreshes = 0
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _rebuild(self, scope: _Scope):
+        scope.keys = list(scope.entries)
+        scope.vectors = np.stack([scope.entries[k]["vector"] for k in scope.keys]) if scope.keys else None
+
+    def _scope(self, persona: str, topic: str, revision) -> _Scope:
+        """Scope des Themas; Antworten aus einer älteren Zusammenfassung werden verworfen."""
+        scope = self._scopes[(persona, topic)]
+        if scope.revision != revision:
+            scope.entries.clear()
+            scope.revision = revision
+            self._rebuild(scope)
+        return scope
+
+    def _expire(self, scope: _Scope, now: float):
+        expired = [k for k, e in scope.entries.items() if now - e["created"] > self.ttl]
+        for key in expired:
+            del scope.entries[key]
+        return bool(expired)
+
+    def lookup(self, persona: str, topic: str, question: str, revision=None):
+        """
+        (Antwort, Frage-Vektor, Alter in Sekunden, gespeicherte Frage des Treffers);
+        ohne Treffer sind Antwort, Alter und Frage None.
+        """
+        key = _normalize(question)
+        now = time.time()
+        with self._lock:
+            scope = self._scope(persona, topic, revision)
+            if self._expire(scope, now):
+                self._rebuild(scope)
+            entry = scope.entries.get(key)
+            if entry is not None:
+                # Wortgleiche Frage: ohne Embedding-Aufruf
+                scope.entries.move_to_end(key)
+                self._hits[topic] += 1
+                return entry["answer"], entry["vector"], now - entry["created"], entry["question"]
+            if scope.vectors is None:
+                self._misses[topic] += 1
+                return None, None, None, None
+
+        try:
+            vector = self._unit(self._embed(question))
+        except Exception as e:
+            print(f"⚠️ Embedding für den Antwort-Cache fehlgeschlagen: {e}")
+            with self._lock:
+                self._misses[topic] += 1
+            return None, None, None, None
+
+        with self._lock:
+            if scope.vectors is None or scope.vectors.shape[1] != vector.shape[0]:
+                self._misses[topic] += 1
+                return None, vector, None, None
+            similarities = scope.vectors @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self._misses[topic] += 1
+                return None, vector, None, None
+            match = scope.keys[best]
+            entry = scope.entries[match]
+            scope.entries.move_to_end(match)
+            self._hits[topic] += 1
+            return entry["answer"], vector, now - entry["created"], entry["question"]
+
+    def store(self, persona: str, topic: str, question: str, answer: str, vector=None, revision=None):
+        key = _normalize(question)
+        if vector is None:
+            with self._lock:
+                existing = self._scopes[(persona, topic)].entries.get(key)
+            vector = existing["vector"] if existing else None
+        if vector is None:
+            try:
+                vector = self._embed(question)
+            except Exception as e:
+                print(f"⚠️ Antwort nicht gecacht: {e}")
+                return
+        with self._lock:
+            scope = self._scopes[(persona, topic)]
+            if scope.revision != revision:
+                return  # Antwort aus einer inzwischen ersetzten Zusammenfassung
+            scope.entries[key] = {"question": question, "answer": answer, "vector": self._unit(vector), "created": time.time()}
+            scope.entries.move_to_end(key)
+            while len(scope.entries) > self.max_entries:
+                scope.entries.popitem(last=False)
+            self._rebuild(scope)
+
+    def get_or_answer(self, persona: str, topic: str, question: str, generate, cacheable=complete_answer, refresh=None,
+                      revision=None):
+        """
+        Antwort aus dem Cache (ggf. mit Hintergrund-Erneuerung) oder frisch erzeugt und gespeichert.
+        generate(frage) beantwortet die gestellte Frage; refresh(frage) erneuert die gespeicherte
+        Frage des Treffers (z. B. mit Hintergrund-Priorität), Standard ist generate.
+        """
+        answer, vector, age, matched = self.lookup(persona, topic, question, revision)
+        if answer is not None:
+            if age > self.refresh_after:
+                # Erneuert wird der gespeicherte Eintrag, nicht die neue Formulierung
+                self.refresh_async(persona, topic, matched, refresh or generate, cacheable, revision)
+            return answer
+        answer = generate(question)
+        if cacheable(answer):
+            self.store(persona, topic, question, answer, vector, revision)
+        return answer
+
+    def refresh_async(self, persona: str, topic: str, question: str, generate, cacheable=complete_answer, revision=None):
+        """Erneuert die Antwort auf `question` im Hintergrund mit generate(question)."""
+        key = (persona, topic, _normalize(question))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                answer = generate(question)
+                if cacheable(answer):
+                    self.store(persona, topic, question, answer, revision=revision)
+                    with self._lock:
+                        self.refreshes += 1
+            except Exception as e:
+                print(f"⚠️ Hintergrund-Erneuerung fehlgeschlagen: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def stats(self) -> dict:
+        """Trefferquote pro Thema."""
+        with self._lock:
+            topics = set(self._hits) | set(self._misses)
+            entries = Counter()
+            for (_, topic), scope in self._scopes.items():
+                entries[topic] += len(scope.entries)
+            return {
+                topic: {
+                    "hits": self._hits[topic],
+                    "misses": self._misses[topic],
+                    "hit_rate": self._hits[topic] / max(1, self._hits[topic] + self._misses[topic]),
+                    "entries": entries[topic]
+                }
+                for topic in sorted(topics)
+            }
+
+
+# === Globale Instanz (Manager-Chat und get_topic_response) ===
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,199 @@
+# --- utils/step_cache.py ---
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as WaitTimeout
+
+from utils.pregeneration import pregenerator
+from utils.cancellation import CancelToken, bind_token
+
+# === Konfiguration ===
+MAX_ENTRIES = 2000  # LRU-Grenze über alle Sessions
+FOREGROUND_WORKERS = 8  # gleichzeitige Vordergrund-Generierungen über alle Sessions
+POLL_INTERVAL = 0.25  # Sekunden; so oft prüft das wartende Skript, ob Streamlit neu starten will
+
+
+def inputs_hash(inputs) -> str:
+    """Stabiler Hash der Schritt-Eingaben (Reihenfolge der Keys egal)."""
+    raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class StepOutputCache:
+    """
+    Merkt sich die LLM-Ausgabe eines Schritts unter (Session, Schritt, Eingaben-Hash).
+    Streamlit führt das Skript bei jeder Widget-Änderung neu aus – so wird jede
+    Generierung trotzdem genau einmal pro Schritt ausgeführt. Laufen zwei Reruns
+    gleichzeitig in denselben Schritt, wartet der zweite auf das Ergebnis des ersten.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> Ausgabe
+        self._inflight = {}  # key -> threading.Event
+        self._generations = Counter()  # session_id -> ausgeführte Generierungen
+        self.hits = 0
+
+    def contains(self, session_id: str, step: str, digest: str) -> bool:
+        return (session_id, step, digest) in self._entries
+
+    def peek(self, session_id: str, step: str, digest: str):
+        with self._lock:
+            return self._entries.get((session_id, step, digest))
+
+    def get_or_generate(self, session_id: str, step: str, inputs, generate, digest: str = None):
+        key = (session_id, step, digest or inputs_hash(inputs))
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            event.wait()
+
+        try:
+            output = generate()
+            with self._lock:
+                self._generations[session_id] += 1
+                self._entries[key] = output
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return output
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def generation_count(self, session_id: str) -> int:
+        """Anzahl tatsächlich ausgeführter Generierungen dieser Session (unabhängig von Reruns)."""
+        return self._generations[session_id]
+
+    def clear_session(self, session_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session_id]:
+                del self._entries[key]
+            self._generations.pop(session_id, None)
+
+
+# === Globale Instanz ===
+step_cache = StepOutputCache()
+
+
+# === Vordergrund-Generierungen ===
+# Generierungen, auf die das Skript wartet, laufen in einem Worker-Thread mit dem CancelToken
+# des Durchlaufs. Das Skript wartet in kurzen Schritten und gibt dabei jedes Mal ein leeres
+# Element aus – so kann Streamlit es bei einem Rerun (Navigation, neue Eingabe) anhalten.
+# Ein Rerun allein bricht nicht ab (das Ergebnis landet ggf. im Step-Cache); erst ⬅ bzw.
+# ein Themenwechsel (cancel_pending/discard_run) bricht die Generierung bei Ollama ab.
+_foreground_executor = ThreadPoolExecutor(max_workers=FOREGROUND_WORKERS, thread_name_prefix="foreground")
+_foreground_lock = threading.Lock()
+_foreground_tokens = {}  # session_id -> CancelToken
+
+
+def foreground_token(session_id: str) -> CancelToken:
+    """Token des Durchlaufs; nach einem Abbruch beginnt ein frisches (z. B. bei Rückkehr in den Modus)."""
+    with _foreground_lock:
+        token = _foreground_tokens.get(session_id)
+        if token is None or token.cancelled:
+            token = _foreground_tokens[session_id] = CancelToken(scope=(session_id, "foreground"))
+        return token
+
+
+def _cancel_foreground(session_id: str):
+    with _foreground_lock:
+        token = _foreground_tokens.pop(session_id, None)
+    if token is not None:
+        token.cancel()
+
+
+def _run_bound(token, fn):
+    with bind_token(token):
+        return fn()
+
+
+def _wait(future):
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return future.result()
+    if get_script_run_ctx() is None:
+        return future.result()  # außerhalb eines Streamlit-Skripts (Benchmarks, Creator)
+    placeholder = st.empty()
+    while True:
+        try:
+            return future.result(timeout=POLL_INTERVAL)
+        except WaitTimeout:
+            placeholder.empty()  # jede Ausgabe prüft, ob ein Rerun angefordert wurde
+
+
+def run_foreground(session_id: str, fn):
+    """Führt fn() unter dem CancelToken des Durchlaufs aus (get_feedback, Tipps, Schritte)."""
+    return _wait(_foreground_executor.submit(_run_bound, foreground_token(session_id), fn))
+
+
+def cached_step(session_id: str, step: str, inputs, generate):
+    """Ausgabe des Schritts aus dem Cache, aus einer passenden Vorab-Generierung oder frisch erzeugt."""
+    digest = inputs_hash(inputs)
+    if step_cache.contains(session_id, step, digest):
+        return step_cache.get_or_generate(session_id, step, inputs, generate, digest=digest)
+
+    def generate_or_take():
+        pending = pregenerator.take(session_id, step, digest)
+        if pending is not None:
+            try:
+                return pending.result()
+            except Exception as e:
+                print(f"⚠️ Vorab-Generierung für {step} fehlgeschlagen: {e}")
+        return generate()
+
+    return run_foreground(session_id, lambda: step_cache.get_or_generate(
+        session_id, step, inputs, generate_or_take, digest=digest))
+
+
+def pregenerate_step(session_id: str, step: str, inputs, generate):
+    """Startet die Generierung eines absehbaren Schritts im Hintergrund (falls noch nicht im Cache)."""
+    digest = inputs_hash(inputs)
+    if not step_cache.contains(session_id, step, digest):
+        pregenerator.schedule(session_id, step, digest, generate)
+
+
+def poll_step(session_id: str, step: str, inputs):
+    """
+    Nicht-blockierend: Ausgabe des Schritts, falls schon im Cache oder im Hintergrund fertig.
+    Sonst None – der Aufrufer zeigt dann vorerst etwas anderes an. Eine fehlgeschlagene
+    Vorab-Generierung wird nicht gecacht; cached_step erzeugt den Schritt dann neu.
+    """
+    digest = inputs_hash(inputs)
+    if step_cache.contains(session_id, step, digest):
+        return step_cache.peek(session_id, step, digest)
+    pending = pregenerator.poll(session_id, step, digest)
+    if pending is None:
+        return None
+    try:
+        output = pending.result()
+    except Exception as e:
+        # poll() hat den Eintrag bereits entnommen
+        print(f"⚠️ Hintergrund-Generierung für {step} fehlgeschlagen: {e}")
+        return None
+    return step_cache.get_or_generate(session_id, step, inputs, lambda: output, digest=digest)
+
+
+def cancel_pending(session_id: str):
+    """Bricht offene Vorab- und Vordergrund-Generierungen ab; bereits erzeugte Ausgaben bleiben im Cache."""
+    pregenerator.discard_run(session_id)
+    _cancel_foreground(session_id)
+
+
+def discard_run(session_id: str):
+    """Verwirft Cache-Einträge und offene Generierungen eines Durchlaufs."""
+    step_cache.clear_session(session_id)
+    pregenerator.discard_run(session_id)
+    _cancel_foreground(session_id)
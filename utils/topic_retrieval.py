@@ -0,0 +1,162 @@
+# --- utils/topic_retrieval.py ---
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from utils.llm_scheduler import scheduler
+from utils.model_residency import EMBEDDING_MODEL
+
+# === Konfiguration ===
+TOPIC_STORE_DIR = "topic_vectorstore"  # eine Chroma-Collection für alle Themen (creator/agent_topic_summary.py)
+TOPIC_COLLECTION = "lean_topics"
+WRITE_BATCH_SIZE = 256  # Chunks pro Embedding-/Schreib-Batch
+TOP_K = 4
+HISTORY_TURNS = 3  # nur die letzten Frage/Antwort-Paare gehen mit in den Prompt
+MAX_CONTEXT_CHARS = 3500  # Obergrenze für die eingefügten Textstellen
+CACHE_SIZE = 512  # gemerkte Abrufe (Thema, Frage, k)
+
+SYSTEM_PROMPT = """You are a Lean Production tutor. The learner is studying the topic "{topic}".
+Answer using the course material below. If it does not cover the question, say so briefly and answer from general Lean knowledge.
+Stay on the topic and keep the answer concise.
+
+Course material:
+{context}"""
+
+
+def catalog_topic(label: str) -> str:
+    """Katalog-Name eines vom Creator vergebenen Themen-Labels (wie im Katalog-Bundle)."""
+    return label.replace("/", "_").replace("_", " ")
+
+
+def open_topic_store(embedding_function, store_dir: str = TOPIC_STORE_DIR):
+    from langchain_chroma import Chroma
+    return Chroma(persist_directory=store_dir, embedding_function=embedding_function, collection_name=TOPIC_COLLECTION)
+
+
+def replace_topic_documents(store, topic: str, docs, batch_size: int = WRITE_BATCH_SIZE) -> int:
+    """Ersetzt alle Chunks eines Themas; Metadatum "topic" dient als Filter, IDs sind inhaltsbasiert."""
+    store.delete(where={"topic": topic})
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start:start + batch_size]
+        store.add_texts(
+            texts=[d.page_content for d in batch],
+            metadatas=[{**d.metadata, "topic": topic} for d in batch],
+            ids=[hashlib.sha1(f"{topic}\n{d.page_content}".encode("utf-8")).hexdigest() for d in batch]
+        )
+    return len(docs)
+
+
+def remove_topic(store, topic: str):
+    store.delete(where={"topic": topic})
+
+
+def stored_topics(store) -> list:
+    """Alle Themen, zu denen Chunks in der Collection liegen."""
+    metadatas = store.get(include=["metadatas"])["metadatas"]
+    return sorted({m["topic"] for m in metadatas if m and m.get("topic")})
+
+
+def topic_documents(store, topic: str) -> list:
+    """Alle Chunk-Texte eines Themas (Reihenfolge nach ID, damit Hashes darüber stabil sind)."""
+    result = store.get(where={"topic": topic}, include=["documents"])
+    return [text for _, text in sorted(zip(result["ids"], result["documents"]))]
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class TopicRetriever:
+    """
+    Abruf der passendsten Textstellen des gewählten Themas aus der gemeinsamen Themen-Collection
+    (Filter auf das Metadatum "topic"; topic=None sucht themenübergreifend). Die Collection bleibt
+    geöffnet, bis invalidate() aufgerufen wird; Abrufe werden pro (Thema, Frage, k) gemerkt,
+    sodass wiederholte Fragen kein Embedding kosten.
+    """
+
+    def __init__(self, store_dir: str = TOPIC_STORE_DIR, cache_size: int = CACHE_SIZE):
+        self.store_dir = store_dir
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._opened = False
+        self._collection = None  # Chroma, sobald der Store existiert und geöffnet wurde
+        self._cache = OrderedDict()  # (topic, query, k) -> tuple(Textstellen)
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self):
+        with self._lock:
+            if self._opened:
+                return self._collection
+        # "Kein Store" wird nicht gemerkt: agent_topic_summary kann ihn jederzeit anlegen
+        if not os.path.isdir(self.store_dir):
+            return None
+        from utils.chat_history_memory import embedding_model
+        store = open_topic_store(embedding_model, self.store_dir)
+        with self._lock:
+            self._collection, self._opened = store, True
+        return store
+
+    def invalidate(self):
+        """Collection beim nächsten Abruf neu öffnen und gemerkte Abrufe verwerfen (z. B. nach einem Einlese-Job)."""
+        with self._lock:
+            self._opened = False
+            self._collection = None
+            self._cache.clear()
+
+    def retrieve(self, topic, query: str, k: int = TOP_K) -> tuple:
+        key = (topic, _normalize(query), k)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        store = self._store()
+        if store is None:
+            return ()
+        try:
+            with scheduler.slot(EMBEDDING_MODEL, "chat"):
+                docs = store.similarity_search(query, k=k, filter={"topic": topic} if topic else None)
+        except Exception as e:
+            print(f"❌ Fehler beim Abruf aus dem Themen-Store ({topic}): {e}")
+            return ()
+
+        chunks = tuple(d.page_content for d in docs)
+        with self._lock:
+            self._cache[key] = chunks
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return chunks
+
+
+# === Globale Instanz ===
+topic_retriever = TopicRetriever()
+
+
+def build_context(chunks, fallback: str = None, max_chars: int = MAX_CONTEXT_CHARS) -> str:
+    """Textstellen bis zur Zeichengrenze; ohne Treffer die Themen-Zusammenfassung."""
+    parts, used = [], 0
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if used + len(chunk) > max_chars:
+            chunk = chunk[:max(0, max_chars - used)]
+        if not chunk:
+            break
+        parts.append(chunk)
+        used += len(chunk)
+    if not parts and fallback:
+        return fallback
+    return "\n---\n".join(parts) or "(no course material available)"
+
+
+def grounded_messages(topic: str, history: list, question: str, summary: str = None, turns: int = HISTORY_TURNS):
+    """Kompakter Chat-Prompt: Systemnachricht mit Textstellen, die letzten Runden und die neue Frage."""
+    from langchain_core.messages import SystemMessage, HumanMessage
+
+    context = build_context(topic_retriever.retrieve(topic, question), fallback=summary)
+    recent = history[-2 * turns:] if turns else []
+    return [SystemMessage(SYSTEM_PROMPT.format(topic=topic, context=context)), *recent, HumanMessage(question)]
@@ -1,8 +1,7 @@
-from utils.load_quiz_data import load_quiz_catalog
+from utils.load_quiz_data import get_catalog_service
 
 def get_available_topics():
-    quiz_catalog = load_quiz_catalog()
-    return [t for t, qs in quiz_catalog.items() if qs]
+    return [t for t, count in get_catalog_service().topic_sizes().items() if count]
 
 def choose_topic_cli(available_topics, prompt_text="Choose a topic number: "):
     if not available_topics:
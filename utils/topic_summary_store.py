@@ -0,0 +1,104 @@
+# --- utils/topic_summary_store.py ---
+
+import time
+import threading
+from contextlib import closing
+
+from utils.catalog_bundle import BUNDLE_PATH, open_bundle, bundle_mtime, read_summary_revisions, read_short_summaries, read_summary
+
+# === Konfiguration ===
+CHECK_INTERVAL = 2.0  # Sekunden zwischen zwei mtime-Prüfungen des Bundles
+
+
+class TopicSummaryStore:
+    """
+    Prozessweiter Speicher für Themen-Zusammenfassungen (geteilt von allen Sessions).
+    "short" wird beim Laden eines Themas sofort übernommen, "long" erst beim ersten Zugriff.
+    Themen mit geänderter Revision im Bundle werden einzeln neu geladen – nach einem
+    Creator-Lauf ist kein Neustart der App nötig. Innerhalb von CHECK_INTERVAL wird
+    die Platte nicht berührt.
+    """
+
+    def __init__(self, bundle_path: str = BUNDLE_PATH, check_interval: float = CHECK_INTERVAL):
+        self.bundle_path = bundle_path
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._entries = {}  # topic -> {"revision", "short", "long"}
+        self._mtime = None
+        self._last_check = None
+
+    # === Laden ===
+    def refresh(self, force: bool = False):
+        """Prüft die mtime des Bundles und lädt nur neue oder geänderte Themen nach."""
+        now = time.monotonic()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            self._last_check = now
+            mtime = bundle_mtime(self.bundle_path)
+            if mtime is None:
+                self._entries.clear()
+                self._mtime = None
+                return
+            if mtime == self._mtime:
+                return
+
+            try:
+                with closing(open_bundle(self.bundle_path)) as conn:
+                    revisions = read_summary_revisions(conn)
+                    changed = [t for t, rev in revisions.items() if self._entries.get(t, {}).get("revision") != rev]
+                    shorts = read_short_summaries(conn, changed)
+            except Exception as e:
+                print(f"❌ Fehler beim Laden der Zusammenfassungen: {e}")
+                return
+
+            self._mtime = mtime
+            for topic in changed:
+                # "long" wird erst bei Bedarf gelesen
+                self._entries[topic] = {"revision": revisions[topic], "short": shorts.get(topic), "long": None}
+            for topic in set(self._entries) - set(revisions):
+                del self._entries[topic]
+
+    # === Zugriff ===
+    def topics(self) -> list[str]:
+        self.refresh()
+        return list(self._entries.keys())
+
+    def __contains__(self, topic: str) -> bool:
+        self.refresh()
+        return topic in self._entries
+
+    def get_short(self, topic: str):
+        self.refresh()
+        entry = self._entries.get(topic)
+        return entry["short"] if entry else None
+
+    def revision(self, topic: str):
+        """Revision der Zusammenfassung (ändert sich bei jeder Neuerzeugung), None ohne Thema."""
+        self.refresh()
+        entry = self._entries.get(topic)
+        return entry["revision"] if entry else None
+
+    def get_long(self, topic: str):
+        self.refresh()
+        with self._lock:
+            entry = self._entries.get(topic)
+            if not entry:
+                return None
+            if entry["long"] is None:
+                try:
+                    with closing(open_bundle(self.bundle_path)) as conn:
+                        short, long, revision = read_summary(conn, topic)
+                except Exception as e:
+                    print(f"❌ Fehler beim Laden der Zusammenfassung {topic}: {e}")
+                    return None
+                if revision is None:
+                    return None
+                # Thema kann zwischenzeitlich neu geschrieben worden sein → "short" gleich mitziehen
+                entry.update(revision=revision, short=short, long=long or "")
+            return entry["long"]
+
+
+# === Globale Instanz (von feedback_tools und ui_kapitel geteilt) ===
+summary_store = TopicSummaryStore()